@@ -4,6 +4,7 @@ import maya.OpenMaya as OpenMaya
 import marigold.utility.NodeUtility as NodeUtility
 import marigold.utility.GeneralUtility as GeneralUtility
 import marigold.components as Components
+from marigold.utility.AncestryResolver import ANCESTRY_RESOLVER
 
 class BitModule( object ):
     def __init__( self, inModuleNode=None ):
@@ -24,41 +25,11 @@ class BitModule( object ):
         '''
         Gets all the bits of a module. 
         '''        
-        # Get all the bits in the module.
-        allBits = NodeUtility.getFrameRootAllChildren( self.moduleRootBit )
-        moduleBits = NodeUtility.getFrameRootAllChildren( self.moduleRootBit )
-        
-        # Gather the bits associated with the module.
         # NOTE!!! May need to do this via the component system. This would involve adding some functionality
         # to the add/remove child bit tool. I'm thinking it would connect an attribute from the bit to the 
         # module not, basically creating a list of all the associated bits.
-        if allBits is not None:
-            # Loop through the bits.
-            for bit in allBits:
-                # If a bit has a module root component then we remove it and all of it's children.
-                moduleCheck = NodeUtility.checkBitForComponent( bit, 'ModuleRootComponent' )
-                #print '{0}...{1}'.format( bit, moduleCheck )
-                if moduleCheck is not None:
-                    if moduleBits.count( bit ) == 1:
-                        # There is a high likelihood that there are many levels of nested
-                        # modules. Due to the way I remove bits from the list there is also
-                        # a high likelihood that at this point I'm trying to remove a module
-                        # that doesn't exist any more because it was removed along with another
-                        # module for which it is a child. So I check to see if it is still around
-                        # and if so remove it.
-                        moduleBits.remove( bit )
-                        moduleChildren = NodeUtility.getFrameRootAllChildren( bit )
-                        if moduleChildren is not None:
-                            for child in moduleChildren:
-                                moduleBits.remove( child )
-        
-        # Add the root bit to the list.
-        if not moduleBits:
-            moduleBits = [ self.moduleRootBit ]
-        else:
-            moduleBits.insert( 0, self.moduleRootBit )
-
-        return moduleBits
+        # Nested modules are skipped along with all of their bits.
+        return NodeUtility.getModuleBits( self.moduleRootBit )
         
     def getFirstParentWithinModule( self , inBit, inComponentClass ):
         '''
@@ -69,24 +40,11 @@ class BitModule( object ):
         @param inComponentClass: String. Name of the component type to search for.
         @return: None or component node of the parent bit.
         '''        
-        moduleBits = self.getBits()
-        #print '            {0}'.format( moduleBits )
-        parents = getAllParents( inBit )
-        #print '            {0}'.format( parents )
-        bitParentsInModule = []
-        
-        if parents:
-            bitParentsInModule = compareLists( moduleBits, parents )
-            #print '            {0}'.format( bitParentsInModule )
-            
-        if bitParentsInModule:
-            # The returned list of viable parents is generated from the root bit down.
-            # So we reverse the list in order to start with the closest parent to the 
-            # target child bit.
-            for bit in reversed( bitParentsInModule ):
-                compCheck = NodeUtility.checkBitForComponent( bit, inComponentClass )
-                if compCheck is not None:
-                    return compCheck
+        parent = ANCESTRY_RESOLVER.findAncestor( inBit, inComponentClass, inIncludeSelf=False )
+        if parent is not None:
+            # Parents above the module root aren't part of the module.
+            if parent[0] == self.moduleRootBit or parent[0].startswith( self.moduleRootBit+'|' ):
+                return parent[1]
         
         return None
         
@@ -99,21 +57,10 @@ class BitModule( object ):
         @param inBit: String. Name of a bit.
         @param inComponentClass: String. Name of the class.
         '''
-        firstParentWithComponent = None
-        
-        # Get all the parents of the bit.
-        parentBits = getAllParents( inBit )
-        
-        # Loop through the parent bits.
-        if parentBits is not None:
-            for parent in parentBits:
-                jointComp = NodeUtility.checkBitForComponent( parent, inComponentClass )
-                if jointComp is not None:
-                    if firstParentWithComponent is None:
-                        # We found the first joint component. Set the variable.
-                        firstParentWithComponent = jointComp
-        
-        return firstParentWithComponent
+        parent = ANCESTRY_RESOLVER.findAncestor( inBit, inComponentClass, inIncludeSelf=False )
+        if parent is not None:
+            return parent[1]
+        return None
     
                         
     def buildJoints( self ):
@@ -133,7 +80,7 @@ class BitModule( object ):
             jointComp = NodeUtility.checkBitForComponent( bit, 'BasicJointComponent' )
             if jointComp is not None:
                 # Make the joint.
-                bitJoint = Components.BasicJointComponent( jointComp ).buildNode( jointComp )
+                bitJoint = Components.getComponentClass( 'BasicJointComponent' )( jointComp ).buildNode( jointComp )
                 jointName = GeneralUtility.getMObjectName( bitJoint )
                 
                 # Now handle any hierarchy setup.
@@ -194,7 +141,7 @@ class BitModule( object ):
             controlCurveComp = NodeUtility.checkBitForComponent( bit, 'CurveControlComponent' )
             if controlCurveComp is not None:
                 # Make the curve control.
-                bitControl = Components.CurveControlComponent( controlCurveComp ).buildNode( controlCurveComp )
+                bitControl = Components.getComponentClass( 'CurveControlComponent' )( controlCurveComp ).buildNode( controlCurveComp )
                 controlName = GeneralUtility.getMObjectName( bitControl )
                 
                 # Controls have a spacer group. This is what we need to parent later on.
@@ -0,0 +1,55 @@
+'''
+Compares adding component attributes one cmds.addAttr at a time, the way
+requiredAttributes used to, against adding a class schema in one MDGModifier
+pass. Run it from the script editor:
+
+    import marigold.benchmarks.componentAttributes as componentAttributes
+    componentAttributes.run()
+
+It works in a new scene, so save first.
+'''
+import time
+import maya.cmds as cmds
+import marigold.utility.NodeUtility as NodeUtility
+import marigold.utility.AttributeSchema as AttributeSchema
+from marigold.components.roots.CharacterRoot import CharacterRootComponent
+
+def addPlugs( inNodes, inClass ):
+    '''
+    The old requiredAttributes.
+    '''
+    attributes = AttributeSchema.getClassAttributes( inClass )
+    for node in inNodes:
+        for attribute in attributes:
+            NodeUtility.addPlug( node, attribute[0], attribute[1], attribute[2] )
+            if len( attribute ) > 3:
+                NodeUtility.setPlugValue( NodeUtility.getPlug( node, attribute[0] ), attribute[3] )
+
+def timeNodes( inFunction, inClass, inNodeCount, inPrefix ):
+    '''
+    @param inFunction: Function. Takes the node names and the component class.
+    @param inClass: Class. The component class.
+    @param inNodeCount: Int. Number of nodes to make.
+    @param inPrefix: String. Start of the node names.
+    @return: Float. Seconds taken to add the attributes.
+    '''
+    nodes = [ cmds.createNode( 'network', name='{0}{1}'.format( inPrefix, i ) ) for i in xrange( inNodeCount ) ]
+    startTime = time.time()
+    inFunction( nodes, inClass )
+    return time.time()-startTime
+
+def run( inNodeCount=2000, inClass=CharacterRootComponent ):
+    '''
+    @param inNodeCount: Int. Number of component nodes to make.
+    @param inClass: Class. The component class to use.
+    @return: Dictionary. Seconds taken by each way.
+    '''
+    cmds.file( new=True, force=True )
+    AttributeSchema.SCHEMA_REGISTRY.clear()
+    results = { 'addPlug':timeNodes( addPlugs, inClass, inNodeCount, 'addPlug' ),
+                'schema':timeNodes( AttributeSchema.addSchemaAttributes, inClass, inNodeCount, 'schema' ) }
+
+    print '{0} nodes with {1} attributes each'.format( inNodeCount, len( AttributeSchema.getClassAttributes( inClass ) ) )
+    for name in [ 'addPlug', 'schema' ]:
+        print '    {0:<8} {1:.4f}s'.format( name, results[ name ] )
+    return results
@@ -0,0 +1,81 @@
+'''
+Times import marigold.components in a fresh interpreter and checks that Qt isn't
+pulled in. Run it on a farm node with mayapy:
+
+    mayapy -m marigold.benchmarks.componentImport
+
+It exits with 1 if the import is slower than TARGET_SECONDS or loads Qt. From
+the script editor, run() does the same and returns the results.
+'''
+import os
+import subprocess
+import sys
+
+# Slowest acceptable import, in seconds.
+TARGET_SECONDS = 1.0
+
+# Modules the headless import must not load.
+QT_MODULES = [ 'PySide', 'shiboken', 'marigold.ui.widgets.QTWidgets' ]
+
+# Run by the fresh interpreter. Prints the import time, then the Qt modules loaded.
+IMPORT_SCRIPT = '''
+import sys, time
+startTime = time.time()
+import marigold.components
+print time.time()-startTime
+print ','.join( name for name in {0!r} if name in sys.modules )
+'''
+
+def getPackageParent():
+    '''
+    @return: String. Folder holding the marigold package.
+    '''
+    return os.path.dirname( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+def timeImport( inPython ):
+    '''
+    @param inPython: String. Python executable to run.
+    @return: List. Seconds the import took and the Qt modules it loaded.
+    '''
+    environment = dict( os.environ )
+    paths = [ getPackageParent() ]
+    if environment.get( 'PYTHONPATH' ):
+        paths.append( environment[ 'PYTHONPATH' ] )
+    environment[ 'PYTHONPATH' ] = os.pathsep.join( paths )
+    output = subprocess.check_output( [ inPython, '-c', IMPORT_SCRIPT.format( QT_MODULES ) ], env=environment )
+    lines = output.strip().splitlines()
+    qtModules = []
+    if len( lines ) > 1 and lines[-1]:
+        qtModules = lines[-1].split( ',' )
+        lines = lines[:-1]
+    return [ float( lines[-1] ), qtModules ]
+
+def run( inRepeats=5, inTarget=TARGET_SECONDS, inPython=None ):
+    '''
+    @param inRepeats: Int. Number of fresh interpreters to time. The fastest counts.
+    @param inTarget: Float. Slowest acceptable import, in seconds.
+    @param inPython: String. Python executable to run. Defaults to the one running
+        this, which is mayapy on a farm node.
+    @return: Dictionary. seconds, target, qtModules and passed.
+    '''
+    if inPython is None:
+        inPython = sys.executable
+    times = []
+    qtModules = []
+    for i in xrange( inRepeats ):
+        seconds, loaded = timeImport( inPython )
+        times.append( seconds )
+        qtModules = sorted( set( qtModules ) | set( loaded ) )
+    results = { 'seconds':min( times ),
+                'target':inTarget,
+                'qtModules':qtModules,
+                'passed':min( times ) <= inTarget and not qtModules }
+
+    print 'import marigold.components: {0:.4f}s (target {1:.4f}s)'.format( results[ 'seconds' ], inTarget )
+    if qtModules:
+        print '    Qt loaded: {0}'.format( ', '.join( qtModules ) )
+    print '    {0}'.format( 'passed' if results[ 'passed' ] else 'FAILED' )
+    return results
+
+if __name__ == '__main__':
+    sys.exit( 0 if run()[ 'passed' ] else 1 )
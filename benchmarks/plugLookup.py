@@ -0,0 +1,69 @@
+'''
+Compares plug lookups through the node cache against the plain string lookups
+NodeUtility.getPlug used to do. Run it from the script editor:
+
+    import marigold.benchmarks.plugLookup as plugLookup
+    plugLookup.run()
+
+It works in a new scene, so save first.
+'''
+import time
+import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import marigold.utility.NodeUtility as NodeUtility
+from marigold.utility.NodeCache import NODE_CACHE
+
+PLUG_NAMES = [ 'translateX', 'translateY', 'translateZ', 'rotate', 'scale', 'visibility' ]
+
+def stringPlug( inObj, inPlugName ):
+    '''
+    The old NodeUtility.getPlug.
+    '''
+    selList = OpenMaya.MSelectionList()
+    selList.add( inObj )
+    mObj = OpenMaya.MObject()
+    selList.getDependNode( 0, mObj )
+    depFn = OpenMaya.MFnDependencyNode()
+    depFn.setObject( mObj )
+    return depFn.findPlug( inPlugName )
+
+def stringAttribute( inDepFn, inAttrName ):
+    return inDepFn.attribute( inAttrName )
+
+def timeLookups( inFunction, inArgs, inRepeats ):
+    '''
+    @param inFunction: Function to time.
+    @param inArgs: List of argument lists to call it with.
+    @param inRepeats: Int. Number of times to go over inArgs.
+    @return: Float. Seconds taken.
+    '''
+    startTime = time.time()
+    for i in xrange( inRepeats ):
+        for args in inArgs:
+            inFunction( *args )
+    return time.time()-startTime
+
+def run( inNodeCount=200, inRepeats=20 ):
+    '''
+    @param inNodeCount: Int. Number of transforms to look plugs up on.
+    @param inRepeats: Int. Number of times each plug is looked up.
+    @return: Dictionary. Seconds taken by each lookup.
+    '''
+    cmds.file( new=True, force=True )
+    nodes = [ cmds.createNode( 'transform', name='plugLookup{0}'.format( i ) ) for i in xrange( inNodeCount ) ]
+    plugArgs = [ [ node, plugName ] for node in nodes for plugName in PLUG_NAMES ]
+    depFns = [ OpenMaya.MFnDependencyNode( NodeUtility.getDependNode( node ) ) for node in nodes ]
+    attrArgs = [ [ depFn, plugName ] for depFn in depFns for plugName in PLUG_NAMES ]
+
+    NODE_CACHE.clear()
+    NODE_CACHE.resetStats()
+    results = { 'stringPlug':timeLookups( stringPlug, plugArgs, inRepeats ),
+                'cachedPlug':timeLookups( NodeUtility.getPlug, plugArgs, inRepeats ),
+                'stringAttribute':timeLookups( stringAttribute, attrArgs, inRepeats ),
+                'cachedAttribute':timeLookups( NodeUtility.getNodeAttribute, attrArgs, inRepeats ) }
+
+    print 'Plug lookups: {0}'.format( len( plugArgs )*inRepeats )
+    for name in [ 'stringPlug', 'cachedPlug', 'stringAttribute', 'cachedAttribute' ]:
+        print '    {0:<16} {1:.4f}s'.format( name, results[ name ] )
+    print 'Cache: {0}'.format( NODE_CACHE.getStats() )
+    return results
@@ -1,11 +1,16 @@
 import maya.cmds as cmds
 import marigold.utility.NodeUtility as NodeUtility
+import marigold.utility.AttributeSchema as AttributeSchema
 
 class BaseComponent( object ):
     '''
     Base class for all meta nodes.
     '''
     nodeType = 'baseComponent'
+    # Attributes every component node has. Subclasses list only their own. See
+    # AttributeSchema for the format.
+    attributes = ( ( 'parentName', 'attributeType', 'message' ),
+                   ( 'classType', 'dataType', 'string' ) )
     
     def __init__( self, node=None ):
         self.node = node
@@ -56,12 +61,11 @@ class BaseComponent( object ):
         cmds.setAttr( '{0}.classType'.format( cons[0] ), cons[1], type='string', lock=cons[2] )
     
     def requiredAttributes( self, *args, **kwargs ):
-        NodeUtility.addPlug( self.newNode, 'parentName', 'attributeType', 'message' )
-        #cmds.addAttr( newNode, longName='parentName', attributeType='message', storable=True )
-        #self.setAttribute( cls(), 'parentName', self.newNode, inNodeName=self.newNode )
-        self.setAttribute( 'parentName', self.newNode, self.newNode )
-        
-        NodeUtility.addPlug( self.newNode, 'classType', 'dataType', 'string' )
+        '''
+        Adds the attributes in the class schema, with their defaults, in one pass.
+        Override to set values that depend on kwargs.
+        '''
+        AttributeSchema.addSchemaAttributes( self.newNode, self.__class__ )
         #cls( self.newNode ).classType = [ self.newNode, self.nodeType, True ]
         self.classType = [ self.newNode, self.nodeType, True ]
         
@@ -0,0 +1,133 @@
+'''
+Registry of the component classes, keyed by nodeType.
+
+Component modules aren't imported until one of their types is asked for. The
+registry knows which module defines each type. Importing that module runs its
+@registerComponent decorators, which add the classes to the registry.
+
+Third-party components are listed in registry files. A registry file is JSON
+mapping node types to the module that defines them:
+
+    { "SpringComponent": "studio.marigold.SpringComponent" }
+
+Set MARIGOLD_COMPONENT_REGISTRY to the files to read, separated with os.pathsep.
+Types in the files override the built-in ones. The files are read again when the
+variable changes.
+
+Nothing in here imports Maya or Qt.
+'''
+import json
+import os
+
+COMPONENT_REGISTRY_ENV = 'MARIGOLD_COMPONENT_REGISTRY'
+
+# Modules defining the built-in components, keyed by nodeType.
+BUILTIN_COMPONENTS = { 'BasicJointComponent':'marigold.components.joints.BasicJoint',
+                       'GLBoxControlComponent':'marigold.components.controls.GLBoxControl',
+                       'CurveControlComponent':'marigold.components.controls.CurveControl',
+                       'ModuleRootComponent':'marigold.components.roots.ModuleRoot',
+                       'CharacterRootComponent':'marigold.components.roots.CharacterRoot' }
+
+def readRegistryFile( inFile ):
+    '''
+    @param inFile: String. Path to a registry file.
+    @return: Dictionary. Module names keyed by nodeType.
+    '''
+    with open( inFile, 'r' ) as f:
+        modules = json.load( f )
+    if not isinstance( modules, dict ):
+        raise ValueError( 'Component registry {0} must hold a JSON object.'.format( inFile ) )
+    return dict( ( str( nodeType ), str( moduleName ) ) for nodeType, moduleName in modules.iteritems() )
+
+class ComponentRegistry( object ):
+    '''
+    Component classes, and the modules that define the ones not loaded yet.
+    '''
+    def __init__( self ):
+        self._classes = {}
+        self._modules = None
+        self._environmentKey = None
+
+    def register( self, inClass ):
+        '''
+        Adds a component class under its nodeType. Replaces any class already
+        registered under that type.
+
+        @param inClass: Class. A BaseComponent subclass.
+        @return: Class. inClass, so this can be used as a decorator.
+        '''
+        self._classes[ inClass.nodeType ] = inClass
+        return inClass
+
+    def getComponentClass( self, inNodeType ):
+        '''
+        Gets a component class, importing its module if it isn't loaded yet.
+
+        @param inNodeType: String. nodeType of the component.
+        @return: Class.
+        '''
+        componentClass = self._classes.get( inNodeType )
+        if componentClass is None:
+            moduleName = self.getModules().get( inNodeType )
+            if moduleName is None:
+                raise NameError( "%s doesn't exist." % inNodeType )
+            __import__( moduleName )
+            componentClass = self._classes.get( inNodeType )
+            if componentClass is None:
+                raise NameError( '{0} is not registered by {1}.'.format( inNodeType, moduleName ) )
+        return componentClass
+
+    def isLoaded( self, inNodeType ):
+        '''
+        @param inNodeType: String. nodeType of the component.
+        @return: Bool. The class has been imported and registered.
+        '''
+        return inNodeType in self._classes
+
+    def getNodeTypes( self ):
+        '''
+        @return: List of strings. Every known nodeType, loaded or not.
+        '''
+        return sorted( set( self._classes ) | set( self.getModules() ) )
+
+    def getModules( self ):
+        '''
+        @return: Dictionary. Module names keyed by nodeType, from the built-in list
+            and the registry files.
+        '''
+        environmentKey = os.environ.get( COMPONENT_REGISTRY_ENV )
+        if self._modules is None or environmentKey != self._environmentKey:
+            modules = dict( BUILTIN_COMPONENTS )
+            for path in ( environmentKey or '' ).split( os.pathsep ):
+                if not path:
+                    continue
+                try:
+                    modules.update( readRegistryFile( os.path.expanduser( path ) ) )
+                except ( IOError, ValueError ) as e:
+                    # A broken registry file shouldn't stop the built-in components.
+                    print 'Skipping component registry {0}: {1}'.format( path, e )
+            self._modules = modules
+            self._environmentKey = environmentKey
+        return self._modules
+
+    def loadAll( self ):
+        '''
+        Imports every known component module.
+
+        @return: List of classes. Every registered component class.
+        '''
+        for nodeType in self.getNodeTypes():
+            self.getComponentClass( nodeType )
+        return [ self._classes[ nodeType ] for nodeType in sorted( self._classes ) ]
+
+# The registry shared by everything in the process.
+COMPONENT_REGISTRY = ComponentRegistry()
+
+def registerComponent( inClass ):
+    '''
+    Class decorator that adds a component class to COMPONENT_REGISTRY.
+
+    @param inClass: Class. A BaseComponent subclass.
+    @return: Class. inClass.
+    '''
+    return COMPONENT_REGISTRY.register( inClass )
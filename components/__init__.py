@@ -1,14 +1,21 @@
 import sys, types
 import maya.cmds as cmds
 import marigold.utility.NodeUtility as NodeUtility
+from marigold.utility.ConnectionSnapshot import ConnectionSnapshot
+from marigold.utility.AncestryResolver import ANCESTRY_RESOLVER
 
 # IMPORT COMPONENTS
+# Component classes are loaded by COMPONENT_REGISTRY the first time their type is
+# asked for. Use getComponentClass to get one.
 from BaseComponent import BaseComponent
-from joints.BasicJoint import BasicJointComponent
-from controls.GLBoxControl import GLBoxControlComponent
-from controls.CurveControl import CurveControlComponent
-from roots.ModuleRoot import ModuleRootComponent
-from roots.CharacterRoot import CharacterRootComponent
+from ComponentRegistry import COMPONENT_REGISTRY, registerComponent
+
+def getComponentClass( inNodeType ):
+    '''
+    @param inNodeType: String. nodeType of the component, for example 'ModuleRootComponent'.
+    @return: Class. The component class. Its module is imported if needed.
+    '''
+    return COMPONENT_REGISTRY.getComponentClass( inNodeType )
 
 def str_to_class( field ):
     '''
@@ -16,6 +23,11 @@ def str_to_class( field ):
     @param field: String. Name of a class.
     @return: Instance of class.
     '''
+    try:
+        return COMPONENT_REGISTRY.getComponentClass( field )
+    except NameError:
+        pass
+    # Not a registered component, for example BaseComponent.
     try:
         identifier = getattr(sys.modules[__name__], field)
     except AttributeError:
@@ -38,44 +50,71 @@ def findComponent( inObjectName, inComponentType ):
             compMatch = comp
     return compMatch
 
-def getComponents( inObj ):
+def getComponents( inObj, inSnapshot=None ):
     '''
-    Creates the components GUI.
+    Gets the components of a bit.
+    
+    @param inObj: String. Name of the bit.
+    @param inSnapshot: ConnectionSnapshot. Connections to read from. One is made for
+        the bit if not passed in.
+    @return: Dictionary. Class type keyed by component node. None if the bit has no
+        components.
     '''    
-    if inObj is not None:
-        components_list = NodeUtility.getFrameBitSettings( inObj )
-    else:
-        components_list = None
+    if inObj is None:
+        return None
+    return getBitComponents( [ inObj ], inSnapshot )[ inObj ] or None
+
+def getBitComponents( inBits, inSnapshot=None ):
+    '''
+    Gets the components of many bits in one pass. Each bit's message connections
+    are read once, and only classType is read from the component nodes.
     
-    # If the newly selected bit has components then update the UI to show them.
-    # Check to see if any of the components are connected to a meta node.
-    # We do this check so that we don't create a bunch of UI elements
-    # unnecessarily.
-    if components_list is not None and metaNodeCheck( inObj, components_list ):            
-        # Loop through each component on the bit.
-        components_class_list = {}
-        for node_name in components_list:
-            # Check to see if the component is connected to a meta node.
-            metaNode = NodeUtility.getNodeAttrDestination( inObj, node_name )
-            if metaNode:
-                # It has a meta node.
-                # Get the meta node properties. This returns a dict.
-                meta_properties = NodeUtility.getFrameBitSettings( metaNode[0] )
-                component_class = meta_properties[ 'classType' ]
-                # test hack!!!
-                components_class_list[ node_name ] = component_class
-        return components_class_list
-    else:
+    @param inBits: List of strings. Names of the bits.
+    @param inSnapshot: ConnectionSnapshot. Connections to read from. One is made for
+        the bits if not passed in.
+    @return: Dictionary. { component node: class type } keyed by bit. Bits without
+        components get an empty dictionary.
+    '''
+    if inSnapshot is None:
+        inSnapshot = ConnectionSnapshot( inBits )
+    classTypes = {}
+    bitComponents = {}
+    for bit in inBits:
+        bitComponents[ bit ] = {}
+        for source, destinations in inSnapshot.getConnections( bit ).itervalues():
+            for destination in destinations:
+                # Components hang off the bit by their parentName plug.
+                node, attr = destination.split( '.', 1 )
+                if attr != 'parentName':
+                    continue
+                if node not in classTypes:
+                    classTypes[ node ] = getClassType( node )
+                if classTypes[ node ] is not None:
+                    bitComponents[ bit ][ node ] = classTypes[ node ]
+    return bitComponents
+
+def getClassType( inNode ):
+    '''
+    @param inNode: String. Name of a component node.
+    @return: String. Class type of the node. None if it doesn't have one.
+    '''
+    try:
+        plug = NodeUtility.getPlug( inNode, 'classType' )
+    except RuntimeError:
         return None
+    return NodeUtility.getPlugValue( plug )
 
-def metaNodeCheck( inObj, inComponents ):
+def metaNodeCheck( inObj, inComponents, inSnapshot=None ):
     '''
     Checks if the component plug of an object has a meta node connected.
     @param inObj: String. Name of the selected object.
     @param inComponents: List of connected components to the selected object.
+    @param inSnapshot: ConnectionSnapshot. Connections to read from.
     '''    
+    if inSnapshot is None:
+        inSnapshot = ConnectionSnapshot( [ inObj ] )
     for comName in inComponents:
-        metaNode = NodeUtility.getNodeAttrDestination( inObj, comName )
+        metaNode = inSnapshot.getNodeAttrDestination( inObj, comName )
         if metaNode:
             return True
     return False
@@ -108,19 +147,12 @@ def addComponentToObject( inClassType, **kwargs ):
     
 def searchModule( inObjectName, inComponentType ):
     '''
-    Recursively searches a module for the component that matches the passed in type.
-    This is an upward search.
+    Searches a module for the component that matches the passed in type.
+    This is an upward search, starting at the object itself.
     
     @param inObjectName: String. Name of object.
     @param inComponentType: String. Name of component class.
-    @return: List. Name of object with the module meta component and the name of the meta
-                    component node.
+    @return: List. Full path of the object with the module meta component and the name of the meta
+                    component node. None if no object up to the world has the component.
     '''    
-    objSearch = findComponent( inObjectName, inComponentType )
-    
-    if objSearch is not None:
-        return inObjectName, objSearch
-    
-    if objSearch is None:
-        objParent = cmds.listRelatives( inObjectName, parent=True, fullPath=True )
-        return searchModule( objParent[0], inComponentType )
\ No newline at end of file
+    return ANCESTRY_RESOLVER.findAncestor( inObjectName, inComponentType )
\ No newline at end of file
@@ -1,9 +1,52 @@
 import maya.cmds as cmds
 from marigold.components.BaseComponent import BaseComponent
+from marigold.components.ComponentRegistry import registerComponent
 import marigold.utility.NodeUtility as NodeUtility
 
+@registerComponent
 class GLBoxControlComponent( BaseComponent ):
     nodeType = 'GLBoxControlComponent'
+    attributes = ( ( 'controlName', 'dataType', 'string' ),
+                   # The GLBox attributes.
+                   #kLongName = '-name' SKIPPING
+                   #kLongPosition = '-position'
+                   ( 'position', 'attributeType', 'float3' ),
+                   #kLongLineWidth = '-lineWidth'
+                   ( 'lineWidth', 'attributeType', 'float' ),
+                   #kLongRotate = '-rotate'
+                   ( 'rotate', 'attributeType', 'float3' ),
+                   #kLongTransparency = '-alpha'
+                   ( 'alpha', 'attributeType', 'float' ),
+                   #kLongBackAlpha = '-backAlpha'
+                   ( 'backAlpha', 'attributeType', 'float' ),
+                   #kLongColor = '-color'
+                   ( 'color', 'attributeType', 'float3' ),
+                   #kLongDrawType = '-drawType'
+                   # Same values and default as the GLBox node's enum. 2 is normal.
+                   ( 'drawType', 'attributeType', 'byte', 2 ),
+                   #kLongWidth = '-width'
+                   ( 'width', 'attributeType', 'float' ),
+                   #kLongHeight = '-height'
+                   ( 'height', 'attributeType', 'float' ),
+                   #kLongDepth = '-depth'
+                   ( 'depth', 'attributeType', 'float' ),
+                   #kLongTopFrontRight = '-topFrontRight'
+                   ( 'topFrontRight', 'attributeType', 'float3' ),
+                   #kLongTopFrontLeft = '-topFrontLeft'
+                   ( 'topFrontLeft', 'attributeType', 'float3' ),
+                   #kLongTopBackRight = '-topBackRight'
+                   ( 'topBackRight', 'attributeType', 'float3' ),
+                   #kLongTopBackLeft = '-topBackLeft'
+                   ( 'topBackLeft', 'attributeType', 'float3' ),
+                   #kLongBotFrontRight = '-botFrontRight'
+                   ( 'botFrontRight', 'attributeType', 'float3' ),
+                   #kLongBotFrontLeft = '-botFrontLeft'
+                   ( 'botFrontLeft', 'attributeType', 'float3' ),
+                   #kLongBotBackRight = '-botBackRight'
+                   ( 'botBackRight', 'attributeType', 'float3' ),
+                   #kLongBotBackLeft = '-botBackLeft'
+                   ( 'botBackLeft', 'attributeType', 'float3' ),
+                   )
     def __init__( self, node=None, *args, **kwargs ):
         self.node = node
         super( GLBoxControlComponent, self ).__init__( node=self.node )
@@ -19,49 +62,6 @@ class GLBoxControlComponent( BaseComponent ):
     -save information about gl control on the node
         -should have all the properties of the gl control
     '''
-    def requiredAttributes( self ):
-        super( GLBoxControlComponent, self ).requiredAttributes()
-        NodeUtility.addPlug( self.newNode, 'controlName', 'dataType', 'string' )
-        
-        # Add the GLBox attributes.
-        #kLongName = '-name' SKIPPING
-        #kLongPosition = '-position'
-        NodeUtility.addPlug( self.newNode, 'position', 'attributeType', '' )
-        #kLongLineWidth = '-lineWidth'
-        NodeUtility.addPlug( self.newNode, 'lineWidth', 'attributeType', 'float' )
-        #kLongRotate = '-rotate'
-        NodeUtility.addPlug( self.newNode, 'rotate', '', '' )
-        #kLongTransparency = '-alpha'
-        NodeUtility.addPlug( self.newNode, 'alpha', 'attributeType', 'float' )
-        #kLongBackAlpha = '-backAlpha'
-        NodeUtility.addPlug( self.newNode, 'backAlpha', 'attributeType', 'float' )
-        #kLongColor = '-color'
-        NodeUtility.addPlug( self.newNode, 'color', '', '' )
-        #kLongDrawType = '-drawType'
-        NodeUtility.addPlug( self.newNode, 'drawType', '', '' )
-        #kLongWidth = '-width'
-        NodeUtility.addPlug( self.newNode, 'width', 'attributeType', 'float' )
-        #kLongHeight = '-height'
-        NodeUtility.addPlug( self.newNode, 'height', 'attributeType', 'float' )
-        #kLongDepth = '-depth'
-        NodeUtility.addPlug( self.newNode, 'depth', 'attributeType', 'float' )
-        #kLongTopFrontRight = '-topFrontRight'
-        NodeUtility.addPlug( self.newNode, 'topFrontRight', '', '' )
-        #kLongTopFrontLeft = '-topFrontLeft'
-        NodeUtility.addPlug( self.newNode, 'topFrontLeft', '', '' )
-        #kLongTopBackRight = '-topBackRight'
-        NodeUtility.addPlug( self.newNode, 'topBackRight', '', '' )
-        #kLongTopBackLeft = '-topBackLeft'
-        NodeUtility.addPlug( self.newNode, 'topBackLeft', '', '' )
-        #kLongBotFrontRight = '-botFrontRight'
-        NodeUtility.addPlug( self.newNode, 'botFrontRight', '', '' )
-        #kLongBotFrontLeft = '-botFrontLeft'
-        NodeUtility.addPlug( self.newNode, 'botFrontLeft', '', '' )
-        #kLongBotBackRight = '-botBackRight'
-        NodeUtility.addPlug( self.newNode, 'botBackRight', '', '' )
-        #kLongBotBackLeft = '-botBackLeft'
-        NodeUtility.addPlug( self.newNode, 'botBackLeft', '', '' )
-    
     @classmethod
     def buildNode( cls, nodeName ):
         '''
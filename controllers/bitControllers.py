@@ -9,6 +9,7 @@ import maya.OpenMayaRender as OpenMayaRender
 import maya.OpenMayaUI as OpenMayaUI
 import marigold.utility.NodeUtility as NodeUtility
 import marigold.utility.TransformUtility as TransformUtility
+import marigold.utility.BatchUtility as BatchUtility
 
 glRenderer = OpenMayaRender.MHardwareRenderer.theRenderer()
 glFT = glRenderer.glFunctionTable()
@@ -33,6 +34,7 @@ glSpanner_nodeID = OpenMaya.MTypeId( 0x1001F )
 COMMAND: Flags.
 '''
 cmdName = 'makeGLBit'
+batchCmdName = BatchUtility.BATCH_COMMAND
 kShortType = '-ot'
 kLongType = '-objecttype'
 kShortName = '-n'
@@ -233,32 +235,32 @@ class glBox( OpenMayaMPx.MPxLocatorNode ):
         trX= OpenMaya.MPlug( self.thisMObject(), self.localPositionX ).asFloat()
         trY= OpenMaya.MPlug( self.thisMObject(), self.localPositionY ).asFloat()
         trZ= OpenMaya.MPlug( self.thisMObject(), self.localPositionZ ).asFloat()
-        lw = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'lineWidth' ) ).asInt()
-        rt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'rotate' ) )
-        a = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'transparency' ) ).asFloat()
-        ba = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'backAlpha' ) ).asFloat()
-        dt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawType' ) ).asInt()
-        width = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'width' ) ).asFloat()#X
-        height = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'height' ) ).asFloat()#Y
-        depth = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'depth' ) ).asFloat()#Z
+        lw = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'lineWidth' ) ).asInt()
+        rt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rotate' ) )
+        a = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'transparency' ) ).asFloat()
+        ba = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'backAlpha' ) ).asFloat()
+        dt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawType' ) ).asInt()
+        width = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'width' ) ).asFloat()#X
+        height = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'height' ) ).asFloat()#Y
+        depth = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'depth' ) ).asFloat()#Z
         rotation = NodeUtility.getPlugValue( rt )
         
         # Color for object.
-        cl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'color' ))
+        cl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'color' ))
         color = NodeUtility.getPlugValue( cl )
         ( r, g, b ) = tuple( color )[:3]
         
         # Color for children lines.
-        clc = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'childLinkColor' ) )
+        clc = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childLinkColor' ) )
         childColor = NodeUtility.getPlugValue( clc )
         ( cr, cg, cb ) = tuple( childColor )[:3]
-        ca = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childTransparency' ) ).asFloat()
-        car = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowRadius' ) ).asFloat()
-        cas = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowSegments' ) ).asInt()
-        arl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'arrowLength' ) ).asFloat()
+        ca = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childTransparency' ) ).asFloat()
+        car = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowRadius' ) ).asFloat()
+        cas = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowSegments' ) ).asInt()
+        arl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'arrowLength' ) ).asFloat()
         
         # Get vectors for drawing lines between this node and it's children.
-        mPlug = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'targetWorldMatrix' ) )
+        mPlug = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'targetWorldMatrix' ) )
         childrenList = []
         for i in xrange( mPlug.numElements() ):
             childPlug = mPlug.elementByPhysicalIndex( i )
@@ -519,32 +521,32 @@ class glSphere( OpenMayaMPx.MPxLocatorNode ):
         slX= OpenMaya.MPlug( self.thisMObject(), self.localScaleX ).asFloat()
         slY= OpenMaya.MPlug( self.thisMObject(), self.localScaleY ).asFloat()
         slZ= OpenMaya.MPlug( self.thisMObject(), self.localScaleZ ).asFloat()
-        lw = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'lineWidth' ) ).asInt()
-        rt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'rotate' ) )
-        a = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'transparency' ) ).asFloat()
-        ba = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'backAlpha' ) ).asFloat()
-        dt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawType' ) ).asInt()
-        lat = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'latitude' ) ).asInt()
-        long = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'longitude' ) ).asInt()
-        rad = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'radius' ) ).asFloat()
+        lw = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'lineWidth' ) ).asInt()
+        rt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rotate' ) )
+        a = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'transparency' ) ).asFloat()
+        ba = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'backAlpha' ) ).asFloat()
+        dt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawType' ) ).asInt()
+        lat = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'latitude' ) ).asInt()
+        long = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'longitude' ) ).asInt()
+        rad = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'radius' ) ).asFloat()
         rotation = NodeUtility.getPlugValue( rt )
         
         # Color for object.
-        cl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'color' ) )
+        cl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'color' ) )
         color = NodeUtility.getPlugValue( cl )
         ( r, g, b ) = tuple( color )[:3]
         
         # Color for children lines.
-        clc = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'childLinkColor' ) )
+        clc = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childLinkColor' ) )
         childColor = NodeUtility.getPlugValue( clc )
         ( cr, cg, cb ) = tuple( childColor )[:3]
-        ca = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childTransparency' ) ).asFloat()
-        car = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowRadius' ) ).asFloat()
-        cas = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowSegments' ) ).asInt()
-        arl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'arrowLength' ) ).asFloat()
+        ca = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childTransparency' ) ).asFloat()
+        car = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowRadius' ) ).asFloat()
+        cas = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowSegments' ) ).asInt()
+        arl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'arrowLength' ) ).asFloat()
         
         # Get vectors for drawing lines between this node and it's children.
-        mPlug = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'targetWorldMatrix' ) )
+        mPlug = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'targetWorldMatrix' ) )
         childrenList = []
         for i in xrange( mPlug.numElements() ):
             childPlug = mPlug.elementByPhysicalIndex( i )
@@ -760,33 +762,33 @@ class glCylinder( OpenMayaMPx.MPxLocatorNode ):
         slY= OpenMaya.MPlug( self.thisMObject(), self.localScaleY ).asFloat()
         slZ= OpenMaya.MPlug( self.thisMObject(), self.localScaleZ ).asFloat()
         socketNode = OpenMaya.MFnDependencyNode( self.thisMObject() )
-        lw = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'lineWidth' ) ).asInt()
-        rt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'rotate' ) )
-        a = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'transparency' ) ).asFloat()
-        ba = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'backAlpha' ) ).asFloat()
-        dt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawType' ) ).asInt()
-        dp = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawPlace' ) ).asInt()
-        rad = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'radius' ) ).asFloat()
-        seg = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'segment' ) ).asInt()
-        cLen = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'cylinderLength' ) ).asFloat()
+        lw = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'lineWidth' ) ).asInt()
+        rt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rotate' ) )
+        a = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'transparency' ) ).asFloat()
+        ba = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'backAlpha' ) ).asFloat()
+        dt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawType' ) ).asInt()
+        dp = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawPlace' ) ).asInt()
+        rad = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'radius' ) ).asFloat()
+        seg = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'segment' ) ).asInt()
+        cLen = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'cylinderLength' ) ).asFloat()
         rotation = NodeUtility.getPlugValue( rt )
         
         # Color for object.
-        cl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ('color'))
+        cl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'color' ))
         color = NodeUtility.getPlugValue( cl )
         ( r, g, b ) = tuple( color )[:3]
         
         # Color for children lines.
-        clc = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'childLinkColor' ) )
+        clc = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childLinkColor' ) )
         childColor = NodeUtility.getPlugValue( clc )
         ( cr, cg, cb ) = tuple( childColor )[:3]
-        ca = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childTransparency' ) ).asFloat()
-        car = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowRadius' ) ).asFloat()
-        cas = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowSegments' ) ).asInt()
-        arl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'arrowLength' ) ).asFloat()
+        ca = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childTransparency' ) ).asFloat()
+        car = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowRadius' ) ).asFloat()
+        cas = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowSegments' ) ).asInt()
+        arl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'arrowLength' ) ).asFloat()
         
         # Get vectors for drawing lines between this node and it's children.
-        mPlug = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'targetWorldMatrix' ) )
+        mPlug = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'targetWorldMatrix' ) )
         childrenList = []
         for i in xrange( mPlug.numElements() ):
             childPlug = mPlug.elementByPhysicalIndex( i )
@@ -1059,33 +1061,33 @@ class glCone( OpenMayaMPx.MPxLocatorNode ):
         slY= OpenMaya.MPlug( self.thisMObject(), self.localScaleY ).asFloat()
         slZ= OpenMaya.MPlug( self.thisMObject(), self.localScaleZ ).asFloat()
         socketNode = OpenMaya.MFnDependencyNode( self.thisMObject() )
-        lw = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'lineWidth' ) ).asInt()
-        rt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'rotate' ) )
-        a = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'transparency' ) ).asFloat()
-        ba = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'backAlpha' ) ).asFloat()
-        dt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawType' ) ).asInt()
-        dp = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawPlace' ) ).asInt()
-        rad = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'radius' ) ).asFloat()
-        seg = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'segment' ) ).asInt()
-        cLen = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'coneLength' ) ).asFloat()
+        lw = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'lineWidth' ) ).asInt()
+        rt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rotate' ) )
+        a = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'transparency' ) ).asFloat()
+        ba = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'backAlpha' ) ).asFloat()
+        dt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawType' ) ).asInt()
+        dp = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawPlace' ) ).asInt()
+        rad = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'radius' ) ).asFloat()
+        seg = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'segment' ) ).asInt()
+        cLen = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'coneLength' ) ).asFloat()
         rotation = NodeUtility.getPlugValue( rt )
         
         # Object color.
-        cl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ('color'))
+        cl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'color' ))
         color = NodeUtility.getPlugValue( cl )
         ( r, g, b ) = tuple( color )[:3]
         
         # Color for children lines.
-        clc = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'childLinkColor' ) )
+        clc = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childLinkColor' ) )
         childColor = NodeUtility.getPlugValue( clc )
         ( cr, cg, cb ) = tuple( childColor )[:3]
-        cat = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childTransparency' ) ).asFloat()
-        car = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowRadius' ) ).asFloat()
-        cas = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowSegments' ) ).asInt()
-        arl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'arrowLength' ) ).asFloat()
+        cat = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childTransparency' ) ).asFloat()
+        car = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowRadius' ) ).asFloat()
+        cas = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowSegments' ) ).asInt()
+        arl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'arrowLength' ) ).asFloat()
         
         # Get vectors for drawing lines between this node and it's children.
-        mPlug = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'targetWorldMatrix' ) )
+        mPlug = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'targetWorldMatrix' ) )
         childrenList = []
         for i in xrange( mPlug.numElements() ):
             childPlug = mPlug.elementByPhysicalIndex( i )
@@ -1341,34 +1343,34 @@ class glTorus( OpenMayaMPx.MPxLocatorNode ):
         slX= OpenMaya.MPlug( self.thisMObject(), self.localScaleX ).asFloat()
         slY= OpenMaya.MPlug( self.thisMObject(), self.localScaleY ).asFloat()
         slZ= OpenMaya.MPlug( self.thisMObject(), self.localScaleZ ).asFloat()
-        lw = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'lineWidth' ) ).asInt()
-        rt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'rotate' ) )
-        a = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'transparency' ) ).asFloat()
-        ba = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'backAlpha' ) ).asFloat()
-        dt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawType' ) ).asInt()
-        dp = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawPlace' ) ).asInt()
-        sides = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'sides' ) ).asInt()
-        rings = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'rings' ) ).asInt()
-        outRad = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'outerRadius' ) ).asFloat()
-        inRad = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'innerRadius' ) ).asFloat()
+        lw = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'lineWidth' ) ).asInt()
+        rt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rotate' ) )
+        a = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'transparency' ) ).asFloat()
+        ba = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'backAlpha' ) ).asFloat()
+        dt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawType' ) ).asInt()
+        dp = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawPlace' ) ).asInt()
+        sides = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'sides' ) ).asInt()
+        rings = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rings' ) ).asInt()
+        outRad = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'outerRadius' ) ).asFloat()
+        inRad = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'innerRadius' ) ).asFloat()
         rotation = NodeUtility.getPlugValue( rt )
         
         # Object color.
-        cl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ('color') )
+        cl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'color' ) )
         color = NodeUtility.getPlugValue( cl )
         ( r, g, b ) = tuple( color )[:3]
         
         # Color for children lines.
-        clc = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'childLinkColor' ) )
+        clc = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childLinkColor' ) )
         childColor = NodeUtility.getPlugValue( clc )
         ( cr, cg, cb ) = tuple( childColor )[:3]
-        ca = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childTransparency' ) ).asFloat()
-        car = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowRadius' ) ).asFloat()
-        cas = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'childArrowSegments' ) ).asInt()
-        arl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'arrowLength' ) ).asFloat()
+        ca = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childTransparency' ) ).asFloat()
+        car = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowRadius' ) ).asFloat()
+        cas = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'childArrowSegments' ) ).asInt()
+        arl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'arrowLength' ) ).asFloat()
         
         # Get vectors for drawing lines between this node and it's children.
-        mPlug = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'targetWorldMatrix' ) )
+        mPlug = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'targetWorldMatrix' ) )
         childrenList = []
         for i in xrange( mPlug.numElements() ):
             childPlug = mPlug.elementByPhysicalIndex( i )
@@ -1628,15 +1630,15 @@ class glSpanner( OpenMayaMPx.MPxLocatorNode ):
         trX= OpenMaya.MPlug( self.thisMObject(), self.localPositionX ).asFloat()
         trY= OpenMaya.MPlug( self.thisMObject(), self.localPositionY ).asFloat()
         trZ= OpenMaya.MPlug( self.thisMObject(), self.localPositionZ ).asFloat()
-        lw = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'lineWidth' ) ).asInt()
-        rt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'rotate' ) )
-        a = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'transparency' ) ).asFloat()
-        ba = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'backAlpha' ) ).asFloat()
-        cl = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'color' ))
-        dt = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute ( 'drawType' ) ).asInt()
+        lw = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'lineWidth' ) ).asInt()
+        rt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'rotate' ) )
+        a = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'transparency' ) ).asFloat()
+        ba = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'backAlpha' ) ).asFloat()
+        cl = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'color' ))
+        dt = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'drawType' ) ).asInt()
         
-        sS = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'spanSource' ) )
-        sT = OpenMaya.MPlug( self.thisMObject(), socketNode.attribute( 'spanTarget' ) )
+        sS = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'spanSource' ) )
+        sT = OpenMaya.MPlug( self.thisMObject(), NodeUtility.getNodeAttribute( socketNode, 'spanTarget' ) )
         
         
         
@@ -2047,6 +2049,34 @@ def syntaxCreator():
     
     return syntax
 
+class applyPlugBatch( OpenMayaMPx.MPxCommand ):
+    '''
+    Runs the PlugBatch handed over by BatchUtility.PlugBatch.run() so the whole
+    batch can be undone in one step.
+    '''
+    def __init__( self ):
+        OpenMayaMPx.MPxCommand.__init__( self )
+        self.batch = None
+        
+    def doIt( self, args ):
+        self.batch = BatchUtility.takePendingBatch()
+        if self.batch is not None:
+            self.redoIt()
+        
+    def redoIt( self ):
+        self.batch.doIt()
+        self.setResult( self.batch.getOperationCount() )
+        
+    def undoIt( self ):
+        self.batch.undoIt()
+        
+    def isUndoable( self ):
+        return self.batch is not None
+
+def batchCmdCreator():
+    ''' Creates an instance of the batch command. '''
+    return OpenMayaMPx.asMPxPtr( applyPlugBatch() )
+
 
 '''
 PLUGIN INIT
@@ -2058,6 +2088,11 @@ def initializePlugin( obj ):
     except:
         sys.stderr.write( 'Failed to register command: {0}'.format( cmdName ) )
         raise
+    try:
+        plugin.registerCommand( batchCmdName, batchCmdCreator )
+    except:
+        sys.stderr.write( 'Failed to register command: {0}'.format( batchCmdName ) )
+        raise
     try:
         plugin.registerNode( glBox_nodeName, glBox_nodeID, glBox_nodeCreator, glBox_nodeInitializer,
                              OpenMayaMPx.MPxNode.kLocatorNode )
@@ -2097,6 +2132,11 @@ def uninitializePlugin( obj ):
     except:
         sys.stderr.write( 'Failed to deregister command: {0}'.format( cmdName ) )
         raise
+    try:
+        plugin.deregisterCommand( batchCmdName )
+    except:
+        sys.stderr.write( 'Failed to deregister command: {0}'.format( batchCmdName ) )
+        raise
     try:
         plugin.deregisterNode( glBox_nodeID )
     except:
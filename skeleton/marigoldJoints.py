@@ -1,6 +1,6 @@
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
-import maya.OpenMayaAnim as OpenMayaAnim
+import marigold.utility.NodeUtility as NodeUtility
 import marigold.utility.TransformUtility as TransformUtility
 
 def createJoint( inJointName, inJointRef, inJointParent=None, inJointRadius=4.0, inPrefix=None ):
@@ -11,73 +11,54 @@ def createJoint( inJointName, inJointRef, inJointParent=None, inJointRadius=4.0,
     @param inParent: MObject. Parent MObject for the new joint.
     @return: The MObject of the joint created.
     '''
-    # Create the joint.
-    dagMod = OpenMaya.MDagModifier()
-    if inJointParent:
-        newJoint = dagMod.createNode( 'joint', inJointParent )
-    else:
-        newJoint = dagMod.createNode( 'joint' )
-    dagMod.doIt()
-        
     # Name the joint.
     if inPrefix is None:
         jointName = inJointName
     else:
         jointName = inPrefix+'_'+inJointName
-    depFn = OpenMaya.MFnDependencyNode( newJoint )
-    depFn.setName( jointName )
-        
-    # Modify the joint.
-    jointFn = OpenMayaAnim.MFnIkJoint()
-    jointFn.setObject( newJoint )
     
-    parentDepNode = OpenMaya.MFnDependencyNode( jointFn.parent( 0 ) )
+    # Create the joint. Everything is done through cmds so the joint is undone
+    # along with the rest of a build.
+    if inJointParent:
+        parentName = OpenMaya.MDagPath.getAPathTo( inJointParent ).fullPathName()
+        newJointName = cmds.createNode( 'joint', name=jointName, parent=parentName )
+    else:
+        parentName = ''
+        newJointName = cmds.createNode( 'joint', name=jointName )
+    # createNode can hand back a short name that isn't unique.
+    jointPath = parentName+'|'+newJointName.rpartition( '|' )[2]
+    
     bitLocalMatrix = TransformUtility.getMatrix( inJointRef, 'matrix' )
     bitWorldMatrix = TransformUtility.getMatrix( inJointRef, 'worldMatrix' )
     
     # Set orientation.
-    if parentDepNode.name() == 'world':
-        #print 'set world euler'
+    if not parentName:
         bitEuler = TransformUtility.getMatrixRotation( bitWorldMatrix, 'euler' )
-        jointFn.setOrientation( bitEuler )
     else:
-        #print 'set local euler'
-        bitEuler = TransformUtility.getMatrixRotation( bitLocalMatrix, 'euler' )                
-        jointFn.setOrientation( bitEuler )
+        bitEuler = TransformUtility.getMatrixRotation( bitLocalMatrix, 'euler' )
+    cmds.setAttr( jointPath+'.jointOrient', *[ OpenMaya.MAngle.internalToUI( angle ) for angle in ( bitEuler.x, bitEuler.y, bitEuler.z ) ] )
     
     # Set position.
     bitWorldTranslationVector = TransformUtility.getMatrixTranslation( bitWorldMatrix, OpenMaya.MSpace.kWorld )
-    if parentDepNode.name() == 'world':
+    if not parentName:
         # If the joint's parent is the world, then we take the translation vector straight
         # from the frame bit's world matrix.
         jointVector = bitWorldTranslationVector
-        space = OpenMaya.MSpace.kTransform
     else:
         # If the joint's parent is another joint, then we need to get the parent's world
         # matrix and use it as a change of basis for the frame bit's world matrix.
-        parentMatrix = TransformUtility.getMatrix( parentDepNode.name(), 'worldMatrix' )
+        parentMatrix = TransformUtility.getMatrix( parentName, 'worldMatrix' )
         basisMatrix = bitWorldMatrix * parentMatrix.inverse()            
         jointVector = TransformUtility.getMatrixTranslation( basisMatrix, OpenMaya.MSpace.kWorld )
-        space = OpenMaya.MSpace.kWorld
-    jointFn.setTranslation( jointVector, space )
+    cmds.setAttr( jointPath+'.translate', *[ OpenMaya.MDistance.internalToUI( distance ) for distance in ( jointVector.x, jointVector.y, jointVector.z ) ] )
     
     # Set rotation order.
     # TODO
     
-    # Set rotation.
-    #if parentDepNode.name() == 'world':
-        #print 'set world euler'
-        #bitEuler = TransformUtility.getMatrixRotation( bitWorldMatrix, 'euler' )
-        #jointFn.setRotation( bitEuler )
-    #else:
-        #print 'set local euler'
-        #bitEuler = TransformUtility.getMatrixRotation( bitLocalMatrix, 'euler' )                
-        #jointFn.setRotation( bitEuler )
-    
     # Set preferred angle.
     # TODO
     
     # Set joint radius.
-    cmds.setAttr( jointName+'.radius', inJointRadius )
+    cmds.setAttr( jointPath+'.radius', inJointRadius )
     
-    return newJoint
\ No newline at end of file
+    return NodeUtility.getDependNode( jointPath )
\ No newline at end of file
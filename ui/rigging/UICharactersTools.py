@@ -4,6 +4,8 @@ from PySide import QtGui
 import maya.cmds as cmds
 import marigold.utility.NodeUtility as NodeUtility
 import marigold.utility.XMLUtility as XMLUtility
+import marigold.utility.PresetCatalog as PresetCatalog
+import marigold.utility.CharacterBuild as CharacterBuild
 import marigold.components as Components
 from marigold.ui import clearLayout
 import marigold.ui.widgets.QTWidgets as QTWidgets
@@ -73,6 +75,9 @@ class UICharacterTools( QtGui.QWidget ):
         editModulesBtn = QTWidgets.imageTextButton( 'Edit Character Modules', ':/riggingUI/icons/icon_match_translation.png', [16,16] )
         editModulesBtn.clicked.connect( lambda:self.characterModulePromptTrigger() )
         
+        refreshPresetsBtn = QTWidgets.imageTextButton( 'Refresh Presets', ':/riggingUI/icons/icon_match_all.png', [16,16] )
+        refreshPresetsBtn.clicked.connect( lambda:self.refreshPresets() )
+        
         #--Button grid layout.
         toolsGrid = QtGui.QGridLayout()
         toolsGrid.setColumnMinimumWidth( 0, 100 )
@@ -84,6 +89,7 @@ class UICharacterTools( QtGui.QWidget ):
         toolsGrid.addWidget( saveCharacterBtn, 0, 1 )
         toolsGrid.addWidget( buildCharacterBtn, 0, 2 )
         toolsGrid.addWidget( editModulesBtn, 1, 0 )
+        toolsGrid.addWidget( refreshPresetsBtn, 1, 1 )
         
         
         # SETUP LAYOUT
@@ -136,10 +142,18 @@ class UICharacterTools( QtGui.QWidget ):
         clearLayout( self.scrollLayout )
 
         presetsPath = '{0}{1}/'.format( XMLUtility.FRAME_PRESETS_PATH, 'characters' )
-        latticePresets = XMLUtility.getXMLInFolder( presetsPath )
+        latticePresets = XMLUtility.getPresetCatalog().listPresets( inFolder=presetsPath, inFormat='xml' )
         for lattice in latticePresets:
-            description = 'From here you can search these documents. Enter your search words into the box below and click /"search/".'
-            self.scrollLayout.addWidget( QTWidgets.latticeCard( 'characters', lattice, description, parent=self.scrollLayout ) )
+            description = PresetCatalog.describePreset( lattice )
+            self.scrollLayout.addWidget( QTWidgets.latticeCard( 'characters', lattice['name'], description, parent=self.scrollLayout ) )
+    
+    def refreshPresets( self ):
+        '''
+        Picks up character presets written over in place outside marigold. Presets
+        added or removed on disk show up the next time the cards are updated.
+        '''
+        XMLUtility.getPresetCatalog().refresh()
+        self.updateCards()
         
     def characterPriorityPromptTrigger( self ):
         '''
@@ -153,11 +167,13 @@ class UICharacterTools( QtGui.QWidget ):
         Save the character into an XML file for re-use.
         '''        
         charNode = self.characterDict[self.SAVE_SELECTED_CHARACTER]
-        charBitName = Components.CharacterRootComponent( charNode ).parentNode[0]
+        charBitName = Components.getComponentClass( 'CharacterRootComponent' )( charNode ).parentNode[0]
         XMLUtility.writeModuleXML( charBitName, 'characters', self.SAVE_SELECTED_CHARACTER )
         
     def buildCharacter( self ):
         '''
         Build the character selected by the user.
         '''
-        print 'BUILDING: {0}'.format( self.SAVE_SELECTED_CHARACTER )
\ No newline at end of file
+        print 'BUILDING: {0}'.format( self.SAVE_SELECTED_CHARACTER )
+        charNode = self.characterDict[self.SAVE_SELECTED_CHARACTER]
+        CharacterBuild.buildCharacter( charNode )
\ No newline at end of file
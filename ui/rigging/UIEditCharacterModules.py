@@ -5,6 +5,7 @@ import maya.cmds as cmds
 import maya.OpenMayaUI as omui
 
 import marigold.utility.NodeUtility as NodeUtility
+from marigold.utility.ConnectionSnapshot import ConnectionSnapshot
 import marigold.components as Components
 
 
@@ -22,7 +23,7 @@ def getCharacterChildrenModules( inCharNode ):
     @return: String[]. Each module component node name.
     '''
     # Get the children
-    bitName = Components.CharacterRootComponent( inCharNode ).parentNode[0]
+    bitName = Components.getComponentClass( 'CharacterRootComponent' )( inCharNode ).parentNode[0]
     
     children = cmds.listRelatives( bitName, type='transform', allDescendents=True, fullPath=True )
     modules = []
@@ -109,8 +110,9 @@ class EditCharacterModules( QtGui.QDialog ):
         self.conMods = {}
         self.disMods = {}
         
+        snapshot = ConnectionSnapshot( modList )
         for mod in modList:
-            charRoot = NodeUtility.getNodeAttrSource( mod, 'characterRoot' )
+            charRoot = snapshot.getNodeAttrSource( mod, 'characterRoot' )
             moduleName = cmds.getAttr( '{0}.moduleName'.format( mod ) )
             if charRoot is not None:
                 self.conMods[moduleName] = mod
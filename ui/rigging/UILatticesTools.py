@@ -13,6 +13,7 @@ import maya.cmds as cmds
 from marigold.ui import clearLayout
 import marigold.ui.widgets.QTWidgets as QTWidgets
 import marigold.utility.XMLUtility as XMLUtility
+import marigold.utility.PresetCatalog as PresetCatalog
 import marigold.utility.NodeUtility as NodeUtility
 import marigold.components as Components
 
@@ -92,6 +93,10 @@ class UILatticeTools( QtGui.QWidget ):
         saveModeluBtn.clicked.connect( lambda:self.saveModulePrompt() )
         latticeToolsGrid.addWidget( saveModeluBtn, 0, 0 )        
         
+        refreshBtn = QTWidgets.imageTextButton( 'Refresh Presets', ':/riggingUI/icons/icon_match_all.png', [16,16] )
+        refreshBtn.clicked.connect( lambda:self.refreshPresets() )
+        latticeToolsGrid.addWidget( refreshBtn, 0, 1 )
+        
         # Build the widget
         layout.addWidget( latticesLabel )
         layout.addLayout( latticesGrid )
@@ -109,10 +114,18 @@ class UILatticeTools( QtGui.QWidget ):
                 if button.isChecked():
                     buttonType = button.text()
                     presetsPath = '{0}{1}/'.format( XMLUtility.FRAME_PRESETS_PATH, buttonType )
-                    latticePresets = XMLUtility.getXMLInFolder( presetsPath )
+                    latticePresets = XMLUtility.getPresetCatalog().listPresets( inFolder=presetsPath, inFormat='xml' )
                     for lattice in latticePresets:
-                        description = 'From here you can search these documents. Enter your search words into the box below and click /"search/".'
-                        self.scrollLayout.addWidget( latticeCard( buttonType, lattice, description, parent=self.scrollLayout ) )
+                        description = PresetCatalog.describePreset( lattice )
+                        self.scrollLayout.addWidget( latticeCard( buttonType, lattice['name'], description, parent=self.scrollLayout ) )
+    
+    def refreshPresets( self ):
+        '''
+        Picks up presets written over in place outside marigold. Presets added or
+        removed on disk show up the next time the cards are updated.
+        '''
+        XMLUtility.getPresetCatalog().refresh()
+        self.updateCards()
     
     def saveModulePrompt( self ):
         self.dialog = ModuleTypePrompt( self )
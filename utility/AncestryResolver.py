@@ -0,0 +1,262 @@
+'''
+Remembers which bits carry which components, and which ancestor of a bit is the
+nearest one carrying a component class.
+
+Searching up a frame hierarchy used to read the components of every bit on the
+way, every time. ANCESTRY_RESOLVER reads the components of a bit once. The answer
+of each search is also kept for every bit the search went through, so searching
+from a sibling or child later stops at the first bit that was searched before.
+
+Bits are kept by full path name. Only the paths a scene change touches are
+forgotten:
+    - When a node is parented or unparented, everything at and under its old and
+      new paths. Nodes made by a build have no children, so only their own path
+      is looked at.
+    - When a DAG node is renamed, the paths at and under it are renamed.
+    - When an attribute is added to or removed from a bit that was read
+      (components are added as message attributes), everything at and under the
+      bit.
+Deleted nodes are not forgotten straight away. Nothing can look them up by path,
+and a node made later at the same path is parented there, which drops them.
+Everything is forgotten on a new or opened scene.
+'''
+import maya.OpenMaya as OpenMaya
+import marigold.utility.NodeUtility as NodeUtility
+
+MODULE_ROOT_CLASS = 'ModuleRootComponent'
+
+class AncestryResolver( object ):
+    '''
+    Memo of bit components and nearest ancestors with a component class.
+    '''
+    def __init__( self ):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bit full path -> { component class: component node }
+        self._bitComponents = {}
+        # Bit full path -> { component class: ( bit full path, component node ) or None }
+        self._nearest = {}
+        self._bitCallbackIds = {}
+        # Bit callbacks dropped by clear(). clear() runs inside callbacks, so they
+        # are removed later.
+        self._staleCallbackIds = []
+        self._callbackIds = []
+
+    def getBitComponent( self, inBit, inComponentClass ):
+        '''
+        Like NodeUtility.checkBitForComponent, but only reads the bit once.
+
+        @param inBit: String. Name of the bit.
+        @param inComponentClass: String. Name of the component class.
+        @return: String. Name of the component node, or None.
+        '''
+        return self._getBitComponents( self.getFullPath( inBit ) ).get( inComponentClass )
+
+    def findAncestor( self, inBit, inComponentClass, inIncludeSelf=True ):
+        '''
+        Finds the nearest bit, going up from inBit, with a component of the given class.
+
+        @param inBit: String. Name of the bit to start from.
+        @param inComponentClass: String. Name of the component class.
+        @param inIncludeSelf: Bool. inBit itself can be the answer.
+        @return: List. Full path of the bit and name of the component node. None if
+            no bit up to the world has the component.
+        '''
+        dagPath = NodeUtility.getDagPath( inBit )
+        if not inIncludeSelf:
+            dagPath.pop()
+
+        visited = []
+        result = None
+        while dagPath.length() > 0:
+            bit = dagPath.fullPathName()
+            searches = self._nearest.get( bit )
+            if searches is not None and inComponentClass in searches:
+                self.hits += 1
+                result = searches[ inComponentClass ]
+                break
+            self.misses += 1
+            visited.append( bit )
+            component = self._getBitComponents( bit ).get( inComponentClass )
+            if component is not None:
+                result = ( bit, component )
+                break
+            dagPath.pop()
+
+        for bit in visited:
+            self._nearest.setdefault( bit, {} )[ inComponentClass ] = result
+        if result is None:
+            return None
+        return list( result )
+
+    def getModuleRoot( self, inBit ):
+        '''
+        @param inBit: String. Name of a bit.
+        @return: List. Full path of the root bit of the module the bit belongs to, and
+            name of its ModuleRootComponent node. None if the bit isn't in a module.
+        '''
+        return self.findAncestor( inBit, MODULE_ROOT_CLASS )
+
+    def getFullPath( self, inBit ):
+        '''
+        @param inBit: String. Name of a bit.
+        @return: String. Full path name of the bit.
+        '''
+        return NodeUtility.getDagPath( inBit ).fullPathName()
+
+    def clear( self ):
+        '''
+        Forgets everything.
+        '''
+        self.invalidations += len( self._nearest )+len( self._bitComponents )
+        self._staleCallbackIds.extend( self._bitCallbackIds.itervalues() )
+        self._bitCallbackIds.clear()
+        self._bitComponents.clear()
+        self._nearest.clear()
+
+    def getStats( self ):
+        '''
+        @return: Dictionary. Hit, miss and invalidation counts plus the number of
+            bits and searches remembered.
+        '''
+        return { 'hits':self.hits,
+                 'misses':self.misses,
+                 'invalidations':self.invalidations,
+                 'bits':len( self._bitComponents ),
+                 'searches':sum( len( searches ) for searches in self._nearest.itervalues() ) }
+
+    def installCallbacks( self ):
+        '''
+        Adds the scene callbacks that keep the memo honest. Only done once.
+        '''
+        if self._callbackIds:
+            return
+        self._callbackIds.append( OpenMaya.MDagMessage.addParentAddedCallback( self._parentChanged ) )
+        self._callbackIds.append( OpenMaya.MDagMessage.addParentRemovedCallback( self._parentChanged ) )
+        self._callbackIds.append( OpenMaya.MNodeMessage.addNameChangedCallback( OpenMaya.MObject(), self._nameChanged ) )
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kBeforeNew, self._changed ) )
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kBeforeOpen, self._changed ) )
+
+    def removeCallbacks( self ):
+        '''
+        Removes the scene callbacks and forgets everything. Call before reloading
+        the module.
+        '''
+        for callbackId in self._callbackIds:
+            OpenMaya.MMessage.removeCallback( callbackId )
+        self._callbackIds = []
+        self.clear()
+        self._removeStaleCallbacks()
+
+    def _removeStaleCallbacks( self ):
+        for callbackId in self._staleCallbackIds:
+            try:
+                OpenMaya.MMessage.removeCallback( callbackId )
+            except RuntimeError:
+                # Already gone with the node.
+                pass
+        self._staleCallbackIds = []
+
+    def _getBitComponents( self, inBit ):
+        components = self._bitComponents.get( inBit )
+        if components is None:
+            self.installCallbacks()
+            self._removeStaleCallbacks()
+            components = {}
+            for component in NodeUtility.getModuleComponentSettings( inBit ) or []:
+                classType = NodeUtility.getPlugValue( NodeUtility.getPlug( component, 'classType' ) )
+                # The first component of a class wins, like checkBitForComponent.
+                components.setdefault( classType, component )
+            self._bitComponents[ inBit ] = components
+            self._bitCallbackIds[ inBit ] = OpenMaya.MNodeMessage.addAttributeAddedOrRemovedCallback( NodeUtility.getDependNode( inBit ), self._bitAttributeChanged )
+        return components
+
+    def getPathsUnder( self, inPath, inHasChildren=True ):
+        '''
+        @param inPath: String. Full path name of a node.
+        @param inHasChildren: Bool. False if the node has no children, so only inPath
+            itself has to be looked for instead of every remembered path.
+        @return: List of strings. Remembered paths at and under inPath.
+        '''
+        if not inHasChildren:
+            return [ inPath ] if inPath in self._bitComponents or inPath in self._nearest else []
+        prefix = inPath+'|'
+        paths = set( path for path in self._bitComponents if path == inPath or path.startswith( prefix ) )
+        paths.update( path for path in self._nearest if path == inPath or path.startswith( prefix ) )
+        return list( paths )
+
+    def forgetPath( self, inPath, inHasChildren=True ):
+        '''
+        Forgets the bits and searches at and under a path.
+
+        @param inPath: String. Full path name of a node.
+        @param inHasChildren: Bool. See getPathsUnder.
+        '''
+        for path in self.getPathsUnder( inPath, inHasChildren ):
+            self.invalidations += 1
+            self._bitComponents.pop( path, None )
+            self._nearest.pop( path, None )
+            if path in self._bitCallbackIds:
+                self._staleCallbackIds.append( self._bitCallbackIds.pop( path ) )
+
+    def renamePath( self, inOldPath, inNewPath, inHasChildren=True ):
+        '''
+        Moves the bits and searches at and under a renamed node to its new path.
+
+        @param inOldPath: String. Full path name before the rename.
+        @param inNewPath: String. Full path name after the rename.
+        @param inHasChildren: Bool. See getPathsUnder.
+        '''
+        paths = self.getPathsUnder( inOldPath, inHasChildren )
+        if not paths:
+            return
+        # A search result is the bit itself or one of its parents, so results that
+        # need renaming are always under a renamed path.
+        renamed = dict( ( path, inNewPath+path[ len( inOldPath ): ] ) for path in paths )
+        for path, newPath in renamed.iteritems():
+            if path in self._bitComponents:
+                self._bitComponents[ newPath ] = self._bitComponents.pop( path )
+            if path in self._bitCallbackIds:
+                self._bitCallbackIds[ newPath ] = self._bitCallbackIds.pop( path )
+            if path in self._nearest:
+                searches = self._nearest.pop( path )
+                for componentClass, result in searches.iteritems():
+                    if result is not None and result[0] in renamed:
+                        searches[ componentClass ] = ( renamed[ result[0] ], result[1] )
+                self._nearest[ newPath ] = searches
+
+    def _changed( self, *args ):
+        if self._nearest or self._bitComponents:
+            self.clear()
+
+    def _bitAttributeChanged( self, inMsg, inPlug, *args ):
+        node = inPlug.node()
+        if self._nearest or self._bitComponents:
+            self.forgetPath( OpenMaya.MDagPath.getAPathTo( node ).fullPathName(), getChildCount( node ) > 0 )
+
+    def _parentChanged( self, inChild, inParent, *args ):
+        # The child's own path may not be settled yet, so it is worked out from
+        # the parent.
+        if self._nearest or self._bitComponents:
+            node = inChild.node()
+            path = '{0}|{1}'.format( inParent.fullPathName(), OpenMaya.MFnDependencyNode( node ).name() )
+            self.forgetPath( path, getChildCount( node ) > 0 )
+
+    def _nameChanged( self, inNode, inPreviousName, *args ):
+        if not inNode.hasFn( OpenMaya.MFn.kDagNode ) or not inPreviousName:
+            return
+        if self._nearest or self._bitComponents:
+            newPath = OpenMaya.MDagPath.getAPathTo( inNode ).fullPathName()
+            oldPath = '{0}|{1}'.format( newPath.rpartition( '|' )[0], inPreviousName )
+            self.renamePath( oldPath, newPath, getChildCount( inNode ) > 0 )
+
+def getChildCount( inNode ):
+    '''
+    @param inNode: MObject. A DAG node.
+    @return: Int. Number of children of the node.
+    '''
+    return OpenMaya.MFnDagNode( inNode ).childCount()
+
+# The resolver shared by everything in the process.
+ANCESTRY_RESOLVER = AncestryResolver()
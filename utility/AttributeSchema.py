@@ -0,0 +1,123 @@
+'''
+Attribute schemas for component nodes.
+
+Each component class declares the attributes its node carries, once, as a class
+level tuple:
+
+    attributes = ( ( 'moduleName', 'dataType', 'string' ),
+                   ( 'buildPriority', 'attributeType', 'byte', 0 ) )
+
+An entry is ( name, attribute type, data type ) with an optional default value.
+The types are the ones NodeUtility.addPlug takes. A class also carries the
+attributes of its base classes, base classes first.
+
+The first time a class is used its schema is compiled into attribute factories,
+so the type strings aren't looked at again. addSchemaAttributes then adds every
+attribute to the nodes, and sets the defaults, with one MDGModifier instead of
+a cmds.addAttr call per attribute.
+'''
+import marigold.utility.BatchUtility as BatchUtility
+
+class AttributeSchema( object ):
+    '''
+    The compiled attributes of one component class.
+    '''
+    def __init__( self, inAttributes ):
+        '''
+        @param inAttributes: List of tuples. ( name, attribute type, data type ) with
+            an optional default value.
+        '''
+        # [ name, factory, has default, default ]
+        self.attributes = []
+        for attribute in inAttributes:
+            factory = BatchUtility.getAttributeFactory( attribute[0], attribute[1], attribute[2] )
+            if len( attribute ) > 3:
+                self.attributes.append( [ attribute[0], factory, True, attribute[3] ] )
+            else:
+                self.attributes.append( [ attribute[0], factory, False, None ] )
+
+    def getNames( self ):
+        '''
+        @return: List of strings. Names of the attributes, in the order they are added.
+        '''
+        return [ attribute[0] for attribute in self.attributes ]
+
+    def addToNodes( self, inNodes, inBatch ):
+        '''
+        Queues the attributes and their defaults in a batch.
+
+        @param inNodes: List of strings. Names of the nodes.
+        @param inBatch: PlugBatch.
+        '''
+        for node in inNodes:
+            for name, factory, hasDefault, default in self.attributes:
+                plug = inBatch.addAttribute( node, name, factory() )
+                if hasDefault:
+                    inBatch.setPlugValue( plug, default )
+
+class SchemaRegistry( object ):
+    '''
+    Compiled schemas keyed by component class.
+    '''
+    def __init__( self ):
+        self._schemas = {}
+
+    def getSchema( self, inClass ):
+        '''
+        @param inClass: Class. A component class.
+        @return: AttributeSchema. The attributes of the class and its base classes.
+        '''
+        schema = self._schemas.get( inClass )
+        if schema is None:
+            schema = AttributeSchema( getClassAttributes( inClass ) )
+            self._schemas[ inClass ] = schema
+        return schema
+
+    def clear( self ):
+        '''
+        Forgets the compiled schemas. Call after editing a class's attributes.
+        '''
+        self._schemas.clear()
+
+def getClassAttributes( inClass ):
+    '''
+    @param inClass: Class. A component class.
+    @return: List of tuples. The attributes declared by the class and its base
+        classes, base classes first. A class can redeclare a base class attribute
+        to change its type or default.
+    '''
+    attributes = []
+    names = {}
+    for klass in reversed( inClass.__mro__ ):
+        for attribute in klass.__dict__.get( 'attributes', () ):
+            if attribute[0] in names:
+                attributes[ names[ attribute[0] ] ] = attribute
+            else:
+                names[ attribute[0] ] = len( attributes )
+                attributes.append( attribute )
+    return attributes
+
+# The schemas shared by everything in the process.
+SCHEMA_REGISTRY = SchemaRegistry()
+
+def addSchemaAttributes( inNodes, inClass, inBatch=None ):
+    '''
+    Adds the attributes of a component class to nodes in one pass.
+
+    @param inNodes: String or list of strings. Names of the nodes.
+    @param inClass: Class. The component class.
+    @param inBatch: PlugBatch. Batch to queue the attributes in. If none is passed
+        in, one is made and run.
+    @return: Int. Number of edits queued.
+    '''
+    if isinstance( inNodes, basestring ):
+        inNodes = [ inNodes ]
+    batch = inBatch
+    if batch is None:
+        batch = BatchUtility.PlugBatch()
+    count = batch.getOperationCount()
+    SCHEMA_REGISTRY.getSchema( inClass ).addToNodes( inNodes, batch )
+    count = batch.getOperationCount()-count
+    if inBatch is None:
+        batch.run()
+    return count
@@ -0,0 +1,321 @@
+'''
+Batched plug edits.
+
+A PlugBatch collects attribute adds, plug value changes and connections into a
+single MDGModifier. Nothing changes in the scene until the batch is run, then
+everything is done in one go. Run through the applyPlugBatch command (registered
+by the bitControllers plugin) the whole batch is one undoable operation.
+'''
+import types
+import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import marigold.utility.NodeUtility as NodeUtility
+
+BATCH_COMMAND = 'applyPlugBatch'
+
+# addAttr attributeType names that map straight onto a numeric type.
+NUMERIC_TYPES = { 'bool':OpenMaya.MFnNumericData.kBoolean,
+                  'byte':OpenMaya.MFnNumericData.kByte,
+                  'char':OpenMaya.MFnNumericData.kChar,
+                  'short':OpenMaya.MFnNumericData.kShort,
+                  'long':OpenMaya.MFnNumericData.kLong,
+                  'float':OpenMaya.MFnNumericData.kFloat,
+                  'double':OpenMaya.MFnNumericData.kDouble }
+
+# Batches waiting to be picked up by the applyPlugBatch command.
+_pendingBatches = []
+
+def takePendingBatch():
+    '''
+    Hands the next waiting batch to the applyPlugBatch command.
+
+    @return: PlugBatch or None.
+    '''
+    if _pendingBatches:
+        return _pendingBatches.pop( 0 )
+    return None
+
+def getAttributeFactory( inPlugName, inAttrType, inAttrDataType ):
+    '''
+    Works out how to make an attribute, once. Takes the same types as
+    NodeUtility.addPlug.
+
+    @param inPlugName: String. Name of the attribute.
+    @param inAttrType: String. attributeType, dataType or matrixType.
+    @param inAttrDataType: String. The attribute data type.
+    @return: Function. Makes a new attribute object each time it is called. An
+        attribute object can only be added to one node.
+    '''
+    if inAttrType == 'attributeType':
+        if inAttrDataType == 'float3':
+            childNames = [ '{0}{1}'.format( inPlugName, axis ) for axis in 'XYZ' ]
+            def makeFloat3():
+                nAttr = OpenMaya.MFnNumericAttribute()
+                children = [ nAttr.create( childName, childName, OpenMaya.MFnNumericData.kFloat ) for childName in childNames ]
+                return nAttr.create( inPlugName, inPlugName, children[0], children[1], children[2] )
+            return makeFloat3
+        elif inAttrDataType in NUMERIC_TYPES:
+            numericType = NUMERIC_TYPES[ inAttrDataType ]
+            return lambda: OpenMaya.MFnNumericAttribute().create( inPlugName, inPlugName, numericType )
+        elif inAttrDataType == 'enum':
+            return lambda: OpenMaya.MFnEnumAttribute().create( inPlugName, inPlugName )
+        elif inAttrDataType == 'doubleLinear':
+            return lambda: OpenMaya.MFnUnitAttribute().create( inPlugName, inPlugName, OpenMaya.MFnUnitAttribute.kDistance )
+        elif inAttrDataType == 'doubleAngle':
+            return lambda: OpenMaya.MFnUnitAttribute().create( inPlugName, inPlugName, OpenMaya.MFnUnitAttribute.kAngle )
+        elif inAttrDataType == 'message':
+            return lambda: OpenMaya.MFnMessageAttribute().create( inPlugName, inPlugName )
+        elif inAttrDataType == 'matrix':
+            return lambda: OpenMaya.MFnMatrixAttribute().create( inPlugName, inPlugName, OpenMaya.MFnMatrixAttribute.kDouble )
+    elif inAttrType == 'dataType':
+        if inAttrDataType in [ 'string', 'typed' ]:
+            return lambda: OpenMaya.MFnTypedAttribute().create( inPlugName, inPlugName, OpenMaya.MFnData.kString )
+        elif inAttrDataType == 'matrix':
+            return lambda: OpenMaya.MFnTypedAttribute().create( inPlugName, inPlugName, OpenMaya.MFnData.kMatrix )
+    elif inAttrType == 'matrixType':
+        return lambda: OpenMaya.MFnMatrixAttribute().create( inPlugName, inPlugName, OpenMaya.MFnMatrixAttribute.kDouble )
+    raise ValueError( 'Can not make a {0} attribute with data type {1} for {2}.'.format( inAttrType, inAttrDataType, inPlugName ) )
+
+def createAttribute( inPlugName, inAttrType, inAttrDataType ):
+    '''
+    Makes an attribute object. Takes the same types as NodeUtility.addPlug.
+
+    @param inPlugName: String. Name of the attribute.
+    @param inAttrType: String. attributeType, dataType or matrixType.
+    @param inAttrDataType: String. The attribute data type.
+    @return: MObject. The attribute.
+    '''
+    return getAttributeFactory( inPlugName, inAttrType, inAttrDataType )()
+
+class PlugBatch( object ):
+    '''
+    Collects plug edits into one MDGModifier.
+    '''
+    def __init__( self ):
+        self.modifier = OpenMaya.MDGModifier()
+        self.counts = { 'addAttr':0, 'setAttr':0, 'connect':0 }
+        self.hasRun = False
+        # Nodes looked up by name, and attributes added by this batch, keyed by
+        # node name then attribute name.
+        self._nodes = {}
+        self._newAttributes = {}
+
+    def getOperationCount( self ):
+        '''
+        @return: Int. Number of edits in the batch.
+        '''
+        return sum( self.counts.itervalues() )
+
+    def getNode( self, inNode ):
+        '''
+        @param inNode: String. Name of a node.
+        @return: MObject.
+        '''
+        mObj = self._nodes.get( inNode )
+        if mObj is None:
+            mObj = NodeUtility.getDependNode( inNode )
+            self._nodes[ inNode ] = mObj
+        return mObj
+
+    def attributeCheck( self, inNode, inPlugName ):
+        '''
+        Like NodeUtility.attributeCheck, but also knows about attributes added
+        by this batch.
+
+        @param inNode: String. Name of the node.
+        @param inPlugName: String. Name of the attribute.
+        @return: Bool.
+        '''
+        if inPlugName in self._newAttributes.get( inNode, {} ):
+            return True
+        return OpenMaya.MFnDependencyNode( self.getNode( inNode ) ).hasAttribute( inPlugName )
+
+    def getPlug( self, inNode, inPlugName ):
+        '''
+        @param inNode: String. Name of the node.
+        @param inPlugName: String. Name of the plug. Can be an attribute added by this batch.
+        @return: MPlug.
+        '''
+        mObj = self.getNode( inNode )
+        newAttr = self._newAttributes.get( inNode, {} ).get( inPlugName )
+        if newAttr is not None:
+            return OpenMaya.MPlug( mObj, newAttr )
+        return OpenMaya.MFnDependencyNode( mObj ).findPlug( inPlugName )
+
+    def addPlug( self, inNode, inPlugName, inAttrType, inAttrDataType ):
+        '''
+        Adds a plug to a node. Same arguments as NodeUtility.addPlug.
+
+        @param inNode: String. Name of the node.
+        @param inPlugName: String. Name of the plug to add.
+        @param inAttrType: String. Type of attribute to add.
+        @param inAttrDataType: String. The attribute data type.
+        @return: MPlug. The new plug. It can be set and connected as part of this batch.
+        '''
+        return self.addAttribute( inNode, inPlugName, createAttribute( inPlugName, inAttrType, inAttrDataType ) )
+
+    def addAttribute( self, inNode, inPlugName, inAttr ):
+        '''
+        Adds an attribute object that was already made, for example by a factory
+        from getAttributeFactory.
+
+        @param inNode: String. Name of the node.
+        @param inPlugName: String. Name of the attribute.
+        @param inAttr: MObject. The attribute. It can't have been added to a node before.
+        @return: MPlug. The new plug. It can be set and connected as part of this batch.
+        '''
+        self.modifier.addAttribute( self.getNode( inNode ), inAttr )
+        self._newAttributes.setdefault( inNode, {} )[ inPlugName ] = inAttr
+        self.counts[ 'addAttr' ] += 1
+        return OpenMaya.MPlug( self.getNode( inNode ), inAttr )
+
+    def setPlug( self, inNode, inPlugName, inPlugValue ):
+        '''
+        Sets a plug. Locked plugs are left alone, like NodeUtility.setPlug.
+
+        @param inNode: String. Name of the node.
+        @param inPlugName: String. Name of the plug.
+        @param inPlugValue: Value of the plug as a python type.
+        @return: Bool. True if the edit was added.
+        '''
+        plug = self.getPlug( inNode, inPlugName )
+        isNew = inPlugName in self._newAttributes.get( inNode, {} )
+        if not isNew and plug.isLocked():
+            return False
+        return self.setPlugValue( plug, inPlugValue )
+
+    def setPlugValue( self, inPlug, inValue ):
+        '''
+        Adds a plug value change. Handles the same plug types as NodeUtility.setPlugValue.
+
+        @param inPlug: MPlug. The node plug.
+        @param inValue: Value for the plug.
+        @return: Bool. True if the edit was added.
+        '''
+        pAttribute = inPlug.attribute()
+        apiType = pAttribute.apiType()
+
+        # Float Groups - rotate, translate, scale
+        if apiType in [ OpenMaya.MFn.kAttribute3Double, OpenMaya.MFn.kAttribute3Float, OpenMaya.MFn.kCompoundAttribute ]:
+            if isinstance( inValue, ( types.ListType, types.TupleType ) ):
+                for c in xrange( inPlug.numChildren() ):
+                    self.setPlugValue( inPlug.child( c ), inValue[ c ] )
+                return True
+            elif type( inValue ) == OpenMaya.MEulerRotation:
+                for c, value in enumerate( [ inValue.x, inValue.y, inValue.z ] ):
+                    self.setPlugValue( inPlug.child( c ), value )
+                return True
+
+        # Distance
+        elif apiType in [ OpenMaya.MFn.kDoubleLinearAttribute, OpenMaya.MFn.kFloatLinearAttribute ]:
+            self.modifier.newPlugValueMDistance( inPlug, OpenMaya.MDistance( float( inValue ), OpenMaya.MDistance.kCentimeters ) )
+            self.counts[ 'setAttr' ] += 1
+            return True
+
+        # Angle
+        elif apiType in [ OpenMaya.MFn.kDoubleAngleAttribute, OpenMaya.MFn.kFloatAngleAttribute ]:
+            self.modifier.newPlugValueMAngle( inPlug, OpenMaya.MAngle( float( inValue ), OpenMaya.MAngle.kDegrees ) )
+            self.counts[ 'setAttr' ] += 1
+            return True
+
+        # Typed
+        elif apiType == OpenMaya.MFn.kTypedAttribute:
+            pType = OpenMaya.MFnTypedAttribute( pAttribute ).attrType()
+            if pType == OpenMaya.MFnData.kString:
+                self.modifier.newPlugValueString( inPlug, inValue )
+                self.counts[ 'setAttr' ] += 1
+                return True
+            elif pType == OpenMaya.MFnData.kMatrix:
+                return self.setMatrixValue( inPlug, inValue )
+
+        # Matrix
+        elif apiType == OpenMaya.MFn.kMatrixAttribute:
+            return self.setMatrixValue( inPlug, inValue )
+
+        # Numbers
+        elif apiType == OpenMaya.MFn.kNumericAttribute:
+            pType = OpenMaya.MFnNumericAttribute( pAttribute ).unitType()
+            if pType == OpenMaya.MFnNumericData.kBoolean:
+                self.modifier.newPlugValueBool( inPlug, bool( inValue ) )
+            elif pType in [ OpenMaya.MFnNumericData.kShort, OpenMaya.MFnNumericData.kInt, OpenMaya.MFnNumericData.kLong, OpenMaya.MFnNumericData.kByte, OpenMaya.MFnNumericData.kChar ]:
+                self.modifier.newPlugValueInt( inPlug, int( inValue ) )
+            elif pType in [ OpenMaya.MFnNumericData.kFloat, OpenMaya.MFnNumericData.kDouble, OpenMaya.MFnNumericData.kAddr ]:
+                self.modifier.newPlugValueDouble( inPlug, float( inValue ) )
+            else:
+                return False
+            self.counts[ 'setAttr' ] += 1
+            return True
+
+        # Enums
+        elif apiType == OpenMaya.MFn.kEnumAttribute:
+            self.modifier.newPlugValueInt( inPlug, int( inValue ) )
+            self.counts[ 'setAttr' ] += 1
+            return True
+
+        OpenMaya.MGlobal.displayError( '{0} :: Can not batch a value ( {1} ) of {2}.'.format( inPlug.info(), inValue, type( inValue ) ) )
+        return False
+
+    def setMatrixValue( self, inPlug, inValue ):
+        '''
+        @param inPlug: MPlug. Matrix plug.
+        @param inValue: MMatrix, or an MPlug to copy the matrix from.
+        @return: Bool. True if the edit was added.
+        '''
+        if NodeUtility.isValidMPlug( inValue ):
+            inValue = OpenMaya.MFnMatrixData( inValue.asMObject() ).matrix()
+        if not isinstance( inValue, OpenMaya.MMatrix ):
+            OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be a MMatrix or MPlug.'.format( inPlug.info(), inValue, type( inValue ) ) )
+            return False
+        matrixData = OpenMaya.MFnMatrixData()
+        self.modifier.newPlugValue( inPlug, matrixData.create( inValue ) )
+        self.counts[ 'setAttr' ] += 1
+        return True
+
+    def connect( self, inSourcePlug, inDestinationPlug ):
+        '''
+        @param inSourcePlug: MPlug. Source plug.
+        @param inDestinationPlug: MPlug. Destination plug.
+        '''
+        self.modifier.connect( inSourcePlug, inDestinationPlug )
+        self.counts[ 'connect' ] += 1
+
+    def connectNodes( self, inParentObj, inParentPlug, inChildObj, inChildPlug ):
+        '''
+        Batched version of NodeUtility.connectNodes.
+
+        @param inParentObj: String. Name of parent node.
+        @param inParentPlug: String. Name of plug on parent node.
+        @param inChildObj: String. Name of child node.
+        @param inChildPlug: String. Name of plug on child node.
+        '''
+        self.connect( self.getPlug( inParentObj, inParentPlug ), self.getPlug( inChildObj, inChildPlug ) )
+
+    def doIt( self ):
+        self.modifier.doIt()
+        self.hasRun = True
+
+    def undoIt( self ):
+        self.modifier.undoIt()
+        self.hasRun = False
+
+    def run( self, inUndoable=True ):
+        '''
+        Does every edit in the batch.
+
+        @param inUndoable: Bool. Run through the applyPlugBatch command so the batch
+            can be undone in one step. Falls back to running it straight away when
+            the bitControllers plugin isn't loaded.
+        @return: Int. Number of edits done.
+        '''
+        if self.getOperationCount() == 0:
+            return 0
+        if inUndoable and hasattr( cmds, BATCH_COMMAND ):
+            _pendingBatches.append( self )
+            try:
+                getattr( cmds, BATCH_COMMAND )()
+            finally:
+                if self in _pendingBatches:
+                    _pendingBatches.remove( self )
+        else:
+            self.doIt()
+        return self.getOperationCount()
@@ -0,0 +1,491 @@
+'''
+Builds characters from a graph of build tasks.
+
+compileCharacter reads a character once and turns it into a BuildGraph. Every
+joint, control, spacer, parenting and constraint is its own task, and a task
+lists the tasks it needs to run after. The graph is run in topological order, so
+a joint is parented as soon as its parent joint exists, whichever module either
+of them is in.
+
+Parents are found while compiling, by walking up each bit's full path through
+maps of the bits that carry joints and controls. The build doesn't search the
+skeleton and rig groups for them. Task results are MObjects, which stay valid
+while the nodes are parented around.
+
+    graph = CharacterBuild.compileCharacter( 'CharacterRootComponent' )
+    graph.run()
+
+A graph can also be planned instead of run. getManifest lists the modules,
+joints, controls, spacers and connections the build would make, in build order,
+with counts. planCharacter plans a character in the scene. planPreset plans a
+module or character preset file without touching the scene, which is quick
+enough to check presets in bulk:
+
+    manifest = CharacterBuild.planPreset( presetFile )
+    print CharacterBuild.formatManifestJSON( manifest )
+'''
+import collections
+import json
+import maya.cmds as cmds
+import maya.OpenMaya as OpenMaya
+import marigold.utility.NodeUtility as NodeUtility
+import marigold.utility.PresetUtility as PresetUtility
+import marigold.utility.PresetBinary as PresetBinary
+import marigold.components as components
+from marigold.utility.ConnectionSnapshot import ConnectionSnapshot
+from marigold.utility.PresetCache import PRESET_CACHE
+
+JOINT_CLASS = 'BasicJointComponent'
+CONTROL_CLASS = 'CurveControlComponent'
+MODULE_ROOT_CLASS = 'ModuleRootComponent'
+CHARACTER_ROOT_CLASS = 'CharacterRootComponent'
+
+# Component values the builds read, by component class.
+JOINT_INPUTS = [ 'jointName' ]
+CONTROL_INPUTS = [ 'controlName', 'curveType', 'controlColor' ]
+MODULE_INPUTS = [ 'moduleName', 'buildPriority' ]
+
+SKELETON_GROUP_KEY = 'group:skeleton'
+RIG_GROUP_KEY = 'group:rig'
+
+class BuildTask( object ):
+    '''
+    One step of a build.
+    '''
+    def __init__( self, inKey, inKind, inName, inFunction, inArgs=(), inDependencies=(), inInputs=None, inBit=None ):
+        '''
+        @param inKey: String. Unique key of the task in its graph.
+        @param inKind: String. group, joint, control, spacer, parent or constraint.
+        @param inName: String. Name of the node the task makes or works on.
+        @param inFunction: Function. Called with the results so far, keyed by task,
+            and then inArgs. Returns the task's result.
+        @param inArgs: List. Extra arguments for inFunction.
+        @param inDependencies: List of strings. Keys of the tasks that have to run first.
+        @param inInputs: Dictionary. Component values the task was made from, for
+            the manifest.
+        @param inBit: String. Full path name of the bit the task was made for. None
+            for tasks that aren't made for a bit, like the groups.
+        '''
+        self.key = inKey
+        self.kind = inKind
+        self.name = inName
+        self.function = inFunction
+        self.args = tuple( inArgs )
+        self.dependencies = list( inDependencies )
+        self.inputs = inInputs or {}
+        self.bit = inBit
+
+class BuildGraph( object ):
+    '''
+    Build tasks and the order they have to run in.
+    '''
+    def __init__( self ):
+        self.tasks = collections.OrderedDict()
+        self.results = {}
+        # Modules the graph was compiled from, in build order. Dictionaries with
+        # moduleName, buildPriority, rootBit and bitCount.
+        self.modules = []
+
+    def addTask( self, inTask ):
+        '''
+        @param inTask: BuildTask. Its dependencies can be added later.
+        @return: String. Key of the task.
+        '''
+        if inTask.key in self.tasks:
+            raise ValueError( 'Build task {0} is already in the graph.'.format( inTask.key ) )
+        self.tasks[ inTask.key ] = inTask
+        return inTask.key
+
+    def getOrder( self ):
+        '''
+        Sorts the tasks so each one comes after its dependencies. Otherwise tasks
+        keep the order they were added in.
+
+        @return: List of BuildTasks.
+        '''
+        dependents = dict( ( key, [] ) for key in self.tasks )
+        waiting = {}
+        for key, task in self.tasks.iteritems():
+            for dependency in task.dependencies:
+                if dependency not in self.tasks:
+                    raise ValueError( 'Build task {0} needs {1}, which is not in the graph.'.format( key, dependency ) )
+                dependents[ dependency ].append( key )
+            waiting[ key ] = len( task.dependencies )
+
+        ready = collections.deque( key for key in self.tasks if waiting[ key ] == 0 )
+        order = []
+        while ready:
+            key = ready.popleft()
+            order.append( self.tasks[ key ] )
+            for dependent in dependents[ key ]:
+                waiting[ dependent ] -= 1
+                if waiting[ dependent ] == 0:
+                    ready.append( dependent )
+
+        if len( order ) != len( self.tasks ):
+            stuck = [ key for key in self.tasks if waiting[ key ] > 0 ]
+            raise ValueError( 'Build tasks depend on each other in a loop: {0}'.format( ', '.join( stuck ) ) )
+        return order
+
+    def getCounts( self ):
+        '''
+        @return: Dictionary. Number of tasks of each kind.
+        '''
+        counts = {}
+        for task in self.tasks.itervalues():
+            counts[ task.kind ] = counts.get( task.kind, 0 )+1
+        return counts
+
+    def run( self ):
+        '''
+        Runs every task in order, in one undo chunk. Joints, controls, spacers and
+        groups are all made through cmds, so undoing the chunk deletes them all.
+
+        @return: Dictionary. Task results keyed by task.
+        '''
+        order = self.getOrder()
+        self.results = {}
+        cmds.undoInfo( openChunk=True )
+        try:
+            for task in order:
+                self.results[ task.key ] = task.function( self.results, *task.args )
+        finally:
+            cmds.undoInfo( closeChunk=True )
+        return self.results
+
+def getPathName( inObj ):
+    '''
+    @param inObj: MObject. A DAG node.
+    @return: String. Full path name of the node.
+    '''
+    return OpenMaya.MDagPath.getAPathTo( inObj ).fullPathName()
+
+def makeGroup( inResults, inGroupName ):
+    # Reuses a group that is already there, like the old character build.
+    if not cmds.objExists( inGroupName ):
+        cmds.group( em=True, name=inGroupName )
+    return NodeUtility.getDependNode( inGroupName )
+
+def buildJoint( inResults, inComponentNode ):
+    return components.getComponentClass( JOINT_CLASS ).buildNode( inComponentNode )
+
+def buildControl( inResults, inComponentNode ):
+    return components.getComponentClass( CONTROL_CLASS ).buildControl( inComponentNode )
+
+def buildSpacer( inResults, inComponentNode, inControlKey ):
+    control = inResults[ inControlKey ]
+    components.getComponentClass( CONTROL_CLASS ).buildSpacer( inComponentNode, getPathName( control ) )
+    return OpenMaya.MFnDagNode( control ).parent( 0 )
+
+def parentNode( inResults, inChildKey, inParentKey ):
+    cmds.parent( getPathName( inResults[ inChildKey ] ), getPathName( inResults[ inParentKey ] ) )
+    return inResults[ inChildKey ]
+
+def constrainNode( inResults, inTargetKey, inConstrainedKey ):
+    return cmds.parentConstraint( getPathName( inResults[ inTargetKey ] ), getPathName( inResults[ inConstrainedKey ] ), maintainOffset=True )[0]
+
+def getCharacterModules( inCharacterNode, inSnapshot=None ):
+    '''
+    @param inCharacterNode: String. Name of the character root component node.
+    @param inSnapshot: ConnectionSnapshot. Connections to read from.
+    @return: List of strings. Module root component nodes, in build order. The module
+        on the character's own root bit comes first, then the character's modules
+        by buildPriority.
+    '''
+    if inSnapshot is None:
+        inSnapshot = ConnectionSnapshot( [ inCharacterNode ] )
+    modules = [ destination.split( '.' )[0] for destination in inSnapshot.getDestinations( inCharacterNode, 'modules' ) ]
+    priorities = NodeUtility.getModulePriorities( modules )
+    modules = sorted( set( modules ), key=lambda module: ( priorities[ module ], module ) )
+
+    # A character root must also have a module component on it's top most bit.
+    characterBit = inSnapshot.getNodeAttrSource( inCharacterNode, 'parentName' )[0]
+    characterModule = NodeUtility.checkBitForComponent( characterBit, MODULE_ROOT_CLASS )
+    if characterModule is None:
+        OpenMaya.MGlobal.displayError( 'The character\'s root module is missing a module component on it\'s top most bit.' )
+    else:
+        if characterModule in modules:
+            modules.remove( characterModule )
+        modules.insert( 0, characterModule )
+    return modules
+
+def findParentBit( inBit, inBits ):
+    '''
+    @param inBit: String. Full path name of a bit.
+    @param inBits: Dictionary or set. Full path names of the bits to look for.
+    @return: String. Full path name of the nearest bit above inBit that is in inBits,
+        or None.
+    '''
+    parent = inBit.rpartition( '|' )[0]
+    while parent:
+        if parent in inBits:
+            return parent
+        parent = parent.rpartition( '|' )[0]
+    return None
+
+def compileBits( inGroupNames, inBits, inJoints, inControls ):
+    '''
+    Turns bits into a graph of build tasks.
+
+    @param inGroupNames: List of strings. Names of the skeleton and rig groups.
+    @param inBits: List of strings. Full path names of the bits, in build order.
+    @param inJoints: Dictionary. For bits with a joint component, the component's
+        JOINT_INPUTS plus its node name under 'node', keyed by bit.
+    @param inControls: Dictionary. Same for bits with a control component, with
+        CONTROL_INPUTS.
+    @return: BuildGraph.
+    '''
+    graph = BuildGraph()
+    graph.addTask( BuildTask( SKELETON_GROUP_KEY, 'group', inGroupNames[0], makeGroup, [ inGroupNames[0] ] ) )
+    graph.addTask( BuildTask( RIG_GROUP_KEY, 'group', inGroupNames[1], makeGroup, [ inGroupNames[1] ] ) )
+
+    # Joints, controls and spacers.
+    for bit in inBits:
+        if bit in inJoints:
+            joint = inJoints[ bit ]
+            graph.addTask( BuildTask( 'joint:'+bit, 'joint', joint[ 'jointName' ], buildJoint, [ joint[ 'node' ] ], inInputs=joint, inBit=bit ) )
+        if bit in inControls:
+            control = inControls[ bit ]
+            graph.addTask( BuildTask( 'control:'+bit, 'control', control[ 'controlName' ], buildControl, [ control[ 'node' ] ], inInputs=control, inBit=bit ) )
+            graph.addTask( BuildTask( 'spacer:'+bit, 'spacer', 'sp_{0}'.format( control[ 'controlName' ] ), buildSpacer, [ control[ 'node' ], 'control:'+bit ], [ 'control:'+bit ], inBit=bit ) )
+
+    # Hierarchy. Joints go under the nearest joint above them, or the skeleton
+    # group. Control spacers go under the nearest control above them, or the rig
+    # group. A bit with a joint and a control has its joint driven by the control.
+    for bit in inBits:
+        if bit in inJoints:
+            parentBit = findParentBit( bit, inJoints )
+            if parentBit is None:
+                parentKey = SKELETON_GROUP_KEY
+            else:
+                parentKey = 'joint:'+parentBit
+            graph.addTask( BuildTask( 'parent:joint:'+bit, 'parent', graph.tasks[ 'joint:'+bit ].name, parentNode, [ 'joint:'+bit, parentKey ], [ 'joint:'+bit, parentKey ], inBit=bit ) )
+        if bit in inControls:
+            parentBit = findParentBit( bit, inControls )
+            if parentBit is None:
+                parentKey = RIG_GROUP_KEY
+            else:
+                parentKey = 'control:'+parentBit
+            graph.addTask( BuildTask( 'parent:spacer:'+bit, 'parent', graph.tasks[ 'spacer:'+bit ].name, parentNode, [ 'spacer:'+bit, parentKey ], [ 'spacer:'+bit, parentKey ], inBit=bit ) )
+        if bit in inJoints and bit in inControls:
+            graph.addTask( BuildTask( 'constraint:'+bit, 'constraint', graph.tasks[ 'joint:'+bit ].name, constrainNode, [ 'control:'+bit, 'joint:'+bit ],
+                                      [ 'parent:joint:'+bit, 'parent:spacer:'+bit ], inBit=bit ) )
+    return graph
+
+def compileCharacter( inCharacterNode ):
+    '''
+    Turns a character in the scene into a graph of build tasks. Nothing is built.
+
+    @param inCharacterNode: String. Name of the character root component node.
+    @return: BuildGraph.
+    '''
+    groupNames = NodeUtility.getPlugValues( inCharacterNode, [ 'skeletonGroupName', 'rigGroupName' ] )
+
+    # Every bit of every module, in build order.
+    snapshot = ConnectionSnapshot( [ inCharacterNode ] )
+    modules = []
+    bits = []
+    for module in getCharacterModules( inCharacterNode, snapshot ):
+        moduleBit = NodeUtility.getDagPath( snapshot.getNodeAttrSource( module, 'parentName' )[0] ).fullPathName()
+        moduleBits = NodeUtility.getModuleBits( moduleBit )
+        moduleInfo = NodeUtility.getPlugValues( module, MODULE_INPUTS )
+        moduleInfo.update( { 'rootBit':moduleBit, 'bitCount':len( moduleBits ) } )
+        modules.append( moduleInfo )
+        bits.extend( moduleBits )
+    bitComponents = components.getBitComponents( bits, snapshot )
+
+    # Bit full path -> component inputs.
+    joints = {}
+    controls = {}
+    for bit in bits:
+        for compNode in sorted( bitComponents[ bit ] ):
+            classType = bitComponents[ bit ][ compNode ]
+            # The first component of a class wins, like checkBitForComponent.
+            if classType == JOINT_CLASS and bit not in joints:
+                joints[ bit ] = NodeUtility.getPlugValues( compNode, JOINT_INPUTS )
+                joints[ bit ][ 'node' ] = compNode
+            elif classType == CONTROL_CLASS and bit not in controls:
+                controls[ bit ] = NodeUtility.getPlugValues( compNode, CONTROL_INPUTS )
+                controls[ bit ][ 'node' ] = compNode
+
+    graph = compileBits( [ groupNames[ 'skeletonGroupName' ], groupNames[ 'rigGroupName' ] ], bits, joints, controls )
+    graph.modules = modules
+    return graph
+
+def readPresetBits( inFile ):
+    '''
+    @param inFile: String. Full path to a module or character preset, XML or binary.
+    @return: Tuple of BitRecord. Read through PRESET_CACHE.
+    '''
+    if inFile.endswith( PresetBinary.BINARY_EXTENSION ):
+        return PRESET_CACHE.get( inFile, PresetBinary.readModuleBinary )
+    return PRESET_CACHE.get( inFile, PresetUtility.readModulePreset )
+
+def getComponentInputs( inComponent, inInputs ):
+    '''
+    @param inComponent: ComponentRecord.
+    @param inInputs: List of strings. Plug names.
+    @return: Dictionary. Values of the plugs, keyed by name. Plugs missing from the
+        preset are None.
+    '''
+    values = dict( ( plug.name, plug.value ) for plug in inComponent.plugs )
+    return dict( ( plugName, values.get( plugName ) ) for plugName in inInputs )
+
+def compilePreset( inBits, inGroupNames=( 'skeleton', 'rig' ) ):
+    '''
+    Turns the bits of a module or character preset into a graph of build tasks.
+    The graph is for planning. Its tasks have no component nodes to run with.
+
+    Modules are found by their ModuleRootComponent. The module on the top bit comes
+    first, then the rest by buildPriority, like compileCharacter. Bits that aren't
+    in a module aren't built.
+
+    @param inBits: List of BitRecord. Parents before children, the way
+        PresetUtility.planModuleBuild orders them.
+    @param inGroupNames: List of strings. Names of the skeleton and rig groups. A
+        CharacterRootComponent in the preset overrides them.
+    @return: BuildGraph.
+    '''
+    groupNames = list( inGroupNames )
+
+    # Module root bit -> [ module info, bits ]
+    modules = collections.OrderedDict()
+    moduleRoots = {}
+    joints = {}
+    controls = {}
+    for bit in inBits:
+        bitPath = PresetUtility.getBitPath( bit )
+        for index, comp in enumerate( bit.components ):
+            if comp.name == MODULE_ROOT_CLASS and bitPath not in modules:
+                moduleInfo = getComponentInputs( comp, MODULE_INPUTS )
+                moduleInfo.update( { 'rootBit':bitPath, 'bitCount':0 } )
+                modules[ bitPath ] = [ moduleInfo, [] ]
+            elif comp.name == CHARACTER_ROOT_CLASS:
+                characterInputs = getComponentInputs( comp, [ 'skeletonGroupName', 'rigGroupName' ] )
+                groupNames = [ characterInputs[ 'skeletonGroupName' ] or groupNames[0], characterInputs[ 'rigGroupName' ] or groupNames[1] ]
+            elif comp.name == JOINT_CLASS and bitPath not in joints:
+                joints[ bitPath ] = getComponentInputs( comp, JOINT_INPUTS )
+                joints[ bitPath ][ 'node' ] = index
+            elif comp.name == CONTROL_CLASS and bitPath not in controls:
+                controls[ bitPath ] = getComponentInputs( comp, CONTROL_INPUTS )
+                controls[ bitPath ][ 'node' ] = index
+
+        # Bits belong to the nearest module root at or above them.
+        if bitPath in modules:
+            moduleRoots[ bitPath ] = bitPath
+        elif bit.parent not in ( None, 'None' ) and bit.parent in moduleRoots:
+            moduleRoots[ bitPath ] = moduleRoots[ bit.parent ]
+        if bitPath in moduleRoots:
+            modules[ moduleRoots[ bitPath ] ][1].append( bitPath )
+
+    # The top module first, then by priority.
+    moduleList = modules.values()
+    moduleList = moduleList[:1]+sorted( moduleList[1:], key=lambda module: ( module[0][ 'buildPriority' ], module[0][ 'rootBit' ] ) )
+    bits = []
+    for moduleInfo, moduleBits in moduleList:
+        moduleInfo[ 'bitCount' ] = len( moduleBits )
+        bits.extend( moduleBits )
+
+    graph = compileBits( groupNames, bits, joints, controls )
+    graph.modules = [ moduleInfo for moduleInfo, moduleBits in moduleList ]
+    return graph
+
+def getManifest( inGraph ):
+    '''
+    Lists what a graph would build, in the order it would build it.
+
+    @param inGraph: BuildGraph.
+    @return: Dictionary.
+        modules         Module info, in build order.
+        groups          Group names.
+        joints          jointName, bit and the component inputs of each joint.
+        controls        controlName, bit and the component inputs of each control.
+        spacers         Spacer names and the control each one holds.
+        connections     Parenting ( type, child, parent ) and constraints
+                        ( type, target, constrained ).
+        counts          Number of each of the above, plus tasks.
+    '''
+    manifest = { 'modules':list( inGraph.modules ),
+                 'groups':[],
+                 'joints':[],
+                 'controls':[],
+                 'spacers':[],
+                 'connections':[] }
+    tasks = inGraph.tasks
+    for task in inGraph.getOrder():
+        if task.kind == 'group':
+            manifest[ 'groups' ].append( task.name )
+        elif task.kind == 'joint':
+            manifest[ 'joints' ].append( { 'name':task.name, 'bit':task.bit, 'inputs':dict( ( key, value ) for key, value in task.inputs.iteritems() if key != 'node' ) } )
+        elif task.kind == 'control':
+            manifest[ 'controls' ].append( { 'name':task.name, 'bit':task.bit, 'inputs':dict( ( key, value ) for key, value in task.inputs.iteritems() if key != 'node' ) } )
+        elif task.kind == 'spacer':
+            manifest[ 'spacers' ].append( { 'name':task.name, 'bit':task.bit, 'control':tasks[ task.dependencies[0] ].name } )
+        elif task.kind == 'parent':
+            manifest[ 'connections' ].append( { 'type':'parent', 'child':task.name, 'parent':tasks[ task.args[1] ].name } )
+        elif task.kind == 'constraint':
+            manifest[ 'connections' ].append( { 'type':'constraint', 'target':tasks[ task.args[0] ].name, 'constrained':task.name } )
+    manifest[ 'counts' ] = dict( ( section, len( manifest[ section ] ) ) for section in manifest )
+    manifest[ 'counts' ][ 'tasks' ] = len( tasks )
+    return manifest
+
+def formatManifestJSON( inManifest ):
+    '''
+    @param inManifest: Dictionary. From getManifest.
+    @return: String. The manifest as JSON.
+    '''
+    return json.dumps( inManifest, indent=4, sort_keys=True )
+
+def planCharacter( inCharacterNode ):
+    '''
+    Works out what building a character in the scene would make, without building it.
+
+    @param inCharacterNode: String. Name of the character root component node.
+    @return: Dictionary. See getManifest.
+    '''
+    return getManifest( compileCharacter( inCharacterNode ) )
+
+def planPreset( inFile ):
+    '''
+    Works out what building a module or character preset would make. Only the file
+    is read, so this works without a scene.
+
+    @param inFile: String. Full path to the preset, XML or binary.
+    @return: Dictionary. See getManifest. 'preset' holds inFile. 'orphans' and
+        'duplicates' hold the paths of bits that can't be built, see
+        PresetUtility.planModuleBuild.
+    '''
+    plan = PresetUtility.planModuleBuild( readPresetBits( inFile ) )
+    manifest = getManifest( compilePreset( plan.order ) )
+    manifest[ 'preset' ] = inFile
+    manifest[ 'orphans' ] = [ PresetUtility.getBitPath( bit ) for bit in plan.orphans ]
+    manifest[ 'duplicates' ] = [ PresetUtility.getBitPath( bit ) for bit in plan.duplicates ]
+    return manifest
+
+def planPresets( inFiles ):
+    '''
+    Plans a batch of presets. A preset that can't be read is reported instead of
+    stopping the batch.
+
+    @param inFiles: List of strings. Full paths to the presets.
+    @return: Dictionary. Manifests keyed by file. Presets that couldn't be read
+        have a dictionary with the error under 'error'.
+    '''
+    manifests = {}
+    for presetFile in inFiles:
+        try:
+            manifests[ presetFile ] = planPreset( presetFile )
+        except ( EnvironmentError, ValueError, SyntaxError ) as e:
+            manifests[ presetFile ] = { 'preset':presetFile, 'error':str( e ) }
+    return manifests
+
+def buildCharacter( inCharacterNode ):
+    '''
+    Compiles and builds a character.
+
+    @param inCharacterNode: String. Name of the character root component node.
+    @return: BuildGraph. The graph that was run. Its results hold the built nodes.
+    '''
+    graph = compileCharacter( inCharacterNode )
+    graph.run()
+    return graph
@@ -0,0 +1,134 @@
+'''
+Snapshot of the connections of a set of nodes.
+
+Bits, components and meta nodes are tied together with message attributes.
+NodeUtility.getAttrMessageValue, getNodeAttrSource and getNodeAttrDestination ask
+cmds.connectionInfo about one attribute at a time. A ConnectionSnapshot reads every
+connection of each node once, through MPlug.connectedTo, and answers the same
+questions from an adjacency map:
+
+    { node: { attribute: [ source plug or None, [ destination plugs ] ] } }
+
+Plugs are 'node.attribute' strings, like connectionInfo returns. Nodes that
+weren't in the snapshot are read the first time they are asked about. The
+snapshot doesn't follow later changes to the scene, so make a new one after
+connecting or disconnecting anything.
+'''
+import maya.OpenMaya as OpenMaya
+import marigold.utility.NodeUtility as NodeUtility
+
+class ConnectionSnapshot( object ):
+    '''
+    Adjacency map of the connections of a set of nodes.
+    '''
+    def __init__( self, inNodes=(), inMessageOnly=True ):
+        '''
+        @param inNodes: List of strings. Names of the nodes to read.
+        @param inMessageOnly: Bool. Only read connections of message attributes.
+        '''
+        self.messageOnly = inMessageOnly
+        self.connections = {}
+        self.addNodes( inNodes )
+
+    def addNodes( self, inNodes ):
+        '''
+        Reads the connections of nodes that aren't in the snapshot yet.
+
+        @param inNodes: List of strings. Names of the nodes.
+        '''
+        plugs = OpenMaya.MPlugArray()
+        otherPlugs = OpenMaya.MPlugArray()
+        depFn = OpenMaya.MFnDependencyNode()
+        for node in inNodes:
+            if node in self.connections:
+                continue
+            nodeConnections = {}
+            self.connections[ node ] = nodeConnections
+            depFn.setObject( NodeUtility.getDependNode( node ) )
+            plugs.clear()
+            try:
+                depFn.getConnections( plugs )
+            except RuntimeError:
+                # Nothing connected.
+                continue
+            for i in xrange( plugs.length() ):
+                plug = plugs[i]
+                if self.messageOnly and plug.attribute().apiType() != OpenMaya.MFn.kMessageAttribute:
+                    continue
+                attr = plug.partialName( False, False, False, False, False, True )
+                plug.connectedTo( otherPlugs, True, False )
+                source = None
+                if otherPlugs.length():
+                    source = unicode( otherPlugs[0].name() )
+                plug.connectedTo( otherPlugs, False, True )
+                destinations = [ unicode( otherPlugs[j].name() ) for j in xrange( otherPlugs.length() ) ]
+                nodeConnections[ attr ] = [ source, destinations ]
+
+    def getConnections( self, inNode ):
+        '''
+        @param inNode: String. Name of the node.
+        @return: Dictionary. [ source, destinations ] keyed by attribute name, for the
+            node's connected attributes.
+        '''
+        self.addNodes( [ inNode ] )
+        return self.connections[ inNode ]
+
+    def getSource( self, inNode, inAttr ):
+        '''
+        @param inNode: String. Name of the node.
+        @param inAttr: String. Name of the attribute.
+        @return: String. Plug connected into the attribute, or None.
+        '''
+        return self.getConnections( inNode ).get( inAttr, [ None, [] ] )[0]
+
+    def getDestinations( self, inNode, inAttr ):
+        '''
+        @param inNode: String. Name of the node.
+        @param inAttr: String. Name of the attribute.
+        @return: List of strings. Plugs the attribute is connected into.
+        '''
+        return self.getConnections( inNode ).get( inAttr, [ None, [] ] )[1]
+
+    def getAttrMessageValue( self, inNode, inAttr ):
+        '''
+        Same as NodeUtility.getAttrMessageValue.
+
+        @param inNode: String. Node with the desired attribute.
+        @param inAttr: String. Name of source attribute.
+        @return: String for unicode. String[] for list.
+        '''
+        source = self.getSource( inNode, inAttr )
+        if source is not None:
+            return source
+        destinations = self.getDestinations( inNode, inAttr )
+        if destinations:
+            return list( destinations )
+        return None
+
+    def getNodeAttrSource( self, inNode, inAttr ):
+        '''
+        Same as NodeUtility.getNodeAttrSource.
+
+        @param inNode: String. Node with the desired attribute.
+        @param inAttr: String. Name of source attribute.
+        @return: Returns list containing the source attribute and it's node.
+        '''
+        source = self.getSource( inNode, inAttr )
+        if source is None:
+            return None
+        return source.split( '.' )
+
+    def getNodeAttrDestination( self, inNode, inAttr ):
+        '''
+        Same as NodeUtility.getNodeAttrDestination.
+
+        @param inNode: String. Node with the desired attribute.
+        @param inAttr: String. Name of source attribute.
+        @return: Returns list containing the destination attribute and it's node.
+        '''
+        destinations = self.getDestinations( inNode, inAttr )
+        if len( destinations ) == 1:
+            return destinations[0].split( '.' )
+        elif len( destinations ) > 1:
+            return list( destinations )
+        return None
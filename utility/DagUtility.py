@@ -0,0 +1,53 @@
+'''
+Walks frame hierarchies with MItDag.
+
+The generators here yield the full path names of the transforms (bits) under a
+root bit one at a time, parents before their children. Depth first gives the
+same order getFrameRootAllChildren always has. A prune function can stop the
+walk from going into part of the hierarchy, which is how a module's own bits are
+found without the bits of the modules nested under it.
+'''
+import maya.OpenMaya as OpenMaya
+from marigold.utility.NodeCache import NODE_CACHE
+
+def iterDagPaths( inRootName, inBreadthFirst=False, inPrune=None, inIncludeRoot=False ):
+    '''
+    @param inRootName: String. Name of the root bit.
+    @param inBreadthFirst: Bool. Walk a level at a time instead of depth first.
+    @param inPrune: Function. Takes a bit's full path name and returns True to skip
+        that bit and everything below it. Never called for the root.
+    @param inIncludeRoot: Bool. Yield the root as well.
+    @return: Generator of MDagPaths. Only transforms are yielded. The paths are
+        reused by the walk, so copy one to keep it.
+    '''
+    if inBreadthFirst:
+        traversal = OpenMaya.MItDag.kBreadthFirst
+    else:
+        traversal = OpenMaya.MItDag.kDepthFirst
+    dagIt = OpenMaya.MItDag( traversal, OpenMaya.MFn.kTransform )
+    dagIt.reset( NODE_CACHE.getDagPath( inRootName ), traversal, OpenMaya.MFn.kTransform )
+    dagPath = OpenMaya.MDagPath()
+
+    # The first item is the root itself.
+    if not dagIt.isDone():
+        if inIncludeRoot:
+            dagIt.getPath( dagPath )
+            yield dagPath
+        dagIt.next()
+
+    while not dagIt.isDone():
+        dagIt.getPath( dagPath )
+        if inPrune is not None and inPrune( dagPath.fullPathName() ):
+            dagIt.prune()
+        else:
+            yield dagPath
+        dagIt.next()
+
+def iterBits( inRootName, inBreadthFirst=False, inPrune=None, inIncludeRoot=False ):
+    '''
+    Same as iterDagPaths, but yields full path names.
+
+    @return: Generator of strings.
+    '''
+    for dagPath in iterDagPaths( inRootName, inBreadthFirst, inPrune, inIncludeRoot ):
+        yield dagPath.fullPathName()
@@ -2,9 +2,6 @@ import sys
 import maya.OpenMaya as OpenMaya
 import maya.cmds as cmds
 
-import shiboken
-from PySide import QtGui, QtCore
-
 import marigold.utility.TransformUtility as TransformUtility
 import marigold.utility.NodeUtility as NodeUtility
 
@@ -19,27 +16,25 @@ def wrapinstance(ptr, base=None):
     :return: QWidget or subclass instance
     :rtype: QtGui.QWidget
     """
+    # Qt is imported here so the rest of this module works without it, for
+    # example in mayapy.
+    import shiboken
+    from PySide import QtGui, QtCore
     if ptr is None:
         return None
     ptr = long(ptr) #Ensure type
-    if globals().has_key('shiboken'):
-        if base is None:
-            qObj = shiboken.wrapInstance(long(ptr), QtCore.QObject)
-            metaObj = qObj.metaObject()
-            cls = metaObj.className()
-            superCls = metaObj.superClass().className()
-            if hasattr(QtGui, cls):
-                base = getattr(QtGui, cls)
-            elif hasattr(QtGui, superCls):
-                base = getattr(QtGui, superCls)
-            else:
-                base = QtGui.QWidget
-        return shiboken.wrapInstance(long(ptr), base)
-    elif globals().has_key('sip'):
-        base = QtCore.QObject
-        return sip.wrapinstance(long(ptr), base)
-    else:
-        return None
+    if base is None:
+        qObj = shiboken.wrapInstance(long(ptr), QtCore.QObject)
+        metaObj = qObj.metaObject()
+        cls = metaObj.className()
+        superCls = metaObj.superClass().className()
+        if hasattr(QtGui, cls):
+            base = getattr(QtGui, cls)
+        elif hasattr(QtGui, superCls):
+            base = getattr(QtGui, superCls)
+        else:
+            base = QtGui.QWidget
+    return shiboken.wrapInstance(long(ptr), base)
     
 def importModule( inModuleName ):
     '''
@@ -0,0 +1,347 @@
+'''
+Opt-in timing of the marigold utility functions.
+
+enable() swaps the public functions of NodeUtility, TransformUtility and
+XMLUtility, and the buildNode methods of the components, for timed versions.
+disable() puts the originals back, so nothing is timed or slowed down while it is
+off. With inCmds=True the maya.cmds commands are timed as well, which shows how
+much of a build is spent in cmds round trips.
+
+Every call is recorded under the phase it was made in. Calls made by the
+functions in PHASE_FUNCTIONS are recorded under the name of that function, and
+other phases can be named with phase():
+
+    Instrumentation.enable()
+    XMLUtility.loadModule( 'arms', 'fkArm' )
+    Instrumentation.printReport()
+    Instrumentation.dumpStats( 'C:/temp/loadModule.prof' )
+    Instrumentation.disable()
+
+The stats file can be read with pstats, or anything else that reads cProfile
+output. Calls are only recorded from the thread that called enable().
+
+Like PresetUtility, nothing in here imports Maya until enable() is called.
+'''
+import pstats
+import sys
+import thread
+import time
+import types
+
+# Modules timed by enable(), by import name.
+INSTRUMENTED_MODULES = ( 'marigold.utility.NodeUtility',
+                         'marigold.utility.TransformUtility',
+                         'marigold.utility.XMLUtility',
+                         'marigold.utility.CharacterBuild' )
+
+# Component methods timed by enable().
+INSTRUMENTED_METHODS = ( 'buildNode', 'buildControl', 'buildSpacer' )
+
+# Timed functions that start a phase named after themselves.
+PHASE_FUNCTIONS = ( 'XMLUtility.loadModule',
+                    'XMLUtility.writeModuleXML',
+                    'XMLUtility.reapplyModule',
+                    'XMLUtility.createControlFromXML',
+                    'CharacterBuild.buildCharacter' )
+
+# Columns printReport can sort on.
+REPORT_SORT_KEYS = ( 'self', 'cumulative', 'calls', 'name' )
+
+NO_PHASE = ''
+
+_enabled = False
+_threadId = None
+_timer = time.time
+# ( owner, name, original )
+_patches = []
+# [ function key, start time, time spent in timed calls it made ]
+_callStack = []
+_phaseStack = []
+# Function key -> number of calls currently running, to keep recursion out of the
+# cumulative time.
+_running = {}
+# ( phase, function key ) -> [ calls, self time, cumulative time, { caller key: [ calls, self time, cumulative time ] } ]
+_records = {}
+# Function key -> ( file name, line number, label )
+_functionInfo = {}
+
+class phase( object ):
+    '''
+    Context manager naming the phase of the calls made inside it. Phases can be
+    nested. Calls are recorded under the innermost one.
+    '''
+    def __init__( self, inName ):
+        self.name = inName
+
+    def __enter__( self ):
+        if _enabled:
+            _phaseStack.append( self.name )
+        return self
+
+    def __exit__( self, *args ):
+        if _enabled and _phaseStack:
+            _phaseStack.pop()
+        return False
+
+def isEnabled():
+    '''
+    @return: Bool.
+    '''
+    return _enabled
+
+def getCurrentPhase():
+    '''
+    @return: String. Name of the innermost phase, or an empty string.
+    '''
+    if _phaseStack:
+        return _phaseStack[-1]
+    return NO_PHASE
+
+def timeFunction( inFunction, inLabel, inFileName=None, inLineNumber=0, inPhase=None ):
+    '''
+    @param inFunction: Function to time.
+    @param inLabel: String. Name the function is reported under.
+    @param inFileName: String. File the function is in. Taken from the function's code
+        when there is one.
+    @param inLineNumber: Int. Line the function starts on.
+    @param inPhase: String. Phase the calls made by the function are recorded under.
+    @return: Function. Calls inFunction and records the time it took.
+    '''
+    code = getattr( inFunction, 'func_code', None )
+    if code is not None:
+        inFileName = code.co_filename
+        inLineNumber = code.co_firstlineno
+    key = inLabel
+    _functionInfo[ key ] = ( inFileName or '~', inLineNumber, inLabel )
+
+    def timed( *args, **kwargs ):
+        if not _enabled or thread.get_ident() != _threadId:
+            return inFunction( *args, **kwargs )
+        _running[ key ] = _running.get( key, 0 )+1
+        frame = [ key, _timer(), 0.0 ]
+        _callStack.append( frame )
+        if inPhase is not None:
+            _phaseStack.append( inPhase )
+        try:
+            return inFunction( *args, **kwargs )
+        finally:
+            elapsed = _timer()-frame[1]
+            _callStack.pop()
+            if inPhase is not None and _phaseStack:
+                _phaseStack.pop()
+            _running[ key ] -= 1
+            recordCall( key, elapsed, elapsed-frame[2], _running[ key ] == 0 )
+            if _callStack:
+                _callStack[-1][2] += elapsed
+
+    timed.__name__ = getattr( inFunction, '__name__', inLabel )
+    timed.__doc__ = getattr( inFunction, '__doc__', None )
+    timed.timedFunction = inFunction
+    return timed
+
+def recordCall( inKey, inElapsed, inSelfTime, inOutermost ):
+    '''
+    Adds a finished call to the records.
+
+    @param inKey: String. Function key.
+    @param inElapsed: Float. Seconds the call took.
+    @param inSelfTime: Float. Seconds the call took outside of other timed calls.
+    @param inOutermost: Bool. False for recursive calls, which are already counted
+        in the cumulative time of the outer call.
+    '''
+    cumulative = inElapsed if inOutermost else 0.0
+    record = _records.get( ( getCurrentPhase(), inKey ) )
+    if record is None:
+        record = [ 0, 0.0, 0.0, {} ]
+        _records[ ( getCurrentPhase(), inKey ) ] = record
+    record[0] += 1
+    record[1] += inSelfTime
+    record[2] += cumulative
+    if _callStack:
+        callerRecord = record[3].setdefault( _callStack[-1][0], [ 0, 0.0, 0.0 ] )
+        callerRecord[0] += 1
+        callerRecord[1] += inSelfTime
+        callerRecord[2] += cumulative
+
+def patch( inOwner, inName, inReplacement ):
+    '''
+    Sets an attribute and remembers the original so disable() can put it back.
+    '''
+    _patches.append( ( inOwner, inName, inOwner.__dict__[ inName ] ) )
+    setattr( inOwner, inName, inReplacement )
+
+def instrumentModule( inModule ):
+    '''
+    Times every public function defined in a module.
+
+    @param inModule: Module.
+    '''
+    moduleName = inModule.__name__.rsplit( '.', 1 )[-1]
+    for name, value in sorted( inModule.__dict__.items() ):
+        if name.startswith( '_' ) or not isinstance( value, types.FunctionType ):
+            continue
+        if value.__module__ != inModule.__name__:
+            continue
+        label = '{0}.{1}'.format( moduleName, name )
+        phaseName = name if label in PHASE_FUNCTIONS else None
+        patch( inModule, name, timeFunction( value, label, inPhase=phaseName ) )
+
+def instrumentClassMethods( inBaseClass, inMethodNames ):
+    '''
+    Times methods of a class and all its subclasses. Only methods a class defines
+    itself are timed, so overrides are reported under their own class.
+
+    @param inBaseClass: Class.
+    @param inMethodNames: List of strings. Method names.
+    '''
+    classes = [ inBaseClass ]
+    for cls in classes:
+        classes.extend( cls.__subclasses__() )
+        for name in inMethodNames:
+            method = cls.__dict__.get( name )
+            if method is None:
+                continue
+            label = '{0}.{1}'.format( cls.__name__, name )
+            if isinstance( method, classmethod ):
+                patch( cls, name, classmethod( timeFunction( method.__func__, label ) ) )
+            elif isinstance( method, staticmethod ):
+                patch( cls, name, staticmethod( timeFunction( method.__func__, label ) ) )
+            elif isinstance( method, types.FunctionType ):
+                patch( cls, name, timeFunction( method, label ) )
+
+def instrumentCommands( inCmdsModule ):
+    '''
+    Times every command in maya.cmds.
+
+    @param inCmdsModule: Module. maya.cmds.
+    '''
+    for name, value in sorted( inCmdsModule.__dict__.items() ):
+        if name.startswith( '_' ) or not callable( value ) or isinstance( value, ( types.ModuleType, types.ClassType, type ) ):
+            continue
+        patch( inCmdsModule, name, timeFunction( value, 'cmds.{0}'.format( name ), 'maya.cmds', 0 ) )
+
+def enable( inCmds=False, inModules=INSTRUMENTED_MODULES ):
+    '''
+    Starts timing. Records from earlier runs are kept; use reset() to clear them.
+
+    @param inCmds: Bool. Time the maya.cmds commands as well.
+    @param inModules: List of strings. Modules to time, by import name.
+    '''
+    global _enabled, _threadId
+    if _enabled:
+        return
+    for moduleName in inModules:
+        __import__( moduleName )
+        instrumentModule( sys.modules[ moduleName ] )
+    import marigold.components as components
+    # Component classes are loaded lazily. Load them all so every subclass is timed.
+    components.COMPONENT_REGISTRY.loadAll()
+    instrumentClassMethods( components.BaseComponent, INSTRUMENTED_METHODS )
+    if inCmds:
+        import maya.cmds as cmds
+        instrumentCommands( cmds )
+    _threadId = thread.get_ident()
+    _enabled = True
+
+def disable():
+    '''
+    Stops timing and puts the original functions back. The records are kept.
+    '''
+    global _enabled
+    _enabled = False
+    while _patches:
+        owner, name, original = _patches.pop()
+        setattr( owner, name, original )
+    del _callStack[:]
+    del _phaseStack[:]
+    _running.clear()
+
+def reset():
+    '''
+    Clears the records.
+    '''
+    _records.clear()
+
+def getReport( inSortBy='self', inByPhase=True ):
+    '''
+    @param inSortBy: String. One of REPORT_SORT_KEYS.
+    @param inByPhase: Bool. Keep the same function in different phases apart.
+    @return: List of dictionaries with phase, name, calls, self and cumulative
+        seconds. Sorted with the largest first, or by name.
+    '''
+    if inSortBy not in REPORT_SORT_KEYS:
+        raise ValueError( 'Unknown sort key {0}. Use one of {1}.'.format( inSortBy, ', '.join( REPORT_SORT_KEYS ) ) )
+    rows = {}
+    for ( phaseName, key ), record in _records.iteritems():
+        if not inByPhase:
+            phaseName = NO_PHASE
+        row = rows.get( ( phaseName, key ) )
+        if row is None:
+            row = { 'phase':phaseName, 'name':key, 'calls':0, 'self':0.0, 'cumulative':0.0 }
+            rows[ ( phaseName, key ) ] = row
+        row[ 'calls' ] += record[0]
+        row[ 'self' ] += record[1]
+        row[ 'cumulative' ] += record[2]
+    if inSortBy == 'name':
+        return sorted( rows.itervalues(), key=lambda row: ( row[ 'name' ], row[ 'phase' ] ) )
+    return sorted( rows.itervalues(), key=lambda row: row[ inSortBy ], reverse=True )
+
+def printReport( inSortBy='self', inByPhase=True, inLimit=40 ):
+    '''
+    Prints the report made by getReport.
+
+    @param inLimit: Int. Number of rows to print. None prints them all.
+    '''
+    rows = getReport( inSortBy, inByPhase )
+    print '{0:>8} {1:>10} {2:>10}  {3:<16} {4}'.format( 'calls', 'self', 'cumulative', 'phase', 'function' )
+    for row in rows[ :inLimit ]:
+        print '{0:>8} {1:>10.4f} {2:>10.4f}  {3:<16} {4}'.format( row[ 'calls' ], row[ 'self' ], row[ 'cumulative' ], row[ 'phase' ], row[ 'name' ] )
+
+class _StatsSource( object ):
+    '''
+    Hands the records to pstats.Stats the way a cProfile.Profile would.
+    '''
+    def __init__( self, inByPhase ):
+        self.byPhase = inByPhase
+        self.stats = {}
+
+    def getFunctionKey( self, inPhase, inKey ):
+        fileName, lineNumber, label = _functionInfo[ inKey ]
+        if self.byPhase and inPhase:
+            label = '{0} [{1}]'.format( label, inPhase )
+        return ( fileName, lineNumber, label )
+
+    def create_stats( self ):
+        stats = {}
+        for ( phaseName, key ), record in _records.iteritems():
+            functionKey = self.getFunctionKey( phaseName, key )
+            calls, selfTime, cumulative, callers = stats.get( functionKey, ( 0, 0.0, 0.0, {} ) )
+            callers = dict( callers )
+            for callerKey, callerRecord in record[3].iteritems():
+                callerFunctionKey = self.getFunctionKey( phaseName, callerKey )
+                previous = callers.get( callerFunctionKey, ( 0, 0, 0.0, 0.0 ) )
+                callers[ callerFunctionKey ] = ( previous[0]+callerRecord[0], previous[1]+callerRecord[0],
+                                                 previous[2]+callerRecord[1], previous[3]+callerRecord[2] )
+            stats[ functionKey ] = ( calls+record[0], selfTime+record[1], cumulative+record[2], callers )
+        # pstats wants ( primitive calls, calls, self time, cumulative time, callers ).
+        self.stats = dict( ( functionKey, ( calls, calls, selfTime, cumulative, callers ) )
+                           for functionKey, ( calls, selfTime, cumulative, callers ) in stats.iteritems() )
+
+def getStats( inByPhase=True ):
+    '''
+    @param inByPhase: Bool. Report the same function in different phases apart. The
+        phase is added to the function name.
+    @return: pstats.Stats.
+    '''
+    if not _records:
+        raise ValueError( 'Nothing has been recorded. Call enable() first.' )
+    return pstats.Stats( _StatsSource( inByPhase ) )
+
+def dumpStats( inFile, inByPhase=True ):
+    '''
+    Writes the records as a cProfile compatible stats file.
+
+    @param inFile: String. Path of the file.
+    @param inByPhase: Bool. See getStats.
+    '''
+    getStats( inByPhase ).dump_stats( inFile )
@@ -0,0 +1,291 @@
+'''
+Name to node lookup cache.
+
+NodeUtility.getDependNode and getDagPath go through NODE_CACHE. A name that was
+looked up before is answered from an MObjectHandle (or MDagPath) as long as the
+node is still alive. Scene callbacks drop entries whose names could now point
+somewhere else:
+
+    rename          Entries using the old or new name.
+    node added      Entries using the new node's name, as short names can become
+                    ambiguous.
+    node removed    Entries using the node's name.
+    reparent        Entries using the moved node's name, which covers the long
+                    names of everything below it.
+    new/open scene  Everything.
+
+Entries are indexed by each part of their name, so an event only touches the
+entries it affects.
+
+Plugs found with getPlug are kept per node as well, along with their PlugUtility
+reader and writer once getPlugAccessors has asked for them. A node with cached
+plugs gets its own callback that drops them when an attribute is added to or
+removed from it. Attribute MObjects are cached by node type and attribute name,
+but only for the attributes a node type is created with. Dynamic attributes belong
+to a single node, so they are looked up every time.
+'''
+import maya.OpenMaya as OpenMaya
+import marigold.utility.PlugUtility as PlugUtility
+
+class NodeCache( object ):
+    '''
+    Caches MObjectHandles and MDagPaths by node name.
+    '''
+    def __init__( self ):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._handles = {}
+        self._dagPaths = {}
+        # Node name -> [ MObjectHandle, MFnDependencyNode, { plug name: [ MPlug, accessors ] }, callback id ]
+        self._plugs = {}
+        # ( node type, attribute name ) -> attribute MObject
+        self._attributes = {}
+        # Name part -> names in the cache using it.
+        self._nameParts = {}
+        self._callbackIds = []
+
+    @staticmethod
+    def getNameParts( inName ):
+        '''
+        @param inName: String. Node name as passed to a lookup. Can be a long name,
+            or have a plug on the end.
+        @return: List of strings. Node names making up the name.
+        '''
+        nodePath = inName.split( '.', 1 )[0]
+        return [ part for part in nodePath.split( '|' ) if part ]
+
+    def getDependNode( self, inObj ):
+        '''
+        @param inObj: String. Name of the node.
+        @return: MObject.
+        '''
+        handle = self._handles.get( inObj )
+        if handle is not None and handle.isValid() and handle.isAlive():
+            self.hits += 1
+            return handle.object()
+
+        self.misses += 1
+        self.installCallbacks()
+        selList = OpenMaya.MSelectionList()
+        selList.add( inObj )
+        mObj = OpenMaya.MObject()
+        selList.getDependNode( 0, mObj )
+        self._handles[ inObj ] = OpenMaya.MObjectHandle( mObj )
+        self._addName( inObj )
+        return mObj
+
+    def getDagPath( self, inObjName ):
+        '''
+        @param inObjName: String. Name of the DAG node.
+        @return: MDagPath. A copy, so callers can change it without touching the cache.
+        '''
+        entry = self._dagPaths.get( inObjName )
+        if entry is not None and entry[1].isValid() and entry[1].isAlive() and entry[0].isValid():
+            self.hits += 1
+            return OpenMaya.MDagPath( entry[0] )
+
+        self.misses += 1
+        self.installCallbacks()
+        selList = OpenMaya.MSelectionList()
+        selList.add( inObjName )
+        mDagPath = OpenMaya.MDagPath()
+        selList.getDagPath( 0, mDagPath )
+        self._dagPaths[ inObjName ] = ( OpenMaya.MDagPath( mDagPath ), OpenMaya.MObjectHandle( mDagPath.node() ) )
+        self._addName( inObjName )
+        return mDagPath
+
+    def getPlug( self, inObj, inPlugName ):
+        '''
+        @param inObj: String. Name of the node.
+        @param inPlugName: String. Name of the plug.
+        @return: MPlug. A copy, so callers can change it without touching the cache.
+        '''
+        return self._findPlug( self._getPlugEntry( inObj ), inPlugName )
+
+    def getPlugs( self, inObj, inPlugNames ):
+        '''
+        Like getPlug for several plugs of the same node. The node is only checked once.
+
+        @param inObj: String. Name of the node.
+        @param inPlugNames: List of strings. Names of the plugs.
+        @return: List of MPlugs, in the same order as inPlugNames.
+        '''
+        entry = self._getPlugEntry( inObj )
+        return [ self._findPlug( entry, plugName ) for plugName in inPlugNames ]
+
+    def getPlugAccessors( self, inObj, inPlugNames ):
+        '''
+        Like getPlugs, but also gives the PlugUtility reader and writer of each plug.
+        They are kept with the cached plug, so they are only worked out once per
+        node and plug name. Use PlugUtility.getAccessorWriter to get the writer.
+
+        @param inObj: String. Name of the node.
+        @param inPlugNames: List of strings. Names of the plugs.
+        @return: List of [ MPlug, accessors ] pairs, in the same order as inPlugNames.
+        '''
+        entry = self._getPlugEntry( inObj )
+        plugAccessors = []
+        for plugName in inPlugNames:
+            cached = self._findCachedPlug( entry, plugName )
+            if cached[1] is None:
+                cached[1] = PlugUtility.getAttributeAccessors( entry[1], cached[0].attribute() )
+            plugAccessors.append( [ OpenMaya.MPlug( cached[0] ), cached[1] ] )
+        return plugAccessors
+
+    def getAttribute( self, inDepFn, inAttrName ):
+        '''
+        @param inDepFn: MFnDependencyNode. Function set attached to the node.
+        @param inAttrName: String. Name of the attribute.
+        @return: MObject. The attribute, or a null MObject if the node doesn't have it.
+        '''
+        key = ( inDepFn.typeName(), inAttrName )
+        attr = self._attributes.get( key )
+        if attr is not None:
+            self.hits += 1
+            return attr
+
+        self.misses += 1
+        self.installCallbacks()
+        attr = inDepFn.attribute( inAttrName )
+        if not attr.isNull() and inDepFn.attributeClass( attr ) == OpenMaya.MFnDependencyNode.kNormalAttr:
+            self._attributes[ key ] = attr
+        return attr
+
+    def invalidateName( self, inName ):
+        '''
+        Drops every entry with the given node name in it.
+
+        @param inName: String. Short name of a node.
+        '''
+        for name in self._nameParts.pop( inName, () ):
+            if self._handles.pop( name, None ) is not None:
+                self.invalidations += 1
+            if self._dagPaths.pop( name, None ) is not None:
+                self.invalidations += 1
+            self._dropPlugs( name )
+
+    def clear( self ):
+        '''
+        Drops everything.
+        '''
+        for name in self._plugs.keys():
+            self._dropPlugs( name )
+        self.invalidations += len( self._handles )+len( self._dagPaths )+len( self._attributes )
+        self._handles.clear()
+        self._dagPaths.clear()
+        self._attributes.clear()
+        self._nameParts.clear()
+
+    def getStats( self ):
+        '''
+        @return: Dictionary. Hit, miss and invalidation counts plus the number of entries.
+        '''
+        return { 'hits':self.hits,
+                 'misses':self.misses,
+                 'invalidations':self.invalidations,
+                 'nodes':len( self._handles ),
+                 'dagPaths':len( self._dagPaths ),
+                 'plugs':sum( len( entry[2] ) for entry in self._plugs.itervalues() ),
+                 'attributes':len( self._attributes ) }
+
+    def resetStats( self ):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def installCallbacks( self ):
+        '''
+        Adds the scene callbacks that keep the cache honest. Only done once.
+        '''
+        if self._callbackIds:
+            return
+        self._callbackIds.append( OpenMaya.MNodeMessage.addNameChangedCallback( OpenMaya.MObject(), self._nameChanged ) )
+        self._callbackIds.append( OpenMaya.MDGMessage.addNodeAddedCallback( self._nodeAdded, 'dependNode' ) )
+        self._callbackIds.append( OpenMaya.MDGMessage.addNodeRemovedCallback( self._nodeRemoved, 'dependNode' ) )
+        self._callbackIds.append( OpenMaya.MDagMessage.addAllDagChangesCallback( self._dagChanged ) )
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kBeforeNew, self._sceneChanged ) )
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kBeforeOpen, self._sceneChanged ) )
+        # Reloading a plug-in makes new attribute objects for its node types.
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kAfterPluginUnload, self._pluginUnloaded ) )
+
+    def removeCallbacks( self ):
+        '''
+        Removes the scene callbacks and empties the cache. Call before reloading
+        the module.
+        '''
+        for callbackId in self._callbackIds:
+            OpenMaya.MMessage.removeCallback( callbackId )
+        self._callbackIds = []
+        self.clear()
+
+    def _addName( self, inName ):
+        for part in self.getNameParts( inName ):
+            self._nameParts.setdefault( part, set() ).add( inName )
+
+    def _getPlugEntry( self, inObj ):
+        entry = self._plugs.get( inObj )
+        if entry is None or not ( entry[0].isValid() and entry[0].isAlive() ):
+            self._dropPlugs( inObj )
+            mObj = self.getDependNode( inObj )
+            entry = [ OpenMaya.MObjectHandle( mObj ), OpenMaya.MFnDependencyNode( mObj ), {}, None ]
+            entry[3] = OpenMaya.MNodeMessage.addAttributeAddedOrRemovedCallback( mObj, self._attributeAddedOrRemoved, inObj )
+            self._plugs[ inObj ] = entry
+            self._addName( inObj )
+        return entry
+
+    def _findCachedPlug( self, inEntry, inPlugName ):
+        cached = inEntry[2].get( inPlugName )
+        if cached is None:
+            self.misses += 1
+            cached = [ inEntry[1].findPlug( inPlugName ), None ]
+            inEntry[2][ inPlugName ] = cached
+        else:
+            self.hits += 1
+        return cached
+
+    def _findPlug( self, inEntry, inPlugName ):
+        return OpenMaya.MPlug( self._findCachedPlug( inEntry, inPlugName )[0] )
+
+    def _dropPlugs( self, inName ):
+        entry = self._plugs.pop( inName, None )
+        if entry is not None:
+            self.invalidations += len( entry[2] )
+            try:
+                OpenMaya.MMessage.removeCallback( entry[3] )
+            except RuntimeError:
+                # Already gone with the node.
+                pass
+
+    def _attributeAddedOrRemoved( self, inMessage, inPlug, inName ):
+        entry = self._plugs.get( inName )
+        if entry is not None:
+            self.invalidations += len( entry[2] )
+            entry[2].clear()
+
+    def _invalidateNode( self, inNode ):
+        if not inNode.isNull():
+            self.invalidateName( OpenMaya.MFnDependencyNode( inNode ).name() )
+
+    def _nameChanged( self, inNode, inPrevName, *args ):
+        self.invalidateName( inPrevName )
+        self._invalidateNode( inNode )
+
+    def _nodeAdded( self, inNode, *args ):
+        self._invalidateNode( inNode )
+
+    def _nodeRemoved( self, inNode, *args ):
+        self._invalidateNode( inNode )
+
+    def _dagChanged( self, inMessage, inChild, inParent, *args ):
+        self._invalidateNode( inChild.node() )
+
+    def _sceneChanged( self, *args ):
+        self.clear()
+
+    def _pluginUnloaded( self, *args ):
+        self.clear()
+        PlugUtility.clearPlugAccessors()
+
+# The cache shared by everything in the process.
+NODE_CACHE = NodeCache()
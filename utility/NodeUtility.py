@@ -1,6 +1,9 @@
-import types
 import maya.cmds as cmds
 import maya.OpenMaya as OpenMaya
+import marigold.utility.PlugUtility as PlugUtility
+import marigold.utility.DagUtility as DagUtility
+from marigold.utility.NodeCache import NODE_CACHE
+from marigold.utility.SceneIndex import SCENE_INDEX
 
 def connectPlugs( inSourcePlug, inDestinationPlug ):
     '''
@@ -108,25 +111,21 @@ def getDependNode( inObj ):
     @param inObj: String.
     @return MObject.
     '''
-    selList = OpenMaya.MSelectionList()
-    selList.add( inObj )
-    mObj = OpenMaya.MObject()
-    selList.getDependNode( 0, mObj )
-    return mObj
+    return NODE_CACHE.getDependNode( inObj )
 
 def getDagPath( inObjName ):
     '''
     Takes an object name as a string and returns
     its dag path.
     '''
-    # make an empty selection list
-    selList = OpenMaya.MSelectionList()
-    # add the object to the list
-    selList.add( inObjName )
-    # create an empty dagpath and fill it with the object's
-    mDagPath = OpenMaya.MDagPath()
-    selList.getDagPath( 0, mDagPath )
-    return mDagPath
+    return NODE_CACHE.getDagPath( inObjName )
+
+def getNodeCacheStats():
+    '''
+    @return: Dictionary. Hit, miss and invalidation counts of the node, plug and
+        attribute lookup cache.
+    '''
+    return NODE_CACHE.getStats()
 
 def isValidMPlug( inObj ):
     '''
@@ -217,67 +216,24 @@ def getPlug( inObj, inPlugName ):
     @param inPlugName: String.
     @return MPlug.
     '''
-    mObj = getDependNode( inObj )
-    #print mObj.apiTypeStr()
-    depFn = OpenMaya.MFnDependencyNode()
-    depFn.setObject( mObj )
-    plug = depFn.findPlug( inPlugName )
-    return plug#.node()
+    return NODE_CACHE.getPlug( inObj, inPlugName )
+
+def getNodeAttribute( inDepFn, inAttrName ):
+    '''
+    Faster MFnDependencyNode.attribute() for attributes that come with the node type.
+    
+    @param inDepFn: MFnDependencyNode.
+    @param inAttrName: String.
+    @return: MObject. Null if the node doesn't have the attribute.
+    '''
+    return NODE_CACHE.getAttribute( inDepFn, inAttrName )
     
 def getPlugValue( inPlug ):
     '''
     @param inPlug: MPlug. The node plug.
     @return: The value of the passed in node plug.
     '''
-    pAttribute = inPlug.attribute()
-    apiType = pAttribute.apiType()
-    
-    # Float Groups - rotate, translate, scale; Compounds
-    if apiType in [ OpenMaya.MFn.kAttribute3Double, OpenMaya.MFn.kAttribute3Float, OpenMaya.MFn.kCompoundAttribute ]:
-        result = []
-        if inPlug.isCompound():
-            for c in xrange( inPlug.numChildren() ):
-                result.append( getPlugValue( inPlug.child( c ) ) )
-            return result
-    
-    # Distance
-    elif apiType in [ OpenMaya.MFn.kDoubleLinearAttribute, OpenMaya.MFn.kFloatLinearAttribute ]:
-        return inPlug.asMDistance().asCentimeters()
-    
-    # Angle
-    elif apiType in [ OpenMaya.MFn.kDoubleAngleAttribute, OpenMaya.MFn.kFloatAngleAttribute ]:
-        return inPlug.asMAngle().asDegrees()
-    
-    # TYPED
-    elif apiType == OpenMaya.MFn.kTypedAttribute:
-        pType = OpenMaya.MFnTypedAttribute( pAttribute ).attrType()
-        
-        # Matrix
-        if pType == OpenMaya.MFnData.kMatrix:
-            return OpenMaya.MFnMatrixData( inPlug.asMObject() ).matrix()
-        
-        # String
-        elif pType == OpenMaya.MFnData.kString:
-            return inPlug.asString()
-        
-    # MATRIX
-    elif apiType == OpenMaya.MFn.kMatrixAttribute:
-        return OpenMaya.MFnMatrixData( inPlug.asMObject() ).matrix()
-    
-    # NUMBERS
-    elif apiType == OpenMaya.MFn.kNumericAttribute:
-        pType = OpenMaya.MFnNumericAttribute( pAttribute ).unitType()
-
-        if pType == OpenMaya.MFnNumericData.kBoolean:
-            return inPlug.asBool()
-        elif pType in [ OpenMaya.MFnNumericData.kShort, OpenMaya.MFnNumericData.kInt, OpenMaya.MFnNumericData.kLong, OpenMaya.MFnNumericData.kByte ]:
-            return inPlug.asInt()
-        elif pType in [ OpenMaya.MFnNumericData.kFloat, OpenMaya.MFnNumericData.kDouble, OpenMaya.MFnNumericData.kAddr ]:
-            return inPlug.asDouble()
-        
-    # Enum
-    elif apiType == OpenMaya.MFn.kEnumAttribute:
-        return inPlug.asInt()
+    return PlugUtility.readPlug( inPlug )
         
 def setPlugValue( inPlug, inValue ):
     '''
@@ -286,116 +242,64 @@ def setPlugValue( inPlug, inValue ):
     @param *inPlug*: _MPlug_. The node plug.
     @param *inValue*: _Type_. Any value of any data type.
     '''
-    pAttribute = inPlug.attribute()
-    apiType = pAttribute.apiType()
-    #print pAttribute.apiTypeStr()
-    #print inPlug.info()
-    # Float Groups - rotate, translate, scale
-    if apiType in [ OpenMaya.MFn.kAttribute3Double, OpenMaya.MFn.kAttribute3Float ]:
-        result = []
-        if inPlug.isCompound():
-            if isinstance( inValue, types.ListType ):
-                for c in xrange( inPlug.numChildren() ):
-                    result.append( setPlugValue( inPlug.child( c ), inValue[ c ] ) )
-                return result
-            elif type( inValue ) == OpenMaya.MEulerRotation:
-                setPlugValue( inPlug.child( 0 ), inValue.x )
-                setPlugValue( inPlug.child( 1 ), inValue.y )
-                setPlugValue( inPlug.child( 2 ), inValue.z )
-            else:
-                OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type list.'.format( inPlug.info(), inValue, type( inValue ) ) )
-    
-    # Distance
-    elif apiType in [ OpenMaya.MFn.kDoubleLinearAttribute, OpenMaya.MFn.kFloatLinearAttribute ]:
-        if isinstance( inValue, types.FloatType ):
-            value =  OpenMaya.MDistance( inValue, OpenMaya.MDistance.kCentimeters )
-            inPlug.setMDistance( value )
-        else:
-            OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type float.'.format( inPlug.info(), inValue, type( inValue ) ) )
-    
-    # Angle
-    elif apiType in [ OpenMaya.MFn.kDoubleAngleAttribute, OpenMaya.MFn.kFloatAngleAttribute ]:
-        if isinstance( inValue, types.FloatType ):
-            value = OpenMaya.MAngle( inValue, OpenMaya.MAngle.kDegrees )
-            inPlug.setMAngle( value )
-        else:
-            OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type float.'.format( inPlug.info(), inValue, type( inValue ) ) )
-            
-    # Typed - matrix WE DON'T HANDLE THIS CASE YET!!!!!!!!!
-    elif apiType == OpenMaya.MFn.kTypedAttribute:
-        pType = OpenMaya.MFnTypedAttribute( pAttribute ).attrType()
-        if pType == OpenMaya.MFnData.kMatrix:
-            #OpenMaya.MGlobal.displayError( 'Matrix setting hasn\'t been setup yet.' )
-            #return OpenMaya.MFnMatrixData( inPlug.asMObject() ).matrix()
-            if isValidMPlug(inValue):
-                # inValue must be a MPlug!
-                '''
-                sourceValueAsMObject = OpenMaya.MFnMatrixData( inValue.asMObject() ).object()
-                blarg = TransformUtility.getMatrixTranslation( OpenMaya.MFnMatrixData( inValue.asMObject() ).matrix() )
-                print 'blarg: {0},{1},{2}'.format( blarg.x,blarg.y,blarg.z )
-                
-                tlarg = TransformUtility.getMatrixTranslation( OpenMaya.MFnMatrixData( inPlug.asMObject() ).matrix() )
-                print 'tlarg: {0},{1},{2}'.format( tlarg.x,tlarg.y,tlarg.z )
-                
-                print 'sourceValueAsMObject: {0}'.format( sourceValueAsMObject )
-                #inPlug.setMObject( sourceValueAsMObject )
-                dgModifier = OpenMaya.MDGModifier()
-                dgModifier.newPlugValue( inPlug, sourceValueAsMObject )
-                dgModifier.doIt()
-                '''
-                
-                '''
-                MFnTrans = OpenMaya.MFnTransform()
-                MFnTrans.setObject( inPlug.asMObject() )
-                newMatrix = OpenMaya.MFnMatrixData( inPlug.asMObject() ).matrix()
-                transMatrix = OpenMaya.MTransformationMatrix( newMatrix ).asMatrix()
-                MFnTrans.set( transMatrix )
-                '''
-                pass
-            else:
-                plugNode = inPlug.node()
-                
-                MFnTrans = OpenMaya.MFnTransform( plugNode )
-                
-                sourceMatrix = OpenMaya.MTransformationMatrix( inValue )#.asMatrix()
-                MFnTrans.set( sourceMatrix )
-        
-        # String
-        elif pType == OpenMaya.MFnData.kString:
-            value = inValue
-            inPlug.setString( value )
-    
-    # MATRIX
-    elif apiType == OpenMaya.MFn.kMatrixAttribute:
-        if isValidMPlug(inValue):
-            # inValue must be a MPlug!
-            sourceValueAsMObject = OpenMaya.MFnMatrixData( inValue.asMObject() ).object()
-            inPlug.setMObject( sourceValueAsMObject )
-        else:
-            OpenMaya.MGlobal.displayError( 'Value object is not an MPlug. To set a MMatrix value, both passed in variables must be MPlugs.' )
-    
-    # Numbers
-    elif apiType == OpenMaya.MFn.kNumericAttribute:
-        pType = OpenMaya.MFnNumericAttribute( pAttribute ).unitType()
-        if pType == OpenMaya.MFnNumericData.kBoolean:
-            if isinstance( inValue, types.BoolType ):
-                inPlug.setBool( inValue )
-            else:
-                OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type bool.'.format( inPlug.info(), inValue, type( inValue ) ) )
-        elif pType in [ OpenMaya.MFnNumericData.kShort, OpenMaya.MFnNumericData.kInt, OpenMaya.MFnNumericData.kLong, OpenMaya.MFnNumericData.kByte ]:
-            if isinstance( inValue, types.IntType ):
-                inPlug.setInt( inValue )
-            else:
-                OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type int.'.format( inPlug.info(), inValue, type( inValue ) ) )
-        elif pType in [ OpenMaya.MFnNumericData.kFloat, OpenMaya.MFnNumericData.kDouble, OpenMaya.MFnNumericData.kAddr ]:
-            if isinstance( inValue, types.FloatType ):
-                inPlug.setDouble( inValue )
-            else:
-                OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type float.'.format( inPlug.info(), inValue, type( inValue ) ) )
-                
-    # Enums
-    elif apiType == OpenMaya.MFn.kEnumAttribute:
-        inPlug.setInt( inValue )
+    PlugUtility.writePlug( inPlug, inValue )
+
+def getPlugValues( inObj, inAttrs=None ):
+    '''
+    Reads a number of plugs in one pass. Each node is only looked up once, and the
+    readers are kept with the node's cached plugs (see NodeCache.getPlugAccessors),
+    so each one is only worked out the first time a node's attribute is read.
+    
+    @param inObj: String or list. Name of a node, with inAttrs holding the attributes
+        to read. Or a list of ( node, attribute ) pairs.
+    @param inAttrs: List of strings. Attribute names when inObj is a node.
+    @return: Dictionary of values keyed by attribute name when inObj is a node.
+        Otherwise a list of values in the same order as the pairs.
+    '''
+    if inAttrs is not None:
+        plugAccessors = NODE_CACHE.getPlugAccessors( inObj, inAttrs )
+        return dict( ( attr, accessors[0]( plug ) ) for attr, ( plug, accessors ) in zip( inAttrs, plugAccessors ) )
+    values = []
+    for node, attr in inObj:
+        plug, accessors = NODE_CACHE.getPlugAccessors( node, [ attr ] )[0]
+        values.append( accessors[0]( plug ) )
+    return values
+
+def setPlugValues( inObj, inValues=None, inBatch=None ):
+    '''
+    Sets a number of plugs through a single MDGModifier, so they are undone in one
+    step. Values are handled like BatchUtility.PlugBatch.setPlugValue. None values
+    are skipped, so the results of getPlugValues can be passed straight in.
+    
+    @param inObj: String or list. Name of a node, with inValues holding the values.
+        Or a list of ( node, attribute, value ) triples.
+    @param inValues: Dictionary or list. Values keyed by attribute name, or a list of
+        ( attribute, value ) pairs, when inObj is a node.
+    @param inBatch: PlugBatch. Adds the edits to this batch instead of running them
+        straight away.
+    @return: Int. Number of edits made, or added to inBatch.
+    '''
+    # BatchUtility imports this module.
+    import marigold.utility.BatchUtility as BatchUtility
+    
+    if inValues is not None:
+        if isinstance( inValues, dict ):
+            inValues = inValues.items()
+        attrs = [ attr for attr, value in inValues ]
+        edits = zip( NODE_CACHE.getPlugs( inObj, attrs ), [ value for attr, value in inValues ] )
+    else:
+        edits = [ ( NODE_CACHE.getPlug( node, attr ), value ) for node, attr, value in inObj ]
+    
+    batch = inBatch
+    if batch is None:
+        batch = BatchUtility.PlugBatch()
+    startCount = batch.getOperationCount()
+    for plug, value in edits:
+        if value is not None:
+            batch.setPlugValue( plug, value )
+    if inBatch is None:
+        return batch.run()
+    return batch.getOperationCount()-startCount
         
 def getMetaNodesInScene( inNodeType=None ):
     '''
@@ -404,18 +308,7 @@ def getMetaNodesInScene( inNodeType=None ):
     @param string: Meta type to search for in the scene.
     @return list: All meta nodes in the scene of the given meta type. 
     '''
-    nodes = cmds.ls( type='network' )
-    nodeList = []
-    for node in nodes:
-        if attributeCheck( node, 'version' ):
-            if inNodeType is not None:
-                aType = cmds.getAttr( '{0}.metaType'.format( node ) )
-                if aType == inNodeType:
-                    tempList = ( node )
-                    nodeList.append( tempList )
-            else:
-                nodeList.append( node )
-    return nodeList
+    return SCENE_INDEX.getNodes( inMetaType=inNodeType, inAttribute='version' )
 
 def getFrameBitSettings( inFrameBit ):
     '''
@@ -426,11 +319,7 @@ def getFrameBitSettings( inFrameBit ):
     '''    
     attrList = cmds.listAttr( inFrameBit, userDefined=True )
     if attrList is not None:
-        tempDict = {}
-        for attr in attrList:
-            plug = getPlug( inFrameBit, attr )
-            plugValue = getPlugValue( plug )
-            tempDict[ attr ] = plugValue
+        tempDict = getPlugValues( inFrameBit, attrList )
     else:
         tempDict = None
     return tempDict
@@ -458,16 +347,8 @@ def copyBitSettings():
         
         if targetShapeType == sourceShapeType:        
             # The types match. Do the copy of attribute settings.
-            for attr in cmds.listAttr( sourceShape, multi=True, keyable=True ):
-                # Get the plugs.
-                sourcePlug = getPlug( sourceShape, attr )
-                targetPlug = getPlug( targetShape, attr )
-                
-                # Get the source plug value.
-                sourcePlugValue = getPlugValue( sourcePlug )
-                
-                # Set the target's plug value.
-                setPlugValue( targetPlug, sourcePlugValue )
+            attrList = cmds.listAttr( sourceShape, multi=True, keyable=True )
+            setPlugValues( targetShape, getPlugValues( sourceShape, attrList ) )
         else:
             raise ValueError( '{0} and {1} do not match.'.format( selList[0], selList[1] ) )
     
@@ -534,15 +415,24 @@ def getFrameRootAllChildren( inFrameRootName ):
     @param inFrameRootName: String. Name of frame root object.
     @return: List of children. Ordered from highest to lowest in the hierarchy.
     '''
-    children = cmds.listRelatives( inFrameRootName, type='transform', allDescendents=True, fullPath=True )
-    tempList = []
-    if children is not None:
-        for child in children:
-            tempList.insert( 0, child )
-    else:
+    tempList = list( DagUtility.iterBits( inFrameRootName ) )
+    if not tempList:
         tempList = None
     return tempList
 
+def getModuleBits( inModuleRootBit ):
+    '''
+    Gets the bits belonging to a module. Bits of modules nested under it, including
+    their roots, are left out.
+    
+    @param inModuleRootBit: String. Name of the module's root bit.
+    @return: List of bit full path names. The root is first, then the others from
+        highest to lowest in the hierarchy.
+    '''
+    def isModuleRoot( inBit ):
+        return checkBitForComponent( inBit, 'ModuleRootComponent' ) is not None
+    return list( DagUtility.iterBits( inModuleRootBit, inPrune=isModuleRoot, inIncludeRoot=True ) )
+
 def cleanParentFullName( inBitName ):
     '''
     Removes the first | and the group name from a bit's parent's full path name.
@@ -587,14 +477,12 @@ def getModuleComponentSettings( inModuleBit ):
     returnList = []
     
     if attrList is not None:
-        for attrName in attrList:
+        for attrName, plug in zip( attrList, NODE_CACHE.getPlugs( inModuleBit, attrList ) ):
             # The attributes come in order from top to bottom.
             # They also are recursive. So we use that to our advantage.
             # We only need the attribute names that are used by code.
             # Any attribute that is just a container for other attributes can be skipped.
-            attrChildren = cmds.attributeQuery( attrName, node=inModuleBit, listChildren=True )
-            
-            if attrChildren is None:
+            if not plug.isCompound():
                 # Single attribute.
                 returnList.append( attrName )
     else:
@@ -608,27 +496,13 @@ def getCharactersInScene():
     
     @return: string[]
     '''
-    nodes = cmds.ls( type='network' )
-    nodeList = []
-    for node in nodes:
-        if attributeCheck( node, 'modules' ):
-            aType = cmds.getAttr( '{0}.classType'.format( node ) )
-            if aType == 'CharacterRootComponent':
-                nodeList.append( node )
-    return nodeList
+    return SCENE_INDEX.getNodes( inClassType='CharacterRootComponent', inAttribute='modules' )
 
 def getModulesInScenes():
     '''
     Finds all module roots in the active scene.
     '''
-    nodes = cmds.ls( type='network' )
-    nodeList = []
-    for node in nodes:
-        if attributeCheck( node, 'characterRoot' ):
-            aType = cmds.getAttr( '{0}.classType'.format( node ) )
-            if aType == 'ModuleRootComponent':
-                nodeList.append( node )
-    return nodeList
+    return SCENE_INDEX.getNodes( inClassType='ModuleRootComponent', inAttribute='characterRoot' )
 
 def sortModules( inModules, inOrder='ascending', renumber=True ):
     '''
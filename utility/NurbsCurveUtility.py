@@ -11,31 +11,16 @@ def createCurve( inName, inPoints, inDegree=1, inForm=False, inOffset=[0,0,0], i
     @param inOffset: List. Offset for each axis of the curve.
     @return: MObject. Nurbs curve.
     '''
-    controlVerts = OpenMaya.MPointArray()
-    
-    if inForm:
-        form = OpenMaya.MFnNurbsCurve.kClosed
-    else:
-        form = OpenMaya.MFnNurbsCurve.kOpen
-        
-    create2D = False
-    rational = False
-    parent = None
-    
     # Create the points for the curve.
-    for point in inPoints:
-        controlVerts.append( OpenMaya.MPoint( (point[0]*inScale)+inOffset[0], (point[1]*inScale)+inOffset[1], (point[2]*inScale)+inOffset[2] ) )
-    
-    # Make the curve.
-    curveFn = OpenMaya.MFnNurbsCurve()
-    node = curveFn.createWithEditPoints( controlVerts, inDegree, form, create2D, rational, parent )    
+    editPoints = [ ( (point[0]*inScale)+inOffset[0], (point[1]*inScale)+inOffset[1], (point[2]*inScale)+inOffset[2] ) for point in inPoints ]
     
-    # Set the curve's name.
-    MFnDagNode = OpenMaya.MFnDagNode()
-    MFnDagNode.setObject( node )
-    MFnDagNode.setName( inName )
+    # Make the curve. cmds keeps it in the undo queue.
+    node = cmds.curve( name=inName, degree=inDegree, editPoint=editPoints )
+    if inForm:
+        node = cmds.closeCurve( node, replaceOriginal=True, constructionHistory=False )[0]
     
-    return node
+    # The curve is made under the world, and the name handed back may not be unique.
+    return NodeUtility.getDependNode( '|'+node.rpartition( '|' )[2] )
 
 def createCurveCircle( inName, inNormal=[0,1,0], inRadius=1 ):
     '''
@@ -0,0 +1,289 @@
+'''
+Plug readers and writers worked out once per attribute.
+
+NodeUtility.getPlugValue and setPlugValue used to work out how to read and write
+an attribute on every call. Here that is worked out once and turned into a reader
+(plug -> value) and writer (plug, value). Attributes a node type is created with
+are kept by node type and attribute name, so later plugs of the attribute only
+need a dictionary lookup. Dynamic attributes can differ from node to node, so
+NodeCache keeps theirs with the node's cached plugs instead (see
+NodeCache.getPlugAccessors).
+
+Readers and writers only use the plug they are given, so they are shared by every
+attribute of the same kind. A kind is the attribute's API type plus its data or
+numeric type, and the kinds of its children for a compound. It is only worked out
+when an attribute is seen for the first time. Compound readers and writers keep
+one for each child, so their values are read and written as lists.
+
+The values are the same ones getPlugValue and setPlugValue have always used:
+
+    Compounds       List of child values.
+    Distance        Float in centimeters.
+    Angle           Float in degrees.
+    Matrix          MMatrix.
+    String          String.
+    Numbers         Bool, int or float.
+    Enums           Int.
+'''
+import types
+import maya.OpenMaya as OpenMaya
+
+COMPOUND_TYPES = [ OpenMaya.MFn.kAttribute3Double, OpenMaya.MFn.kAttribute3Float, OpenMaya.MFn.kCompoundAttribute ]
+DISTANCE_TYPES = [ OpenMaya.MFn.kDoubleLinearAttribute, OpenMaya.MFn.kFloatLinearAttribute ]
+ANGLE_TYPES = [ OpenMaya.MFn.kDoubleAngleAttribute, OpenMaya.MFn.kFloatAngleAttribute ]
+INT_NUMERIC_TYPES = [ OpenMaya.MFnNumericData.kShort, OpenMaya.MFnNumericData.kInt, OpenMaya.MFnNumericData.kLong, OpenMaya.MFnNumericData.kByte ]
+FLOAT_NUMERIC_TYPES = [ OpenMaya.MFnNumericData.kFloat, OpenMaya.MFnNumericData.kDouble, OpenMaya.MFnNumericData.kAddr ]
+
+# Attribute kind -> [ reader, writer ]
+_accessors = {}
+# ( node type, attribute name ) -> [ reader, writer ], shared with _accessors.
+_attributeAccessors = {}
+
+def readNothing( inPlug ):
+    return None
+
+def writeNothing( inPlug, inValue ):
+    pass
+
+def readMatrix( inPlug ):
+    return OpenMaya.MFnMatrixData( inPlug.asMObject() ).matrix()
+
+def displayTypeError( inPlug, inValue, inTypeName ):
+    OpenMaya.MGlobal.displayError( '{0} :: Passed in value ( {1} ) is {2}. Needs to be type {3}.'.format( inPlug.info(), inValue, type( inValue ), inTypeName ) )
+
+def makeTypedWriter( inSetter, inValueTypes, inTypeName ):
+    '''
+    @param inSetter: Function. Takes the plug and value.
+    @param inValueTypes: Type or tuple of types the value has to be.
+    @param inTypeName: String. Type name used in the error message.
+    @return: Function. Writer that checks the value type before setting it.
+    '''
+    def writer( inPlug, inValue ):
+        if isinstance( inValue, inValueTypes ):
+            inSetter( inPlug, inValue )
+        else:
+            displayTypeError( inPlug, inValue, inTypeName )
+    return writer
+
+def makePlugReader( inAttribute ):
+    '''
+    @param inAttribute: MObject. The attribute.
+    @return: Function. Takes an MPlug of the attribute and returns its value.
+    '''
+    apiType = inAttribute.apiType()
+
+    # Float Groups - rotate, translate, scale; Compounds
+    if apiType in COMPOUND_TYPES:
+        compoundFn = OpenMaya.MFnCompoundAttribute( inAttribute )
+        childReaders = [ makePlugReader( compoundFn.child( c ) ) for c in xrange( compoundFn.numChildren() ) ]
+        def readCompound( inPlug ):
+            if inPlug.isCompound():
+                return [ reader( inPlug.child( c ) ) for c, reader in enumerate( childReaders ) ]
+        return readCompound
+
+    # Distance
+    elif apiType in DISTANCE_TYPES:
+        return lambda inPlug: inPlug.asMDistance().asCentimeters()
+
+    # Angle
+    elif apiType in ANGLE_TYPES:
+        return lambda inPlug: inPlug.asMAngle().asDegrees()
+
+    # TYPED
+    elif apiType == OpenMaya.MFn.kTypedAttribute:
+        pType = OpenMaya.MFnTypedAttribute( inAttribute ).attrType()
+        if pType == OpenMaya.MFnData.kMatrix:
+            return readMatrix
+        elif pType == OpenMaya.MFnData.kString:
+            return OpenMaya.MPlug.asString
+
+    # MATRIX
+    elif apiType == OpenMaya.MFn.kMatrixAttribute:
+        return readMatrix
+
+    # NUMBERS
+    elif apiType == OpenMaya.MFn.kNumericAttribute:
+        pType = OpenMaya.MFnNumericAttribute( inAttribute ).unitType()
+        if pType == OpenMaya.MFnNumericData.kBoolean:
+            return OpenMaya.MPlug.asBool
+        elif pType in INT_NUMERIC_TYPES:
+            return OpenMaya.MPlug.asInt
+        elif pType in FLOAT_NUMERIC_TYPES:
+            return OpenMaya.MPlug.asDouble
+
+    # Enum
+    elif apiType == OpenMaya.MFn.kEnumAttribute:
+        return OpenMaya.MPlug.asInt
+
+    return readNothing
+
+def makePlugWriter( inAttribute ):
+    '''
+    @param inAttribute: MObject. The attribute.
+    @return: Function. Takes an MPlug of the attribute and a value, and sets the plug.
+    '''
+    apiType = inAttribute.apiType()
+
+    # Float Groups - rotate, translate, scale; Compounds
+    if apiType in COMPOUND_TYPES:
+        compoundFn = OpenMaya.MFnCompoundAttribute( inAttribute )
+        childWriters = [ makePlugWriter( compoundFn.child( c ) ) for c in xrange( compoundFn.numChildren() ) ]
+        def writeCompound( inPlug, inValue ):
+            if not inPlug.isCompound():
+                return
+            if isinstance( inValue, ( types.ListType, types.TupleType ) ):
+                for c, writer in enumerate( childWriters ):
+                    writer( inPlug.child( c ), inValue[ c ] )
+            elif type( inValue ) == OpenMaya.MEulerRotation and len( childWriters ) == 3:
+                childWriters[0]( inPlug.child( 0 ), inValue.x )
+                childWriters[1]( inPlug.child( 1 ), inValue.y )
+                childWriters[2]( inPlug.child( 2 ), inValue.z )
+            else:
+                displayTypeError( inPlug, inValue, 'list' )
+        return writeCompound
+
+    # Distance
+    elif apiType in DISTANCE_TYPES:
+        return makeTypedWriter( lambda inPlug, inValue: inPlug.setMDistance( OpenMaya.MDistance( inValue, OpenMaya.MDistance.kCentimeters ) ),
+                                types.FloatType, 'float' )
+
+    # Angle
+    elif apiType in ANGLE_TYPES:
+        return makeTypedWriter( lambda inPlug, inValue: inPlug.setMAngle( OpenMaya.MAngle( inValue, OpenMaya.MAngle.kDegrees ) ),
+                                types.FloatType, 'float' )
+
+    # Typed
+    elif apiType == OpenMaya.MFn.kTypedAttribute:
+        pType = OpenMaya.MFnTypedAttribute( inAttribute ).attrType()
+        if pType == OpenMaya.MFnData.kMatrix:
+            def writeTransformMatrix( inPlug, inValue ):
+                # Copying one matrix plug into another isn't handled yet.
+                if not isinstance( inValue, OpenMaya.MPlug ):
+                    MFnTrans = OpenMaya.MFnTransform( inPlug.node() )
+                    MFnTrans.set( OpenMaya.MTransformationMatrix( inValue ) )
+            return writeTransformMatrix
+        elif pType == OpenMaya.MFnData.kString:
+            return OpenMaya.MPlug.setString
+
+    # MATRIX
+    elif apiType == OpenMaya.MFn.kMatrixAttribute:
+        def writeMatrix( inPlug, inValue ):
+            if isinstance( inValue, OpenMaya.MPlug ):
+                inPlug.setMObject( OpenMaya.MFnMatrixData( inValue.asMObject() ).object() )
+            else:
+                OpenMaya.MGlobal.displayError( 'Value object is not an MPlug. To set a MMatrix value, both passed in variables must be MPlugs.' )
+        return writeMatrix
+
+    # Numbers
+    elif apiType == OpenMaya.MFn.kNumericAttribute:
+        pType = OpenMaya.MFnNumericAttribute( inAttribute ).unitType()
+        if pType == OpenMaya.MFnNumericData.kBoolean:
+            return makeTypedWriter( OpenMaya.MPlug.setBool, types.BoolType, 'bool' )
+        elif pType in INT_NUMERIC_TYPES:
+            return makeTypedWriter( OpenMaya.MPlug.setInt, types.IntType, 'int' )
+        elif pType in FLOAT_NUMERIC_TYPES:
+            return makeTypedWriter( OpenMaya.MPlug.setDouble, types.FloatType, 'float' )
+
+    # Enums
+    elif apiType == OpenMaya.MFn.kEnumAttribute:
+        return OpenMaya.MPlug.setInt
+
+    return writeNothing
+
+def getAttributeKind( inAttribute ):
+    '''
+    @param inAttribute: MObject. The attribute.
+    @return: Tuple. The attribute's API type, then the typed attribute's data type,
+        the numeric attribute's unit type or the kinds of the compound's children.
+    '''
+    apiType = inAttribute.apiType()
+    if apiType in COMPOUND_TYPES:
+        compoundFn = OpenMaya.MFnCompoundAttribute( inAttribute )
+        return ( apiType, )+tuple( getAttributeKind( compoundFn.child( c ) ) for c in xrange( compoundFn.numChildren() ) )
+    elif apiType == OpenMaya.MFn.kTypedAttribute:
+        return ( apiType, OpenMaya.MFnTypedAttribute( inAttribute ).attrType() )
+    elif apiType == OpenMaya.MFn.kNumericAttribute:
+        return ( apiType, OpenMaya.MFnNumericAttribute( inAttribute ).unitType() )
+    return ( apiType, )
+
+def getKindAccessors( inAttribute ):
+    '''
+    @param inAttribute: MObject. The attribute.
+    @return: List. Reader and writer for the attribute's kind. The writer is None
+        until getAccessorWriter first needs it.
+    '''
+    kind = getAttributeKind( inAttribute )
+    accessors = _accessors.get( kind )
+    if accessors is None:
+        accessors = [ makePlugReader( inAttribute ), None ]
+        _accessors[ kind ] = accessors
+    return accessors
+
+def getAttributeAccessors( inDepFn, inAttribute ):
+    '''
+    @param inDepFn: MFnDependencyNode. Function set attached to the plug's node.
+    @param inAttribute: MObject. The attribute.
+    @return: List. Reader and writer for the attribute. The kind of an attribute the
+        node type is created with is only worked out the first time. Dynamic
+        attributes are looked up by kind every time.
+    '''
+    key = ( inDepFn.typeName(), OpenMaya.MFnAttribute( inAttribute ).name() )
+    accessors = _attributeAccessors.get( key )
+    if accessors is None:
+        accessors = getKindAccessors( inAttribute )
+        if inDepFn.attributeClass( inAttribute ) == OpenMaya.MFnDependencyNode.kNormalAttr:
+            _attributeAccessors[ key ] = accessors
+    return accessors
+
+def getPlugAccessors( inPlug ):
+    '''
+    @param inPlug: MPlug.
+    @return: List. Reader and writer for the plug's attribute.
+    '''
+    return getAttributeAccessors( OpenMaya.MFnDependencyNode( inPlug.node() ), inPlug.attribute() )
+
+def getAccessorWriter( inAccessors, inPlug ):
+    '''
+    @param inAccessors: List. Reader and writer from getAttributeAccessors.
+    @param inPlug: MPlug. Any plug of the attribute, used to make the writer.
+    @return: Function. The writer, made the first time it is asked for.
+    '''
+    if inAccessors[1] is None:
+        inAccessors[1] = makePlugWriter( inPlug.attribute() )
+    return inAccessors[1]
+
+def getPlugReader( inPlug ):
+    '''
+    @param inPlug: MPlug.
+    @return: Function. Reader for the plug's attribute.
+    '''
+    return getPlugAccessors( inPlug )[0]
+
+def getPlugWriter( inPlug ):
+    '''
+    @param inPlug: MPlug.
+    @return: Function. Writer for the plug's attribute.
+    '''
+    return getAccessorWriter( getPlugAccessors( inPlug ), inPlug )
+
+def readPlug( inPlug ):
+    '''
+    @param inPlug: MPlug.
+    @return: The plug's value.
+    '''
+    return getPlugAccessors( inPlug )[0]( inPlug )
+
+def writePlug( inPlug, inValue ):
+    '''
+    @param inPlug: MPlug.
+    @param inValue: Value for the plug.
+    '''
+    getPlugWriter( inPlug )( inPlug, inValue )
+
+def clearPlugAccessors():
+    '''
+    Forgets every reader and writer. NodeCache calls this when a plug-in is unloaded,
+    as reloading it can change its node types' attributes.
+    '''
+    _accessors.clear()
+    _attributeAccessors.clear()
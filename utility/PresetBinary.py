@@ -0,0 +1,437 @@
+'''
+Compact binary preset format.
+
+A binary preset holds the same bits as a module XML file. Every name, attribute
+type and string value is stored once in a string table and referenced by index.
+Everything else is kept column by column in packed arrays, so plug values are
+read back as ints, floats and bools without any string conversion.
+
+Layout (little endian):
+    'MGPB', version (uint16), reserved (uint16)
+    summary: byte length (uint32), utf-8 JSON of PresetUtility.getModuleSummary
+    string table: count, byte lengths, utf-8 bytes
+    extra elements: string indices of non-bit top level XML elements
+    bit columns: name, parent, shape type, plug count, shape plug count, component count
+    component columns: name, plug count
+    plug columns: name, attrType, attrDataType, value kind
+    value columns: ints, floats, string indices
+
+Plugs are stored bit by bit: the bit's plugs, its shape plugs, then the plugs of
+each component. String index 0 means None.
+
+A value is only stored as a number when writing it back out gives the exact text
+it was read from. Anything else is kept as a string, so converting XML to binary
+and back doesn't lose anything.
+
+The summary comes first so a preset can be listed by reading a few bytes. It was
+added in version 2. Version 1 files have no summary.
+
+Like PresetUtility, nothing in here imports Maya.
+'''
+import array
+import json
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ET
+import marigold.utility.PresetUtility as PresetUtility
+
+MAGIC = 'MGPB'
+VERSION = 2
+BINARY_EXTENSION = '.mgb'
+
+# Value kinds.
+KIND_EMPTY = 0  # Element had no text.
+KIND_NONE = 1   # The text 'None'.
+KIND_INT = 2
+KIND_FLOAT = 3
+KIND_BOOL = 4
+KIND_STRING = 5
+
+INT_MIN = -2**31
+INT_MAX = 2**31-1
+
+class StringTable( object ):
+    '''
+    Interns strings for the string table. Index 0 is reserved for None.
+    '''
+    def __init__( self ):
+        self.strings = []
+        self.indices = {}
+
+    def add( self, inString ):
+        if inString is None:
+            return 0
+        index = self.indices.get( inString )
+        if index is None:
+            self.strings.append( inString )
+            index = len( self.strings )
+            self.indices[ inString ] = index
+        return index
+
+def encodeValue( inAttrDataType, inText ):
+    '''
+    Works out how to store the text of a plug.
+
+    @param inAttrDataType: String. Attribute data type of the plug.
+    @param inText: String. Text of the plug. None is stored the same as the text 'None'.
+    @return: List. Value kind and the value to store.
+    '''
+    if inText == '':
+        return [ KIND_EMPTY, None ]
+    if inText is None or inText == 'None':
+        return [ KIND_NONE, None ]
+
+    if inAttrDataType in PresetUtility.INT_DATA_TYPES:
+        try:
+            value = int( inText )
+        except ValueError:
+            value = None
+        if value is not None and INT_MIN <= value <= INT_MAX and str( value ) == inText:
+            return [ KIND_INT, value ]
+    elif inAttrDataType in PresetUtility.FLOAT_DATA_TYPES or inAttrDataType is None:
+        try:
+            value = float( inText )
+        except ValueError:
+            value = None
+        if value is not None and str( value ) == inText:
+            return [ KIND_FLOAT, value ]
+    elif inAttrDataType == 'bool':
+        if inText in ( 'True', 'False' ):
+            return [ KIND_BOOL, inText == 'True' ]
+
+    return [ KIND_STRING, inText ]
+
+def writeArray( inFile, inArray ):
+    '''
+    Writes an array with its length in front.
+
+    @param inFile: File object.
+    @param inArray: array.array.
+    '''
+    if sys.byteorder == 'big':
+        inArray = array.array( inArray.typecode, inArray )
+        inArray.byteswap()
+    inFile.write( struct.pack( '<I', len( inArray ) ) )
+    inFile.write( inArray.tostring() )
+
+def readArray( inData, inOffset, inTypeCode ):
+    '''
+    Reads an array written by writeArray.
+
+    @param inData: String. Contents of the binary file.
+    @param inOffset: Int. Where the array starts.
+    @param inTypeCode: String. array.array type code.
+    @return: List. The array and the offset just past it.
+    '''
+    count = struct.unpack_from( '<I', inData, inOffset )[0]
+    inOffset += 4
+    values = array.array( inTypeCode )
+    byteCount = count * values.itemsize
+    values.fromstring( inData[ inOffset:inOffset+byteCount ] )
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return [ values, inOffset+byteCount ]
+
+def decodeString( inBytes ):
+    '''
+    @param inBytes: String. UTF-8 bytes from the string table.
+    @return: String, or unicode when the text isn't plain ascii.
+    '''
+    try:
+        inBytes.decode( 'ascii' )
+        return inBytes
+    except UnicodeDecodeError:
+        return inBytes.decode( 'utf-8' )
+
+def writeModuleBinary( inFile, inBits, inExtraElements=() ):
+    '''
+    Writes bit records out as a binary preset.
+
+    @param inFile: String. Full path of the file to write.
+    @param inBits: List of BitRecord. Values should be strings, as read with
+        PresetUtility.readModulePresetText or gathered by XMLUtility.writeModuleXML.
+    @param inExtraElements: List of strings. XML of any other top level elements.
+    '''
+    table = StringTable()
+    extras = array.array( 'I', [ table.add( element ) for element in inExtraElements ] )
+
+    bitNames = array.array( 'I' )
+    bitParents = array.array( 'I' )
+    shapeTypes = array.array( 'I' )
+    plugCounts = array.array( 'I' )
+    shapePlugCounts = array.array( 'I' )
+    componentCounts = array.array( 'I' )
+
+    componentNames = array.array( 'I' )
+    componentPlugCounts = array.array( 'I' )
+
+    plugNames = array.array( 'I' )
+    plugAttrTypes = array.array( 'I' )
+    plugDataTypes = array.array( 'I' )
+    plugKinds = array.array( 'B' )
+
+    intValues = array.array( 'i' )
+    floatValues = array.array( 'd' )
+    stringValues = array.array( 'I' )
+
+    def addPlugs( inPlugs ):
+        for plug in inPlugs:
+            plugNames.append( table.add( plug.name ) )
+            plugAttrTypes.append( table.add( plug.attrType ) )
+            plugDataTypes.append( table.add( plug.attrDataType ) )
+            kind, value = encodeValue( plug.attrDataType, plug.value )
+            plugKinds.append( kind )
+            if kind == KIND_INT or kind == KIND_BOOL:
+                intValues.append( int( value ) )
+            elif kind == KIND_FLOAT:
+                floatValues.append( value )
+            elif kind == KIND_STRING:
+                stringValues.append( table.add( value ) )
+
+    for bit in inBits:
+        bitNames.append( table.add( bit.name ) )
+        bitParents.append( table.add( bit.parent ) )
+        shapeTypes.append( table.add( bit.shapeType ) )
+        plugCounts.append( len( bit.plugs ) )
+        shapePlugCounts.append( len( bit.shape ) )
+        componentCounts.append( len( bit.components ) )
+        addPlugs( bit.plugs )
+        addPlugs( bit.shape )
+        for comp in bit.components:
+            componentNames.append( table.add( comp.name ) )
+            componentPlugCounts.append( len( comp.plugs ) )
+            addPlugs( comp.plugs )
+
+    encodedStrings = []
+    for string in table.strings:
+        if isinstance( string, unicode ):
+            string = string.encode( 'utf-8' )
+        encodedStrings.append( string )
+    stringLengths = array.array( 'I', [ len( string ) for string in encodedStrings ] )
+
+    newfile = open( inFile, 'wb' )
+    newfile.write( MAGIC )
+    newfile.write( struct.pack( '<HH', VERSION, 0 ) )
+    summary = json.dumps( PresetUtility.getModuleSummary( inBits, inExtraElements ), sort_keys=True )
+    newfile.write( struct.pack( '<I', len( summary ) ) )
+    newfile.write( summary )
+    writeArray( newfile, stringLengths )
+    newfile.write( ''.join( encodedStrings ) )
+    for column in ( extras,
+                    bitNames, bitParents, shapeTypes, plugCounts, shapePlugCounts, componentCounts,
+                    componentNames, componentPlugCounts,
+                    plugNames, plugAttrTypes, plugDataTypes, plugKinds,
+                    intValues, floatValues, stringValues ):
+        writeArray( newfile, column )
+    newfile.close()
+
+def readBinaryColumns( inFile ):
+    '''
+    Reads the string table and columns of a binary preset.
+
+    @param inFile: String. Full path to the binary preset.
+    @return: Dictionary. 'strings' is the string table with None at index 0. The
+        rest are the columns listed in the module docstring.
+    '''
+    with open( inFile, 'rb' ) as binaryFile:
+        data = binaryFile.read()
+
+    if data[:4] != MAGIC:
+        raise ValueError( '{0} is not a binary preset.'.format( inFile ) )
+    version = struct.unpack_from( '<H', data, 4 )[0]
+    if version > VERSION:
+        raise ValueError( '{0} was written by a newer version ( {1} ) of the binary preset format.'.format( inFile, version ) )
+
+    offset = 8
+    if version >= 2:
+        # Skip the summary.
+        offset += 4+struct.unpack_from( '<I', data, offset )[0]
+    stringLengths, offset = readArray( data, offset, 'I' )
+    strings = [ None ]
+    for length in stringLengths:
+        strings.append( decodeString( data[ offset:offset+length ] ) )
+        offset += length
+
+    columns = { 'strings':strings }
+    for name, typeCode in ( ( 'extras', 'I' ),
+                            ( 'bitNames', 'I' ), ( 'bitParents', 'I' ), ( 'shapeTypes', 'I' ),
+                            ( 'plugCounts', 'I' ), ( 'shapePlugCounts', 'I' ), ( 'componentCounts', 'I' ),
+                            ( 'componentNames', 'I' ), ( 'componentPlugCounts', 'I' ),
+                            ( 'plugNames', 'I' ), ( 'plugAttrTypes', 'I' ), ( 'plugDataTypes', 'I' ), ( 'plugKinds', 'B' ),
+                            ( 'intValues', 'i' ), ( 'floatValues', 'd' ), ( 'stringValues', 'I' ) ):
+        columns[ name ], offset = readArray( data, offset, typeCode )
+    return columns
+
+def iterBinaryBits( inFile, inTyped=True ):
+    '''
+    Reads the bits of a binary preset.
+
+    @param inFile: String. Full path to the binary preset.
+    @param inTyped: Bool. Give plug values as python types, like
+        PresetUtility.iterModuleBits. When False the values are given as the
+        strings they'd have in the XML file.
+    @return: Generator of BitRecord.
+    '''
+    columns = readBinaryColumns( inFile )
+    strings = columns[ 'strings' ]
+    plugNames = columns[ 'plugNames' ]
+    plugAttrTypes = columns[ 'plugAttrTypes' ]
+    plugDataTypes = columns[ 'plugDataTypes' ]
+    plugKinds = columns[ 'plugKinds' ]
+    intValues = columns[ 'intValues' ]
+    floatValues = columns[ 'floatValues' ]
+    stringValues = columns[ 'stringValues' ]
+    convertPlugText = PresetUtility.convertPlugText
+    PlugRecord = PresetUtility.PlugRecord
+
+    # Read positions into the plug and value columns.
+    position = { 'plug':0, 'int':0, 'float':0, 'string':0 }
+
+    def readPlugs( inCount ):
+        plugIndex = position[ 'plug' ]
+        intIndex = position[ 'int' ]
+        floatIndex = position[ 'float' ]
+        stringIndex = position[ 'string' ]
+        plugList = []
+        for index in xrange( plugIndex, plugIndex+inCount ):
+            attrDataType = strings[ plugDataTypes[ index ] ]
+            kind = plugKinds[ index ]
+            if kind == KIND_INT:
+                value = intValues[ intIndex ]
+                intIndex += 1
+                if not inTyped:
+                    value = str( value )
+            elif kind == KIND_FLOAT:
+                value = floatValues[ floatIndex ]
+                floatIndex += 1
+                if not inTyped:
+                    value = str( value )
+            elif kind == KIND_BOOL:
+                value = intValues[ intIndex ] == 1
+                intIndex += 1
+                if not inTyped:
+                    value = str( value )
+            elif kind == KIND_STRING:
+                value = strings[ stringValues[ stringIndex ] ]
+                stringIndex += 1
+                if inTyped:
+                    value = convertPlugText( attrDataType, value )
+            elif kind == KIND_NONE:
+                if inTyped:
+                    value = None
+                else:
+                    value = 'None'
+            else:
+                if inTyped:
+                    value = convertPlugText( attrDataType, None )
+                else:
+                    value = ''
+            plugList.append( PlugRecord( strings[ plugNames[ index ] ], strings[ plugAttrTypes[ index ] ], attrDataType, value ) )
+        position[ 'plug' ] = plugIndex+inCount
+        position[ 'int' ] = intIndex
+        position[ 'float' ] = floatIndex
+        position[ 'string' ] = stringIndex
+        return tuple( plugList )
+
+    componentIndex = 0
+    for bitIndex in xrange( len( columns[ 'bitNames' ] ) ):
+        bitPlugs = readPlugs( columns[ 'plugCounts' ][ bitIndex ] )
+        shapePlugs = readPlugs( columns[ 'shapePlugCounts' ][ bitIndex ] )
+        componentList = []
+        for index in xrange( componentIndex, componentIndex+columns[ 'componentCounts' ][ bitIndex ] ):
+            componentPlugs = readPlugs( columns[ 'componentPlugCounts' ][ index ] )
+            componentList.append( PresetUtility.ComponentRecord( strings[ columns[ 'componentNames' ][ index ] ], componentPlugs ) )
+        componentIndex += columns[ 'componentCounts' ][ bitIndex ]
+
+        parent = strings[ columns[ 'bitParents' ][ bitIndex ] ]
+        if inTyped and parent == 'None':
+            parent = None
+
+        yield PresetUtility.BitRecord( strings[ columns[ 'bitNames' ][ bitIndex ] ], parent,
+                                       strings[ columns[ 'shapeTypes' ][ bitIndex ] ],
+                                       bitPlugs, shapePlugs, tuple( componentList ) )
+
+def readModuleBinary( inFile ):
+    '''
+    Reads every bit of a binary preset with typed plug values.
+
+    @param inFile: String. Full path to the binary preset.
+    @return: Tuple of BitRecord.
+    '''
+    return tuple( iterBinaryBits( inFile ) )
+
+def readModuleBinaryText( inFile ):
+    '''
+    Reads every bit of a binary preset, giving the plug values as strings. Empty
+    plug elements are given as an empty string.
+
+    @param inFile: String. Full path to the binary preset.
+    @return: Tuple of BitRecord.
+    '''
+    return tuple( iterBinaryBits( inFile, inTyped=False ) )
+
+def readModuleBinarySummary( inFile ):
+    '''
+    Reads the bit count, component types and meta class of a binary preset. Same
+    layout as PresetUtility.readModuleSummary. Only the summary at the start of
+    the file is read.
+    
+    @param inFile: String. Full path to the binary preset.
+    @return: Dictionary.
+    '''
+    with open( inFile, 'rb' ) as binaryFile:
+        header = binaryFile.read( 12 )
+        if header[:4] != MAGIC:
+            raise ValueError( '{0} is not a binary preset.'.format( inFile ) )
+        version = struct.unpack_from( '<H', header, 4 )[0]
+        if version >= 2:
+            summaryLength = struct.unpack_from( '<I', header, 8 )[0]
+            return json.loads( binaryFile.read( summaryLength ) )
+    
+    # Version 1 files have to be read in full.
+    columns = readBinaryColumns( inFile )
+    strings = columns[ 'strings' ]
+    metaClass = None
+    for index in columns[ 'extras' ]:
+        elementText = strings[ index ]
+        if isinstance( elementText, unicode ):
+            elementText = elementText.encode( 'utf-8' )
+        element = ET.fromstring( elementText )
+        if element.tag == 'metanode':
+            metaClass = element.get( 'metaClass' )
+    return { 'bitCount':len( columns[ 'bitNames' ] ),
+             'componentCount':len( columns[ 'componentNames' ] ),
+             'componentTypes':sorted( set( strings[ index ] for index in columns[ 'componentNames' ] ) ),
+             'metaClass':metaClass }
+
+def convertXMLToBinary( inXMLFile, inBinaryFile=None ):
+    '''
+    Converts a module XML file into a binary preset.
+
+    @param inXMLFile: String. Full path to the module XML file.
+    @param inBinaryFile: String. Full path of the binary preset. Defaults to the XML
+        path with the binary extension.
+    @return: String. Path of the binary preset.
+    '''
+    if inBinaryFile is None:
+        inBinaryFile = os.path.splitext( inXMLFile )[0]+BINARY_EXTENSION
+    extraElements, bits = PresetUtility.readModuleElements( inXMLFile )
+    writeModuleBinary( inBinaryFile, bits, extraElements )
+    return inBinaryFile
+
+def convertBinaryToXML( inBinaryFile, inXMLFile=None ):
+    '''
+    Converts a binary preset into a module XML file.
+
+    @param inBinaryFile: String. Full path to the binary preset.
+    @param inXMLFile: String. Full path of the XML file. Defaults to the binary path
+        with the .xml extension.
+    @return: String. Path of the XML file.
+    '''
+    if inXMLFile is None:
+        inXMLFile = os.path.splitext( inBinaryFile )[0]+'.xml'
+    columns = readBinaryColumns( inBinaryFile )
+    extraElements = [ columns[ 'strings' ][ index ] for index in columns[ 'extras' ] ]
+    PresetUtility.writeModuleRecordsXML( inXMLFile, readModuleBinaryText( inBinaryFile ), extraElements )
+    return inXMLFile
@@ -0,0 +1,164 @@
+'''
+Process-wide cache of parsed preset files.
+
+Entries are keyed by the absolute path of the preset and the parser used to read
+it, and are only handed back while the file's mtime and size still match. The
+cache holds immutable records (see PresetUtility) so callers can share them
+without copying. Least recently used entries are evicted once the estimated
+memory use goes over the budget.
+
+Like PresetUtility, nothing in here imports Maya.
+'''
+import collections
+import os
+import sys
+import threading
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+def estimateSize( inValue ):
+    '''
+    Rough estimate of the memory held by a parsed preset.
+
+    @param inValue: Parsed preset. Nested tuples, lists, dicts and scalars.
+    @return: Int. Size in bytes.
+    '''
+    size = 0
+    stack = [ inValue ]
+    while stack:
+        item = stack.pop()
+        size += sys.getsizeof( item )
+        if isinstance( item, ( tuple, list ) ):
+            stack.extend( item )
+        elif isinstance( item, dict ):
+            stack.extend( item.iterkeys() )
+            stack.extend( item.itervalues() )
+    return size
+
+class PresetCache( object ):
+    '''
+    LRU cache of parsed preset files.
+    '''
+    def __init__( self, inMemoryBudget=DEFAULT_MEMORY_BUDGET ):
+        self.memoryBudget = inMemoryBudget
+        self.memoryUsed = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def getFileStat( inFile ):
+        '''
+        @param inFile: String. Path to a preset file.
+        @return: List. Absolute path, mtime and size of the file.
+        '''
+        fullPath = os.path.abspath( inFile )
+        fileStat = os.stat( fullPath )
+        return [ fullPath, fileStat.st_mtime, fileStat.st_size ]
+
+    def get( self, inFile, inParser ):
+        '''
+        Gets the parsed contents of a preset file, parsing it if it isn't cached or
+        has changed on disk.
+
+        @param inFile: String. Path to the preset file.
+        @param inParser: Function. Takes the file path and returns an immutable record.
+        @return: The parsed record.
+        '''
+        fullPath, mtime, size = self.getFileStat( inFile )
+        key = ( fullPath, inParser.__name__ )
+        with self._lock:
+            entry = self._entries.get( key )
+            if entry is not None and entry[0] == mtime and entry[1] == size:
+                self.hits += 1
+                # Mark the entry as the most recently used.
+                del self._entries[ key ]
+                self._entries[ key ] = entry
+                return entry[2]
+            self.misses += 1
+
+        value = inParser( fullPath )
+        self.put( fullPath, inParser, value, inStat=[ mtime, size ] )
+        return value
+
+    def put( self, inFile, inParser, inValue, inStat=None ):
+        '''
+        Stores an already parsed preset.
+
+        @param inFile: String. Path to the preset file.
+        @param inParser: Function. Parser that produced the value.
+        @param inValue: Immutable record returned by the parser.
+        @param inStat: List. mtime and size of the file when it was parsed. Read from
+            disk when not given.
+        '''
+        fullPath = os.path.abspath( inFile )
+        if inStat is None:
+            inStat = self.getFileStat( fullPath )[1:]
+        key = ( fullPath, inParser.__name__ )
+        cost = estimateSize( inValue )
+
+        with self._lock:
+            self._remove( key )
+            if cost > self.memoryBudget:
+                # Would push everything else out. Don't keep it.
+                return
+            self._entries[ key ] = ( inStat[0], inStat[1], inValue, cost )
+            self.memoryUsed += cost
+            self._evict()
+
+    def invalidate( self, inFile=None ):
+        '''
+        Drops cached entries.
+
+        @param inFile: String. Path of the preset to drop. Drops everything when None.
+        '''
+        with self._lock:
+            if inFile is None:
+                self._entries.clear()
+                self.memoryUsed = 0
+                return
+            fullPath = os.path.abspath( inFile )
+            for key in [ key for key in self._entries if key[0] == fullPath ]:
+                self._remove( key )
+
+    def setMemoryBudget( self, inMemoryBudget ):
+        '''
+        @param inMemoryBudget: Int. Memory budget in bytes.
+        '''
+        with self._lock:
+            self.memoryBudget = inMemoryBudget
+            self._evict()
+
+    def getStats( self ):
+        '''
+        @return: Dictionary. Hit, miss and eviction counts plus the current memory use.
+        '''
+        with self._lock:
+            return { 'hits':self.hits,
+                     'misses':self.misses,
+                     'evictions':self.evictions,
+                     'entries':len( self._entries ),
+                     'memoryUsed':self.memoryUsed,
+                     'memoryBudget':self.memoryBudget }
+
+    def resetStats( self ):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _remove( self, inKey ):
+        entry = self._entries.pop( inKey, None )
+        if entry is not None:
+            self.memoryUsed -= entry[3]
+
+    def _evict( self ):
+        while self.memoryUsed > self.memoryBudget and self._entries:
+            key, entry = self._entries.popitem( last=False )
+            self.memoryUsed -= entry[3]
+            self.evictions += 1
+
+# The cache shared by everything in the process.
+PRESET_CACHE = PresetCache()
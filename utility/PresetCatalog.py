@@ -0,0 +1,337 @@
+'''
+Persistent index of the module and controller presets on disk.
+
+The catalog stores one entry per preset file found under frames/presets/ and
+controllers/presets/ of each preset root. An entry holds what the UI needs to
+list and filter presets without opening the files again:
+
+    name            File name without the extension.
+    kind            'frames' or 'controllers'.
+    category        Sub-folder the preset is in, for example 'arms'. Empty for
+                    files at the top of the presets folder.
+    folder          Preset path of the folder, for example 'frames/presets/arms/'.
+    format          'xml' or 'binary'.
+    path            Full path to the file.
+    bitCount        Number of bits in a module preset. None for controllers.
+    componentCount  Number of components on the bits.
+    componentTypes  Sorted list of the component classes used by the bits.
+    metaClass       metaClass of the <metanode> element, if there is one.
+    mtime, size     File stat the entry was made from.
+    error           Why the file couldn't be read, otherwise None.
+
+The index is saved as JSON (see getCatalogFile) and brought up to date with
+refresh(). Refreshing only stats the files. Presets are only read again when
+their mtime or size changed. listPresets refreshes the first time it is called
+in a session. After that it only stats the folder it is asked for in each root,
+and looks at that folder's files again if its mtime changed (see refreshFolder).
+This picks up presets other processes add, remove or replace. Saved presets are
+added with updateFile. A preset written over in place doesn't change its folder's
+mtime, so it is only picked up by calling refresh().
+
+Like PresetUtility, nothing in here imports Maya.
+'''
+import json
+import os
+import tempfile
+import threading
+import time
+import marigold.utility.PresetUtility as PresetUtility
+import marigold.utility.PresetBinary as PresetBinary
+import marigold.utility.PresetPaths as PresetPaths
+
+CATALOG_VERSION = 2
+CATALOG_ENV = 'MARIGOLD_PRESET_CATALOG'
+DEFAULT_CATALOG_FILE = os.path.join( '~', '.marigold', 'presetCatalog.json' )
+
+PRESET_FOLDERS = PresetPaths.PRESET_FOLDERS
+PRESET_EXTENSIONS = dict( ( extension, presetFormat ) for presetFormat, extension in PresetPaths.PRESET_FORMAT_EXTENSIONS.iteritems() )
+
+def getCatalogFile():
+    '''
+    @return: String. Path of the catalog JSON file. Set MARIGOLD_PRESET_CATALOG to
+        use a different file.
+    '''
+    return os.path.expanduser( os.environ.get( CATALOG_ENV, DEFAULT_CATALOG_FILE ) )
+
+def readPresetSummary( inFile, inKind, inFormat ):
+    '''
+    Reads the catalog details of a single preset file.
+
+    @param inFile: String. Full path to the preset.
+    @param inKind: String. 'frames' or 'controllers'.
+    @param inFormat: String. 'xml' or 'binary'.
+    @return: Dictionary. bitCount, componentTypes, metaClass and error.
+    '''
+    summary = { 'bitCount':None, 'componentCount':None, 'componentTypes':[], 'metaClass':None, 'error':None }
+    try:
+        if inKind == 'controllers':
+            PresetUtility.readControlPreset( inFile )
+        elif inFormat == 'binary':
+            summary.update( PresetBinary.readModuleBinarySummary( inFile ) )
+        else:
+            summary.update( PresetUtility.readModuleSummary( inFile ) )
+    except Exception as e:
+        # Broken or empty presets are still listed, just without any details.
+        summary[ 'error' ] = '{0}: {1}'.format( e.__class__.__name__, e )
+    return summary
+
+def describePreset( inEntry ):
+    '''
+    Makes a short description of a preset for the UI cards.
+
+    @param inEntry: Dictionary. Catalog entry.
+    @return: String.
+    '''
+    if inEntry[ 'size' ] == 0:
+        return 'Empty preset.'
+    if inEntry[ 'error' ] is not None:
+        return 'This preset could not be read.'
+    if inEntry[ 'bitCount' ] is None:
+        return 'Controller preset.'
+    description = '{0} bits, {1} components.'.format( inEntry[ 'bitCount' ], inEntry[ 'componentCount' ] )
+    if inEntry[ 'metaClass' ] is not None:
+        description = '{0}. {1}'.format( inEntry[ 'metaClass' ], description )
+    if inEntry[ 'componentTypes' ]:
+        description += ' Components: {0}.'.format( ', '.join( inEntry[ 'componentTypes' ] ) )
+    return description
+
+class PresetCatalog( object ):
+    '''
+    Index of the presets found under one or more preset roots.
+    '''
+    def __init__( self, inRoots, inCatalogFile=None ):
+        '''
+        @param inRoots: List of strings. Preset roots, each holding frames/presets/
+            and controllers/presets/ folders. Highest priority first, like
+            PresetPaths.PresetResolver.getRoots.
+        @param inCatalogFile: String. JSON file the index is kept in. Defaults to
+            getCatalogFile(). Pass False to keep the index in memory only.
+        '''
+        if inCatalogFile is None:
+            inCatalogFile = getCatalogFile()
+        self.roots = [ os.path.abspath( root ) for root in inRoots ]
+        self.catalogFile = inCatalogFile
+        self.lastRefresh = None
+        # { root: { relativePath: entry } }
+        self._entries = {}
+        # { root: { folder: mtime } }, from the last time each folder was looked at.
+        self._folderTimes = {}
+        self._lock = threading.RLock()
+        self.load()
+
+    def load( self ):
+        '''
+        Loads the saved index. A missing or unreadable index file gives an empty
+        catalog, which the next refresh fills in.
+        '''
+        with self._lock:
+            self._entries = dict( ( root, {} ) for root in self.roots )
+            if not self.catalogFile or not os.path.isfile( self.catalogFile ):
+                return
+            try:
+                with open( self.catalogFile, 'r' ) as catalogFile:
+                    data = json.load( catalogFile )
+            except ( IOError, ValueError ):
+                return
+            if data.get( 'version' ) != CATALOG_VERSION:
+                return
+            for root, entries in data.get( 'roots', {} ).iteritems():
+                if root in self._entries:
+                    self._entries[ root ] = entries
+
+    def save( self ):
+        '''
+        Writes the index to the catalog file.
+        '''
+        if not self.catalogFile:
+            return
+        with self._lock:
+            data = { 'version':CATALOG_VERSION, 'roots':self._entries }
+            catalogDir = os.path.dirname( self.catalogFile )
+            if catalogDir and not os.path.isdir( catalogDir ):
+                os.makedirs( catalogDir )
+            # Write to a file of our own next to the real one and swap it in, so a
+            # crash while writing leaves the old index. Windows can't rename over
+            # an existing file, so there the old index is removed first, and a
+            # crash between the two leaves no index. load() then starts empty.
+            handle, tempFile = tempfile.mkstemp( prefix=os.path.basename( self.catalogFile )+'.', suffix='.tmp', dir=catalogDir or None )
+            try:
+                with os.fdopen( handle, 'w' ) as catalogFile:
+                    json.dump( data, catalogFile, indent=1, sort_keys=True )
+                if os.name == 'nt' and os.path.exists( self.catalogFile ):
+                    os.remove( self.catalogFile )
+                os.rename( tempFile, self.catalogFile )
+            finally:
+                # Only still there if something went wrong.
+                if os.path.exists( tempFile ):
+                    os.remove( tempFile )
+
+    def refresh( self ):
+        '''
+        Brings the index up to date with the files on disk. Only new and changed
+        presets are read.
+
+        @return: Int. Number of entries that were added, updated or removed.
+        '''
+        changes = 0
+        with self._lock:
+            for root in self.roots:
+                entries = self._entries.setdefault( root, {} )
+                folderTimes = self._folderTimes[ root ] = {}
+                found = set()
+                for kind, presetFolder in PRESET_FOLDERS.iteritems():
+                    folderPath = os.path.join( root, presetFolder )
+                    for dirPath, dirNames, fileNames in os.walk( folderPath ):
+                        dirNames.sort()
+                        folder = os.path.relpath( dirPath, root ).replace( os.sep, '/' )+'/'
+                        folderTimes[ folder ] = PresetPaths.getFolderTime( dirPath )
+                        for fileName in fileNames:
+                            if os.path.splitext( fileName )[1] not in PRESET_EXTENSIONS:
+                                continue
+                            relativePath = os.path.relpath( os.path.join( dirPath, fileName ), root ).replace( os.sep, '/' )
+                            found.add( relativePath )
+                            if self._updateEntry( root, relativePath, kind ):
+                                changes += 1
+                for relativePath in [ path for path in entries if path not in found ]:
+                    del entries[ relativePath ]
+                    changes += 1
+            self.lastRefresh = time.time()
+            if changes:
+                self.save()
+        return changes
+
+    def refreshFolder( self, inFolder ):
+        '''
+        Brings the entries of one folder up to date if the folder changed since it
+        was last looked at. When nothing changed this only stats the folder in each
+        root.
+
+        @param inFolder: String. Preset path of the folder, for example 'frames/presets/arms/'.
+        @return: Int. Number of entries that were added, updated or removed.
+        '''
+        kinds = [ kind for kind, presetFolder in PRESET_FOLDERS.iteritems() if inFolder.startswith( presetFolder ) ]
+        if not kinds:
+            return 0
+
+        changes = 0
+        with self._lock:
+            for root in self.roots:
+                folderTimes = self._folderTimes.setdefault( root, {} )
+                folderPath = os.path.join( root, inFolder )
+                folderTime = PresetPaths.getFolderTime( folderPath )
+                if folderTime == folderTimes.get( inFolder ):
+                    continue
+                # Kept before listing, so a file added while listing changes it again.
+                folderTimes[ inFolder ] = folderTime
+
+                entries = self._entries.setdefault( root, {} )
+                found = set()
+                if folderTime is not None:
+                    for fileName in sorted( os.listdir( folderPath ) ):
+                        relativePath = inFolder+fileName
+                        if os.path.splitext( fileName )[1] not in PRESET_EXTENSIONS or not os.path.isfile( os.path.join( root, relativePath ) ):
+                            continue
+                        found.add( relativePath )
+                        if self._updateEntry( root, relativePath, kinds[0] ):
+                            changes += 1
+                for relativePath in [ path for path, entry in entries.iteritems() if entry[ 'folder' ] == inFolder and path not in found ]:
+                    del entries[ relativePath ]
+                    changes += 1
+            if changes:
+                self.save()
+        return changes
+
+    def updateFile( self, inFile ):
+        '''
+        Updates the entry of a single preset. Called after a preset is saved so the
+        catalog doesn't have to wait for the next refresh.
+
+        @param inFile: String. Full path to the preset.
+        @return: Bool. True if the entry changed.
+        '''
+        fullPath = os.path.abspath( inFile )
+        with self._lock:
+            for root in self.roots:
+                if not fullPath.startswith( root+os.sep ):
+                    continue
+                relativePath = os.path.relpath( fullPath, root ).replace( os.sep, '/' )
+                for kind, presetFolder in PRESET_FOLDERS.iteritems():
+                    if relativePath.startswith( presetFolder ):
+                        if os.path.isfile( fullPath ):
+                            changed = self._updateEntry( root, relativePath, kind )
+                        else:
+                            changed = self._entries[ root ].pop( relativePath, None ) is not None
+                        if changed:
+                            self.save()
+                        return changed
+        return False
+
+    def listPresets( self, inFolder=None, inKind=None, inCategory=None, inFormat=None, inComponentType=None, inMetaClass=None ):
+        '''
+        Lists catalog entries. The catalog is refreshed the first time. After that,
+        listing a folder refreshes it if it changed on disk (see refreshFolder).
+        Listing without a folder only reads the index. Presets in earlier roots
+        override presets with the same path in later roots.
+
+        @param inFolder: String. Preset path of a folder, for example 'frames/presets/arms/'.
+        @param inKind: String. 'frames' or 'controllers'.
+        @param inCategory: String. Sub-folder of the presets folder.
+        @param inFormat: String. 'xml' or 'binary'.
+        @param inComponentType: String. Only presets with a bit using this component.
+        @param inMetaClass: String. Only presets with this meta class.
+        @return: List of entry dictionaries sorted by name.
+        '''
+        if inFolder is not None and not inFolder.endswith( '/' ):
+            inFolder += '/'
+
+        if self.lastRefresh is None:
+            self.refresh()
+        elif inFolder is not None:
+            self.refreshFolder( inFolder )
+
+        with self._lock:
+            merged = {}
+            for root in reversed( self.roots ):
+                merged.update( self._entries.get( root, {} ) )
+
+        entryList = []
+        for entry in merged.itervalues():
+            if inFolder is not None and entry[ 'folder' ] != inFolder:
+                continue
+            if inKind is not None and entry[ 'kind' ] != inKind:
+                continue
+            if inCategory is not None and entry[ 'category' ] != inCategory:
+                continue
+            if inFormat is not None and entry[ 'format' ] != inFormat:
+                continue
+            if inComponentType is not None and inComponentType not in entry[ 'componentTypes' ]:
+                continue
+            if inMetaClass is not None and entry[ 'metaClass' ] != inMetaClass:
+                continue
+            entryList.append( entry )
+        entryList.sort( key=lambda entry: ( entry[ 'folder' ], entry[ 'name' ] ) )
+        return entryList
+
+    def _updateEntry( self, inRoot, inRelativePath, inKind ):
+        fullPath = os.path.join( inRoot, inRelativePath )
+        fileStat = os.stat( fullPath )
+        entries = self._entries[ inRoot ]
+        entry = entries.get( inRelativePath )
+        if entry is not None and entry[ 'mtime' ] == fileStat.st_mtime and entry[ 'size' ] == fileStat.st_size:
+            return False
+
+        folder, fileName = inRelativePath.rsplit( '/', 1 )
+        folder += '/'
+        name, extension = os.path.splitext( fileName )
+        presetFormat = PRESET_EXTENSIONS[ extension ]
+        entry = { 'name':name,
+                  'kind':inKind,
+                  'category':folder[ len( PRESET_FOLDERS[ inKind ] ): ].strip( '/' ),
+                  'folder':folder,
+                  'format':presetFormat,
+                  'path':fullPath,
+                  'mtime':fileStat.st_mtime,
+                  'size':fileStat.st_size }
+        entry.update( readPresetSummary( fullPath, inKind, presetFormat ) )
+        entries[ inRelativePath ] = entry
+        return True
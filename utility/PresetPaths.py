@@ -0,0 +1,183 @@
+'''
+Resolves where presets live.
+
+Presets can come from several preset roots. Each root holds the same folder
+layout as the marigold install (frames/presets/, controllers/presets/). The roots
+are searched in order and the first one holding a preset wins, so a user or show
+library can override a preset from the studio library:
+
+    MARIGOLD_PRESET_PATH=/home/me/marigold:/shows/abc/marigold:/studio/marigold
+
+The roots are separated with os.pathsep (; on Windows). The marigold install is
+always searched last.
+
+The roots and the map of every preset in them are worked out once and reused
+until the environment changes or invalidate() is called. Looking up a preset that
+isn't in the map only stats its category folder in each root. The map is made
+again if one of those folders changed since it was made.
+
+Like PresetUtility, nothing in here imports Maya.
+'''
+import os
+import threading
+import marigold.utility.PresetBinary as PresetBinary
+
+PRESET_PATH_ENV = 'MARIGOLD_PRESET_PATH'
+SCRIPT_PATH_ENV = 'MAYA_SCRIPT_PATH'
+
+# Preset folders in each root, keyed by kind.
+PRESET_FOLDERS = { 'frames':'frames/presets/',
+                   'controllers':'controllers/presets/' }
+
+# File extensions for each preset format.
+PRESET_FORMAT_EXTENSIONS = { 'xml':'.xml',
+                             'binary':PresetBinary.BINARY_EXTENSION }
+
+def getInstallRoot():
+    '''
+    Finds the marigold install. Looks through MAYA_SCRIPT_PATH first, like the old
+    XMLUtility.getPresetPath did, then falls back to the folder this package is in.
+
+    @return: String. Full path to the marigold folder.
+    '''
+    scriptPath = os.environ.get( SCRIPT_PATH_ENV, '' )
+    # Maya on Windows separates with ; which is also what this used to split on.
+    for path in scriptPath.replace( ';', os.pathsep ).split( os.pathsep ):
+        if path.find( 'marigold' ) != -1:
+            return os.path.abspath( path )
+    return os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+class PresetResolver( object ):
+    '''
+    Ordered preset roots plus a map of the presets found in them.
+    '''
+    def __init__( self ):
+        self._environmentKey = None
+        self._roots = None
+        self._presetMap = None
+        # Folder path -> mtime when the map was made, for every folder in the map.
+        self._folderTimes = {}
+        self._lock = threading.RLock()
+
+    def getRoots( self ):
+        '''
+        @return: List of strings. Preset roots, highest priority first.
+        '''
+        with self._lock:
+            self._checkEnvironment()
+            if self._roots is None:
+                roots = []
+                for path in os.environ.get( PRESET_PATH_ENV, '' ).split( os.pathsep ):
+                    if path:
+                        path = os.path.abspath( os.path.expanduser( path ) )
+                        if path not in roots:
+                            roots.append( path )
+                installRoot = getInstallRoot()
+                if installRoot not in roots:
+                    roots.append( installRoot )
+                self._roots = roots
+            return list( self._roots )
+
+    def getWriteRoot( self ):
+        '''
+        @return: String. Root new presets are saved into. This is the highest
+            priority root, so a saved preset overrides the ones below it.
+        '''
+        return self.getRoots()[0]
+
+    def getPresetPath( self, inPresetPath ):
+        '''
+        @param inPresetPath: String. Preset path, for example 'frames/presets/arms/'.
+        @return: String. Full path of the preset folder in the write root.
+        '''
+        return self.getWriteRoot()+'/'+inPresetPath
+
+    def findPreset( self, inKind, inCategory, inName, inFormat='xml' ):
+        '''
+        Finds the preset file that wins out of all the roots.
+
+        @param inKind: String. 'frames' or 'controllers'.
+        @param inCategory: String. Sub-folder of the presets folder, for example
+            'arms'. Use '' for presets at the top of the folder.
+        @param inName: String. Preset name without the extension.
+        @param inFormat: String. 'xml' or 'binary'.
+        @return: String. Full path to the preset, or None if there isn't one. The path
+            isn't checked on disk. If the file was removed outside marigold since the
+            map was made, reading it raises an IOError. invalidate() forgets it.
+        '''
+        key = ( inKind, inCategory.strip( '/' ), inName, inFormat )
+        with self._lock:
+            presetPath = self._getPresetMap().get( key )
+            if presetPath is None and self._hasFolderChanged( inKind, key[1] ):
+                # Could have been added since the map was made.
+                self._presetMap = None
+                presetPath = self._getPresetMap().get( key )
+            return presetPath
+
+    def getPresets( self ):
+        '''
+        @return: Dictionary. Full path of every preset that wins out of all the roots,
+            keyed by ( kind, category, name, format ).
+        '''
+        with self._lock:
+            return dict( self._getPresetMap() )
+
+    def invalidate( self ):
+        '''
+        Forgets the roots and preset map. They are worked out again on next use.
+        '''
+        with self._lock:
+            self._roots = None
+            self._presetMap = None
+            self._folderTimes = {}
+
+    def _checkEnvironment( self ):
+        environmentKey = ( os.environ.get( PRESET_PATH_ENV ), os.environ.get( SCRIPT_PATH_ENV ) )
+        if environmentKey != self._environmentKey:
+            self._environmentKey = environmentKey
+            self.invalidate()
+
+    def _getPresetMap( self ):
+        roots = self.getRoots()
+        if self._presetMap is None:
+            extensionFormats = dict( ( extension, presetFormat ) for presetFormat, extension in PRESET_FORMAT_EXTENSIONS.iteritems() )
+            presetMap = {}
+            folderTimes = {}
+            # Lowest priority first so higher roots write over it.
+            for root in reversed( roots ):
+                for kind, presetFolder in PRESET_FOLDERS.iteritems():
+                    folderPath = os.path.join( root, presetFolder )
+                    for dirPath, dirNames, fileNames in os.walk( folderPath ):
+                        folderTimes[ os.path.normpath( dirPath ) ] = getFolderTime( dirPath )
+                        category = os.path.relpath( dirPath, folderPath ).replace( os.sep, '/' )
+                        if category == '.':
+                            category = ''
+                        for fileName in fileNames:
+                            name, extension = os.path.splitext( fileName )
+                            if extension in extensionFormats:
+                                presetMap[ ( kind, category, name, extensionFormats[ extension ] ) ] = os.path.join( dirPath, fileName )
+            self._presetMap = presetMap
+            self._folderTimes = folderTimes
+        return self._presetMap
+
+    def _hasFolderChanged( self, inKind, inCategory ):
+        # Only the folder the preset would be in is looked at. Adding or removing a
+        # file or sub-folder changes its mtime. A folder that is missing had None.
+        for root in self.getRoots():
+            folderPath = os.path.normpath( os.path.join( root, PRESET_FOLDERS[ inKind ], inCategory ) )
+            if getFolderTime( folderPath ) != self._folderTimes.get( folderPath ):
+                return True
+        return False
+
+def getFolderTime( inFolder ):
+    '''
+    @param inFolder: String. Full path of a folder.
+    @return: Float. Modification time of the folder, or None if it doesn't exist.
+    '''
+    try:
+        return os.stat( inFolder ).st_mtime
+    except OSError:
+        return None
+
+# The resolver shared by everything in the process.
+PRESET_RESOLVER = PresetResolver()
@@ -0,0 +1,218 @@
+'''
+Parses the preset library ahead of time.
+
+prewarmPresets() reads every preset found by the preset resolver in worker
+processes and puts the results into PRESET_CACHE, so later loads are cache hits.
+Module presets are also checked for missing parents and bits with the same path.
+
+Each worker is a new interpreter running this module, never a fork of the
+running one, so a worker doesn't carry Maya along. Inside Maya the workers run
+with mayapy. They only use the pure python preset readers (PresetUtility and
+PresetBinary). The jobs go in as JSON on stdin and the results come back pickled
+in a temporary file. When no interpreter can be found for the workers, or with
+inUseProcesses=False, the presets are read one after the other in this process.
+Presets a worker failed on are read in this process too.
+'''
+import cPickle
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import marigold.utility.PresetUtility as PresetUtility
+import marigold.utility.PresetBinary as PresetBinary
+from marigold.utility.PresetCache import PRESET_CACHE
+from marigold.utility.PresetPaths import PRESET_RESOLVER
+
+# Module the workers run.
+WORKER_MODULE = 'marigold.utility.PresetPrewarm'
+
+def getPresetParser( inKind, inFormat ):
+    '''
+    @param inKind: String. 'frames' or 'controllers'.
+    @param inFormat: String. 'xml' or 'binary'.
+    @return: Function. The parser XMLUtility caches this kind of preset with.
+    '''
+    if inKind == 'controllers':
+        return PresetUtility.readControlPreset
+    elif inFormat == 'binary':
+        return PresetBinary.readModuleBinary
+    return PresetUtility.readModulePreset
+
+def parsePresetFile( inJob ):
+    '''
+    Reads and checks a single preset. Runs in the worker processes.
+
+    @param inJob: List. Full path, kind and format of the preset.
+    @return: Dictionary. path, kind, format, mtime, size, value, seconds and error.
+        error is None when the preset was read and checks out.
+    '''
+    fullPath, kind, presetFormat = inJob
+    result = { 'path':fullPath, 'kind':kind, 'format':presetFormat,
+               'mtime':None, 'size':None, 'value':None, 'seconds':0.0, 'error':None }
+    startTime = time.time()
+    try:
+        fileStat = os.stat( fullPath )
+        result[ 'mtime' ] = fileStat.st_mtime
+        result[ 'size' ] = fileStat.st_size
+        result[ 'value' ] = getPresetParser( kind, presetFormat )( fullPath )
+
+        if kind == 'frames':
+            buildPlan = PresetUtility.planModuleBuild( result[ 'value' ] )
+            if buildPlan.orphans:
+                result[ 'error' ] = 'Bits with missing parents: {0}'.format( ', '.join( bit.name for bit in buildPlan.orphans ) )
+            elif buildPlan.duplicates:
+                result[ 'error' ] = 'Bits with the same path as another bit: {0}'.format( ', '.join( PresetUtility.getBitPath( bit ) for bit in buildPlan.duplicates ) )
+    except Exception as e:
+        result[ 'error' ] = '{0}: {1}'.format( e.__class__.__name__, e )
+    result[ 'seconds' ] = time.time()-startTime
+    return result
+
+def getWorkerExecutable():
+    '''
+    Workers have to be started with a plain python interpreter. Inside Maya
+    sys.executable is Maya itself, so mayapy next to it is used instead.
+
+    @return: String. Interpreter for the workers, or None if there isn't one.
+    '''
+    executableDir, executableName = os.path.split( sys.executable )
+    if os.path.splitext( executableName )[0].lower() == 'maya':
+        for mayapyName in ( 'mayapy.exe', 'mayapy' ):
+            mayapy = os.path.join( executableDir, mayapyName )
+            if os.path.isfile( mayapy ):
+                return mayapy
+        return None
+    return sys.executable or None
+
+def getPackageParent():
+    '''
+    @return: String. Folder holding the marigold package.
+    '''
+    return os.path.dirname( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
+
+def startWorker( inExecutable, inJobs ):
+    '''
+    Starts a worker interpreter on some of the presets.
+
+    @param inExecutable: String. Python interpreter to run.
+    @param inJobs: List. Jobs for parsePresetFile.
+    @return: List. The worker's Popen, the file it writes its results to, and inJobs.
+        The Popen is None if the worker couldn't be started.
+    '''
+    environment = dict( os.environ )
+    paths = [ getPackageParent() ]
+    if environment.get( 'PYTHONPATH' ):
+        paths.append( environment[ 'PYTHONPATH' ] )
+    environment[ 'PYTHONPATH' ] = os.pathsep.join( paths )
+
+    handle, resultFile = tempfile.mkstemp( prefix='marigoldPrewarm', suffix='.pickle' )
+    os.close( handle )
+    try:
+        process = subprocess.Popen( [ inExecutable, '-m', WORKER_MODULE, resultFile ], stdin=subprocess.PIPE, env=environment )
+        process.stdin.write( json.dumps( inJobs ) )
+        process.stdin.close()
+    except EnvironmentError:
+        return [ None, resultFile, inJobs ]
+    return [ process, resultFile, inJobs ]
+
+def finishWorker( inWorker ):
+    '''
+    Waits for a worker and reads its results.
+
+    @param inWorker: List. From startWorker.
+    @return: List of dictionaries. Results of parsePresetFile. None if the worker
+        failed.
+    '''
+    process, resultFile, jobs = inWorker
+    try:
+        if process is None or process.wait() != 0:
+            return None
+        with open( resultFile, 'rb' ) as f:
+            return cPickle.load( f )
+    except ( EnvironmentError, EOFError, cPickle.UnpicklingError ):
+        return None
+    finally:
+        if os.path.exists( resultFile ):
+            os.remove( resultFile )
+
+def parseInWorkers( inJobs, inMaxWorkers=None ):
+    '''
+    @param inJobs: List. Jobs for parsePresetFile.
+    @param inMaxWorkers: Int. Number of workers. Defaults to the number of CPUs.
+    @return: List of dictionaries. Results of parsePresetFile, in job order. None
+        if there is no interpreter to run the workers with.
+    '''
+    workerExecutable = getWorkerExecutable()
+    if workerExecutable is None:
+        return None
+    workerCount = inMaxWorkers
+    if workerCount is None:
+        import multiprocessing
+        workerCount = multiprocessing.cpu_count()
+    workerCount = max( 1, min( workerCount, len( inJobs ) ) )
+
+    # Every nth job, so big and small presets spread across the workers.
+    workers = [ startWorker( workerExecutable, inJobs[ i::workerCount ] ) for i in xrange( workerCount ) ]
+    resultsByPath = {}
+    for worker in workers:
+        results = finishWorker( worker )
+        if results is None:
+            print 'Preset prewarm worker failed, reading its {0} presets here.'.format( len( worker[2] ) )
+            results = [ parsePresetFile( job ) for job in worker[2] ]
+        for result in results:
+            resultsByPath[ result[ 'path' ] ] = result
+    return [ resultsByPath[ job[0] ] for job in inJobs ]
+
+def runWorker( inResultFile ):
+    '''
+    Worker side. Reads jobs as JSON from stdin and pickles the results of
+    parsePresetFile into inResultFile.
+
+    @param inResultFile: String. Full path of the file to write.
+    '''
+    jobs = json.load( sys.stdin )
+    results = [ parsePresetFile( [ str( job[0] ), str( job[1] ), str( job[2] ) ] ) for job in jobs ]
+    with open( inResultFile, 'wb' ) as f:
+        cPickle.dump( results, f, cPickle.HIGHEST_PROTOCOL )
+
+def prewarmPresets( inPresets=None, inMaxWorkers=None, inUseProcesses=True ):
+    '''
+    Reads presets into the shared preset cache.
+
+    @param inPresets: Dictionary. Full preset paths keyed by ( kind, category, name,
+        format ), as returned by PresetResolver.getPresets. Defaults to every preset
+        in every preset root.
+    @param inMaxWorkers: Int. Number of worker processes. Defaults to the number of CPUs.
+    @param inUseProcesses: Bool. Read the presets in worker processes.
+    @return: Dictionary. files is a list with path, kind, format, seconds and error
+        for each preset. failures is the part of that list with an error. seconds
+        is the time taken overall.
+    '''
+    startTime = time.time()
+    if inPresets is None:
+        inPresets = PRESET_RESOLVER.getPresets()
+    jobs = [ [ fullPath, key[0], key[3] ] for key, fullPath in sorted( inPresets.iteritems() ) ]
+
+    results = None
+    if inUseProcesses and len( jobs ) > 1:
+        results = parseInWorkers( jobs, inMaxWorkers )
+    if results is None:
+        results = [ parsePresetFile( job ) for job in jobs ]
+
+    fileList = []
+    for result in results:
+        value = result.pop( 'value' )
+        if value is not None:
+            # Still worth caching when the checks failed. loadModule reports the
+            # same problem when it gets there.
+            parser = getPresetParser( result[ 'kind' ], result[ 'format' ] )
+            PRESET_CACHE.put( result[ 'path' ], parser, value, inStat=[ result[ 'mtime' ], result[ 'size' ] ] )
+        fileList.append( result )
+
+    return { 'files':fileList,
+             'failures':[ result for result in fileList if result[ 'error' ] is not None ],
+             'seconds':time.time()-startTime }
+
+if __name__ == '__main__':
+    runWorker( sys.argv[1] )
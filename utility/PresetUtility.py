@@ -0,0 +1,476 @@
+'''
+Pure python helpers for reading module/character preset files.
+
+Nothing in this module imports Maya. That keeps it usable from mayapy, batch
+tools and worker processes that only need to look at preset data.
+'''
+import collections
+import xml.etree.ElementTree as ET
+import xml.parsers.expat
+from xml.sax.saxutils import escape, quoteattr
+
+# Typed records handed out by the preset readers. Plug and component lists are
+# stored as tuples so a record can be shared without being copied.
+BitRecord = collections.namedtuple( 'BitRecord', [ 'name', 'parent', 'shapeType', 'plugs', 'shape', 'components' ] )
+PlugRecord = collections.namedtuple( 'PlugRecord', [ 'name', 'attrType', 'attrDataType', 'value' ] )
+ComponentRecord = collections.namedtuple( 'ComponentRecord', [ 'name', 'plugs' ] )
+
+# Controller preset. attrs is a tuple of ( attrName, values ) pairs, values being a
+# tuple of the value strings found in the file.
+ControlRecord = collections.namedtuple( 'ControlRecord', [ 'name', 'type', 'attrs' ] )
+
+# Result of planModuleBuild.
+BuildPlan = collections.namedtuple( 'BuildPlan', [ 'order', 'orphans', 'duplicates' ] )
+
+INT_DATA_TYPES = ( 'long', 'short', 'enum', 'byte' )
+FLOAT_DATA_TYPES = ( 'doubleLinear', 'doubleAngle', 'float', 'double' )
+STRING_DATA_TYPES = ( 'string', 'typed' )
+
+# Components that mark the root bit of a module or character.
+ROOT_COMPONENT_SUFFIX = 'RootComponent'
+
+def convertPlugText( inAttrDataType, inText ):
+    '''
+    Converts the text of a preset plug into the matching python type.
+
+    @param inAttrDataType: String. The attribute data type stored with the plug. Transform
+        plugs don't store one, in which case the value is treated as a float.
+    @param inText: String. Text of the plug element. Can be None.
+    @return: Int, float, bool, string or None.
+    '''
+    if inText is None:
+        if inAttrDataType in STRING_DATA_TYPES:
+            # Empty string attributes are written as an empty element.
+            return ''
+        return None
+    if inText == 'None':
+        return None
+
+    try:
+        if inAttrDataType in INT_DATA_TYPES:
+            return int( inText )
+        elif inAttrDataType in FLOAT_DATA_TYPES or inAttrDataType is None:
+            return float( inText )
+        elif inAttrDataType == 'bool':
+            return inText in ( 'True', 'true', '1' )
+    except ValueError:
+        raise ValueError( 'Preset value ( {0} ) can not be converted to {1}.'.format( inText, inAttrDataType ) )
+
+    # Strings, message connections and child matrix paths stay as text.
+    return inText
+
+def getBitPath( inBitRecord ):
+    '''
+    Gets the path of a bit relative to the module group it is built under.
+
+    @param inBitRecord: BitRecord or bit dict.
+    @return: String. Path of the bit, for example |frame_root|frame_shoulder.
+    '''
+    if isinstance( inBitRecord, dict ):
+        name = inBitRecord[ 'name' ]
+        parent = inBitRecord[ 'parent' ]
+    else:
+        name = inBitRecord.name
+        parent = inBitRecord.parent
+    if parent is None or parent == 'None':
+        parent = ''
+    return '{0}|{1}'.format( parent, name )
+
+def readPlugElements( inElement, inTyped=True ):
+    '''
+    Reads the direct <plug> children of an element.
+
+    @param inElement: Element. Bit, shape or component element.
+    @param inTyped: Bool. Convert the plug values to python types. Otherwise the values
+        are left as the text of the element, with empty elements read as an empty string.
+    @return: Tuple of PlugRecord.
+    '''
+    plugList = []
+    for plug in inElement.findall( 'plug' ):
+        attrDataType = plug.get( 'attrDataType' )
+        if inTyped:
+            value = convertPlugText( attrDataType, plug.text )
+        elif plug.text is None:
+            value = ''
+        else:
+            value = plug.text
+        plugList.append( PlugRecord( plug.get( 'name' ), plug.get( 'attrType' ), attrDataType, value ) )
+    return tuple( plugList )
+
+def readBitElement( inElement, inTyped=True ):
+    '''
+    Converts a <bit> element into a BitRecord.
+
+    @param inElement: Element. The bit element.
+    @param inTyped: Bool. Convert the plug values to python types.
+    @return: BitRecord.
+    '''
+    shapes = inElement.findall( 'shape' )
+    if shapes:
+        shapeType = shapes[0].get( 'name' )
+        shapePlugs = readPlugElements( shapes[0], inTyped )
+    else:
+        shapeType = None
+        shapePlugs = ()
+
+    componentList = []
+    for comp in inElement.findall( 'component' ):
+        componentList.append( ComponentRecord( comp.get( 'name' ), readPlugElements( comp, inTyped ) ) )
+
+    parent = inElement.get( 'parent' )
+    if inTyped and parent == 'None':
+        parent = None
+
+    return BitRecord( inElement.get( 'name' ), parent, shapeType,
+                      readPlugElements( inElement, inTyped ), shapePlugs, tuple( componentList ) )
+
+def iterModuleBits( inFile, inTyped=True ):
+    '''
+    Streams the bits of a module XML file one at a time. Each <bit> element is
+    released as soon as its record has been made, so only one bit of the file
+    is held in memory at any point.
+
+    @param inFile: String. Full path to the module XML file.
+    @param inTyped: Bool. Convert the plug values to python types. When False the
+        values are left as the strings found in the file.
+    @return: Generator of BitRecord.
+    '''
+    with open( inFile, 'rb' ) as xmlFile:
+        context = iter( ET.iterparse( xmlFile, events=( 'start', 'end' ) ) )
+        event, xmlRoot = next( context )
+        for event, element in context:
+            if event == 'end' and element.tag == 'bit':
+                yield readBitElement( element, inTyped )
+
+                # Drop the finished bit, and anything before it, from the tree.
+                element.clear()
+                xmlRoot.clear()
+
+def readModuleElements( inFile ):
+    '''
+    Reads a module XML file as raw strings, keeping any top level elements that
+    aren't bits (like the old <metanode> element) as XML text. Used when a preset
+    has to be written back out without losing anything.
+    
+    @param inFile: String. Full path to the module XML file.
+    @return: List. Tuple of the extra element strings and a tuple of BitRecord.
+    '''
+    extraElements = []
+    bitList = []
+    depth = 0
+    with open( inFile, 'rb' ) as xmlFile:
+        for event, element in ET.iterparse( xmlFile, events=( 'start', 'end' ) ):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if element.tag == 'bit':
+                    bitList.append( readBitElement( element, inTyped=False ) )
+                elif element.tag == 'summary':
+                    # Made from the bits again when the preset is written.
+                    pass
+                else:
+                    element.tail = None
+                    extraElements.append( ET.tostring( element ) )
+                element.clear()
+    return [ tuple( extraElements ), tuple( bitList ) ]
+
+class _SummaryFound( Exception ):
+    pass
+
+def readModuleSummary( inFile ):
+    '''
+    Reads the bit count, component types and meta class of a module XML file
+    without making any bit records.
+    
+    Presets written by XMLUtility.writeModuleXML start with a <summary> element,
+    in which case nothing past it is read. Older presets are scanned without
+    building any elements, so plugs cost next to nothing.
+    
+    @param inFile: String. Full path to the module XML file.
+    @return: Dictionary. bitCount, componentCount, componentTypes (sorted list of
+        component names) and metaClass. See getModuleSummary for where metaClass
+        comes from.
+    '''
+    summary = { 'bitCount':0, 'componentCount':0, 'componentTypes':[], 'metaClass':None }
+    componentTypes = set()
+    state = { 'depth':0, 'rootBit':False, 'rootClass':None }
+    
+    def startElement( inName, inAttrs ):
+        state[ 'depth' ] += 1
+        depth = state[ 'depth' ]
+        if depth == 2:
+            state[ 'rootBit' ] = False
+            if inName == 'bit':
+                summary[ 'bitCount' ] += 1
+                state[ 'rootBit' ] = inAttrs.get( 'parent' ) == 'None' and state[ 'rootClass' ] is None
+            elif inName == 'metanode':
+                summary[ 'metaClass' ] = inAttrs.get( 'metaClass' )
+            elif inName == 'summary':
+                summary.update( readSummaryAttributes( inAttrs ) )
+                raise _SummaryFound()
+        elif depth == 3 and inName == 'component':
+            summary[ 'componentCount' ] += 1
+            componentTypes.add( inAttrs.get( 'name' ) )
+            if state[ 'rootBit' ] and inAttrs.get( 'name' ).endswith( ROOT_COMPONENT_SUFFIX ):
+                state[ 'rootClass' ] = inAttrs.get( 'name' )
+                state[ 'rootBit' ] = False
+    
+    def endElement( inName ):
+        state[ 'depth' ] -= 1
+    
+    parser = xml.parsers.expat.ParserCreate()
+    parser.StartElementHandler = startElement
+    parser.EndElementHandler = endElement
+    try:
+        with open( inFile, 'rb' ) as xmlFile:
+            parser.ParseFile( xmlFile )
+    except _SummaryFound:
+        return summary
+    
+    summary[ 'componentTypes' ] = sorted( componentTypes )
+    if summary[ 'metaClass' ] is None:
+        summary[ 'metaClass' ] = state[ 'rootClass' ]
+    return summary
+
+def readSummaryAttributes( inAttrs ):
+    '''
+    @param inAttrs: Dictionary. Attributes of a <summary> element.
+    @return: Dictionary. Same layout as readModuleSummary.
+    '''
+    componentTypes = inAttrs.get( 'componentTypes', '' )
+    return { 'bitCount':int( inAttrs.get( 'bitCount', 0 ) ),
+             'componentCount':int( inAttrs.get( 'componentCount', 0 ) ),
+             'componentTypes':[ compType for compType in componentTypes.split( ',' ) if compType ],
+             'metaClass':inAttrs.get( 'metaClass' ) }
+
+def getModuleSummary( inBits, inExtraElements=() ):
+    '''
+    Works out the summary of a module from its bits.
+    
+    @param inBits: List of BitRecord.
+    @param inExtraElements: List of strings. XML of any other top level elements.
+    @return: Dictionary. Same layout as readModuleSummary. metaClass comes from the
+        <metanode> element if there is one, otherwise it is the root component
+        (ModuleRootComponent, CharacterRootComponent...) on the root bit.
+    '''
+    componentTypes = set()
+    componentCount = 0
+    metaClass = None
+    for bit in inBits:
+        for comp in bit.components:
+            componentTypes.add( comp.name )
+            componentCount += 1
+        if metaClass is None and bit.parent in ( None, 'None' ):
+            for comp in bit.components:
+                if comp.name.endswith( ROOT_COMPONENT_SUFFIX ):
+                    metaClass = comp.name
+                    break
+    for element in inExtraElements:
+        if isinstance( element, unicode ):
+            element = element.encode( 'utf-8' )
+        element = ET.fromstring( element )
+        if element.tag == 'metanode':
+            metaClass = element.get( 'metaClass' )
+    return { 'bitCount':len( inBits ),
+             'componentCount':componentCount,
+             'componentTypes':sorted( componentTypes ),
+             'metaClass':metaClass }
+
+def formatSummaryXML( inSummary ):
+    '''
+    Formats a module summary as a <summary> element.
+    
+    @param inSummary: Dictionary. From getModuleSummary.
+    @return: String.
+    '''
+    attrs = [ 'bitCount=\"{0}\"'.format( inSummary[ 'bitCount' ] ),
+              'componentCount=\"{0}\"'.format( inSummary[ 'componentCount' ] ),
+              'componentTypes={0}'.format( quoteattr( ','.join( inSummary[ 'componentTypes' ] ) ) ) ]
+    if inSummary[ 'metaClass' ] is not None:
+        attrs.append( 'metaClass={0}'.format( quoteattr( inSummary[ 'metaClass' ] ) ) )
+    return '\t<summary {0} />'.format( ' '.join( attrs ) )
+
+def readModulePreset( inFile ):
+    '''
+    Reads every bit of a module XML file with typed plug values.
+    
+    @param inFile: String. Full path to the module XML file.
+    @return: Tuple of BitRecord.
+    '''
+    return tuple( iterModuleBits( inFile ) )
+
+def readModulePresetText( inFile ):
+    '''
+    Reads every bit of a module XML file, leaving the plug values as strings. Empty
+    plug elements are read as an empty string.
+    
+    @param inFile: String. Full path to the module XML file.
+    @return: Tuple of BitRecord.
+    '''
+    return tuple( iterModuleBits( inFile, inTyped=False ) )
+
+def readControlPreset( inFile ):
+    '''
+    Reads a controller preset XML file.
+    
+    <data>
+        <control name="" type="">
+            <attr name="">
+                <value>#</value>
+            </attr>
+        </control>
+    </data>
+    
+    @param inFile: String. Full path to the controller XML file.
+    @return: ControlRecord. Only the last <control> in the file is returned.
+    '''
+    controlRecord = None
+    xmlRoot = ET.parse( inFile ).getroot()
+    for control in xmlRoot.findall( 'control' ):
+        attrList = []
+        for attr in control.findall( 'attr' ):
+            values = tuple( value.text for value in attr.findall( 'value' ) )
+            attrList.append( ( attr.get( 'name' ), values ) )
+        controlRecord = ControlRecord( control.get( 'name' ), control.get( 'type' ), tuple( attrList ) )
+    return controlRecord
+
+def planModuleBuild( inBits ):
+    '''
+    Sorts the bits of a module so every bit comes after its parent. Bits keep the
+    order they have in the file unless their parent comes later.
+    
+    Bits that can't be built are reported instead of being sorted:
+        orphans: Bits whose parent isn't in the module, plus everything under them.
+        duplicates: Bits with the same path as a bit earlier in the file. They
+            would be built over the first one. Bits under that path stay with the
+            first one.
+    
+    Parents are stored as paths, and a parent's path is always shorter than its
+    child's, so bits can't be parented in a loop.
+    
+    @param inBits: List of BitRecord.
+    @return: BuildPlan.
+    '''
+    bitPaths = set()
+    childBits = {}
+    rootBits = []
+    duplicates = []
+    for bit in inBits:
+        bitPath = getBitPath( bit )
+        if bitPath in bitPaths:
+            duplicates.append( bit )
+            continue
+        bitPaths.add( bitPath )
+        if bit.parent is None or bit.parent == 'None':
+            rootBits.append( bit )
+        else:
+            childBits.setdefault( bit.parent, [] ).append( bit )
+    
+    # Depth first from the root bits. Each parent hands over its children once.
+    order = []
+    stack = list( reversed( rootBits ) )
+    while stack:
+        bit = stack.pop()
+        order.append( bit )
+        stack.extend( reversed( childBits.pop( getBitPath( bit ), [] ) ) )
+    
+    # Anything left over is waiting on a parent that never got built.
+    orphans = []
+    if childBits:
+        orphans = [ bit for bits in childBits.itervalues() for bit in bits ]
+        
+        # Report orphans in file order.
+        fileOrder = dict( ( id( bit ), index ) for index, bit in enumerate( inBits ) )
+        orphans.sort( key=lambda bit: fileOrder[ id( bit ) ] )
+    
+    return BuildPlan( order, orphans, duplicates )
+
+def formatPlugXML( inPlugRecord, inIndent ):
+    '''
+    Formats a plug record as a line of XML.
+    
+    @param inPlugRecord: PlugRecord. Values that aren't strings are written with format,
+        so None is written as 'None' the same as XMLUtility.writeModuleXML does.
+    @param inIndent: String. Tabs to put in front of the line.
+    @return: String.
+    '''
+    attrs = [ 'name=\"{0}\"'.format( inPlugRecord.name ) ]
+    if inPlugRecord.attrType is not None:
+        attrs.append( 'attrType=\"{0}\"'.format( inPlugRecord.attrType ) )
+    if inPlugRecord.attrDataType is not None:
+        attrs.append( 'attrDataType=\"{0}\"'.format( inPlugRecord.attrDataType ) )
+    if isinstance( inPlugRecord.value, basestring ):
+        value = escape( inPlugRecord.value )
+    else:
+        value = escape( '{0}'.format( inPlugRecord.value ) )
+    return '{0}<plug {1}>{2}</plug>'.format( inIndent, ' '.join( attrs ), value )
+
+def formatBitXML( inBitRecord ):
+    '''
+    Formats a bit record as XML lines, laid out the same way XMLUtility.writeModuleXML does.
+    
+    @param inBitRecord: BitRecord. Values should be strings, as read with readModulePresetText.
+    @return: List of strings.
+    '''
+    parent = inBitRecord.parent
+    if parent is None:
+        parent = 'None'
+    xmlLines = [ '\t<bit name=\"{0}\" parent=\"{1}\">'.format( inBitRecord.name, parent ) ]
+    for plug in inBitRecord.plugs:
+        xmlLines.append( formatPlugXML( plug, '\t\t' ) )
+    if inBitRecord.shapeType is not None:
+        xmlLines.append( '\t\t<shape name=\"{0}\">'.format( inBitRecord.shapeType ) )
+        for plug in inBitRecord.shape:
+            xmlLines.append( formatPlugXML( plug, '\t\t\t' ) )
+        xmlLines.append( '\t\t</shape>' )
+    for comp in inBitRecord.components:
+        xmlLines.append( '\t\t<component name=\"{0}\">'.format( comp.name ) )
+        for plug in comp.plugs:
+            xmlLines.append( formatPlugXML( plug, '\t\t\t' ) )
+        xmlLines.append( '\t\t</component>' )
+    xmlLines.append( '\t</bit>' )
+    return xmlLines
+
+def writeModuleRecordsXML( inFile, inBits, inExtraElements=() ):
+    '''
+    Writes bit records out as a module XML file. The file starts with a <summary>
+    element so it can be listed without reading the bits (see readModuleSummary).
+    
+    @param inFile: String. Full path of the file to write.
+    @param inBits: List of BitRecord. Values should be strings, as read with readModulePresetText.
+    @param inExtraElements: List of strings. XML of any other top level elements.
+    '''
+    newfile = open( inFile, 'w' )
+    newfile.write( '<data>\n' )
+    newfile.write( formatSummaryXML( getModuleSummary( inBits, inExtraElements ) )+'\n' )
+    for element in inExtraElements:
+        newfile.write( '\t{0}\n'.format( element ) )
+    for bit in inBits:
+        for line in formatBitXML( bit ):
+            newfile.write( line+'\n' )
+    newfile.write( '</data>\n' )
+    newfile.close()
+
+def bitRecordToDict( inBitRecord ):
+    '''
+    Converts a BitRecord into the dictionary layout returned by XMLUtility.readModuleXML.
+
+    @param inBitRecord: BitRecord.
+    @return: Dictionary.
+    '''
+    def plugsToList( inPlugs ):
+        # readModuleXML has always given None for empty plug elements.
+        return [ { 'name':plug.name, 'attrType':plug.attrType, 'attrDataType':plug.attrDataType, 'value':plug.value or None } for plug in inPlugs ]
+
+    componentList = []
+    for comp in inBitRecord.components:
+        componentList.append( { 'name':comp.name, 'plugs':plugsToList( comp.plugs ) } )
+
+    return { 'name':inBitRecord.name,
+             'parent':inBitRecord.parent,
+             'shapeType':inBitRecord.shapeType,
+             'plugs':plugsToList( inBitRecord.plugs ),
+             'shape':plugsToList( inBitRecord.shape ),
+             'components':componentList }
@@ -0,0 +1,245 @@
+'''
+Index of the marigold network nodes in the scene.
+
+Meta nodes and components are network nodes told apart by a few attributes:
+metaType on meta nodes, classType on components, and version, modules or
+characterRoot depending on what they are. NodeUtility.getMetaNodesInScene,
+getCharactersInScene and getModulesInScenes used to list every network node and
+query those attributes each time. SCENE_INDEX keeps them by classType, metaType
+and which of the attributes they have instead.
+
+The index is built with one pass of MItDependencyNodes the first time it is used.
+After that it is kept current with callbacks:
+
+    node added      New network nodes are added.
+    node removed    Removed network nodes are dropped.
+    attribute       Each indexed node has a callback that marks it for a re-read
+                    when one of the indexed attributes is added, removed, renamed
+                    or set. Marked nodes are re-read on the next query.
+    new/open scene  The index is dropped and built again on next use.
+
+Queries only touch the nodes they return.
+
+Each indexed node gets a record id of its own. MObjectHandle hash codes aren't
+unique, so they are only used to find the records that might belong to a node,
+and the node is then compared with each record's MObject.
+'''
+import maya.OpenMaya as OpenMaya
+
+NETWORK_NODE_TYPE = 'network'
+
+# Attributes whose presence is indexed.
+INDEXED_ATTRIBUTES = ( 'version', 'modules', 'characterRoot' )
+
+# String attributes whose values are indexed.
+INDEXED_VALUES = ( 'classType', 'metaType' )
+
+ATTRIBUTE_MESSAGES = ( OpenMaya.MNodeMessage.kAttributeSet |
+                       OpenMaya.MNodeMessage.kAttributeAdded |
+                       OpenMaya.MNodeMessage.kAttributeRemoved |
+                       OpenMaya.MNodeMessage.kAttributeRenamed )
+
+class SceneIndex( object ):
+    '''
+    Network nodes keyed by classType, metaType and indexed attributes.
+    '''
+    def __init__( self ):
+        self.isBuilt = False
+        # Record id -> [ MObjectHandle, { attribute: value }, callback id ]
+        self._nodes = {}
+        # Hash code -> list of record ids
+        self._buckets = {}
+        self._nextId = 0
+        # ( attribute, value ) -> set of record ids. Attributes from INDEXED_ATTRIBUTES
+        # are stored with a value of True.
+        self._keys = {}
+        self._dirty = set()
+        self._callbackIds = []
+
+    def getNodes( self, inClassType=None, inMetaType=None, inAttribute=None ):
+        '''
+        Finds indexed nodes. Every filter given has to match.
+
+        @param inClassType: String. classType of the node.
+        @param inMetaType: String. metaType of the node.
+        @param inAttribute: String. One of INDEXED_ATTRIBUTES the node has to have.
+        @return: List of strings. Node names, sorted.
+        '''
+        self._update()
+        keys = []
+        if inClassType is not None:
+            keys.append( ( 'classType', inClassType ) )
+        if inMetaType is not None:
+            keys.append( ( 'metaType', inMetaType ) )
+        if inAttribute is not None:
+            if inAttribute not in INDEXED_ATTRIBUTES:
+                raise ValueError( '{0} is not indexed. Use one of {1}.'.format( inAttribute, ', '.join( INDEXED_ATTRIBUTES ) ) )
+            keys.append( ( inAttribute, True ) )
+
+        if keys:
+            keySets = sorted( [ self._keys.get( key, set() ) for key in keys ], key=len )
+            recordIds = keySets[0].intersection( *keySets[1:] )
+        else:
+            recordIds = self._nodes.keys()
+
+        nodeList = []
+        for recordId in recordIds:
+            handle = self._nodes[ recordId ][0]
+            if handle.isValid() and handle.isAlive():
+                nodeList.append( OpenMaya.MFnDependencyNode( handle.object() ).name() )
+        return sorted( nodeList )
+
+    def build( self ):
+        '''
+        Indexes every network node in the scene.
+        '''
+        self.clear()
+        self.installCallbacks()
+        self.isBuilt = True
+        nodeIt = OpenMaya.MItDependencyNodes()
+        depFn = OpenMaya.MFnDependencyNode()
+        while not nodeIt.isDone():
+            mObj = nodeIt.thisNode()
+            depFn.setObject( mObj )
+            if depFn.typeName() == NETWORK_NODE_TYPE:
+                self._addNode( mObj )
+            nodeIt.next()
+
+    def clear( self ):
+        '''
+        Drops the index. It is built again on next use.
+        '''
+        for recordId in self._nodes.keys():
+            self._removeNode( recordId )
+        self._buckets.clear()
+        self._keys.clear()
+        self._dirty.clear()
+        self.isBuilt = False
+
+    def getStats( self ):
+        '''
+        @return: Dictionary. Number of indexed nodes and nodes waiting for a re-read.
+        '''
+        return { 'nodes':len( self._nodes ),
+                 'dirty':len( self._dirty ),
+                 'built':self.isBuilt }
+
+    def installCallbacks( self ):
+        '''
+        Adds the scene callbacks that keep the index current. Only done once.
+        '''
+        if self._callbackIds:
+            return
+        self._callbackIds.append( OpenMaya.MDGMessage.addNodeAddedCallback( self._nodeAdded, NETWORK_NODE_TYPE ) )
+        self._callbackIds.append( OpenMaya.MDGMessage.addNodeRemovedCallback( self._nodeRemoved, NETWORK_NODE_TYPE ) )
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kBeforeNew, self._sceneChanged ) )
+        self._callbackIds.append( OpenMaya.MSceneMessage.addCallback( OpenMaya.MSceneMessage.kBeforeOpen, self._sceneChanged ) )
+
+    def removeCallbacks( self ):
+        '''
+        Removes the scene callbacks and drops the index. Call before reloading the
+        module.
+        '''
+        for callbackId in self._callbackIds:
+            OpenMaya.MMessage.removeCallback( callbackId )
+        self._callbackIds = []
+        self.clear()
+
+    def _update( self ):
+        if not self.isBuilt:
+            self.build()
+        for recordId in list( self._dirty ):
+            self._readNode( recordId )
+        self._dirty.clear()
+
+    def _findNode( self, inNode ):
+        # Records with the node's hash code, checked against the node itself.
+        for recordId in self._buckets.get( OpenMaya.MObjectHandle( inNode ).hashCode(), () ):
+            handle = self._nodes[ recordId ][0]
+            if handle.isValid() and handle.isAlive() and handle.object() == inNode:
+                return recordId
+        return None
+
+    def _addNode( self, inNode ):
+        if self._findNode( inNode ) is not None:
+            return
+        handle = OpenMaya.MObjectHandle( inNode )
+        recordId = self._nextId
+        self._nextId += 1
+        callbackId = OpenMaya.MNodeMessage.addAttributeChangedCallback( inNode, self._attributeChanged, recordId )
+        self._nodes[ recordId ] = [ handle, {}, callbackId ]
+        self._buckets.setdefault( handle.hashCode(), [] ).append( recordId )
+        self._readNode( recordId )
+
+    def _readNode( self, inRecordId ):
+        record = self._nodes.get( inRecordId )
+        if record is None:
+            return
+        self._unindex( inRecordId )
+        if not ( record[0].isValid() and record[0].isAlive() ):
+            return
+        depFn = OpenMaya.MFnDependencyNode( record[0].object() )
+        values = {}
+        for attr in INDEXED_ATTRIBUTES:
+            if depFn.hasAttribute( attr ):
+                values[ attr ] = True
+        for attr in INDEXED_VALUES:
+            if depFn.hasAttribute( attr ):
+                values[ attr ] = depFn.findPlug( attr ).asString()
+        record[1] = values
+        for key in values.iteritems():
+            self._keys.setdefault( key, set() ).add( inRecordId )
+
+    def _unindex( self, inRecordId ):
+        for key in self._nodes[ inRecordId ][1].iteritems():
+            recordIds = self._keys.get( key )
+            if recordIds is not None:
+                recordIds.discard( inRecordId )
+                if not recordIds:
+                    del self._keys[ key ]
+        self._nodes[ inRecordId ][1] = {}
+
+    def _removeNode( self, inRecordId ):
+        if inRecordId not in self._nodes:
+            return
+        self._unindex( inRecordId )
+        record = self._nodes.pop( inRecordId )
+        self._dirty.discard( inRecordId )
+        hashCode = record[0].hashCode()
+        bucket = self._buckets.get( hashCode )
+        if bucket is not None and inRecordId in bucket:
+            bucket.remove( inRecordId )
+            if not bucket:
+                del self._buckets[ hashCode ]
+        try:
+            OpenMaya.MMessage.removeCallback( record[2] )
+        except RuntimeError:
+            # Already gone with the node.
+            pass
+
+    def _nodeAdded( self, inNode, *args ):
+        if self.isBuilt:
+            self._addNode( inNode )
+
+    def _nodeRemoved( self, inNode, *args ):
+        if self.isBuilt:
+            recordId = self._findNode( inNode )
+            if recordId is not None:
+                self._removeNode( recordId )
+
+    def _attributeChanged( self, inMessage, inPlug, inOtherPlug, inRecordId ):
+        if not inMessage & ATTRIBUTE_MESSAGES:
+            return
+        if inMessage & OpenMaya.MNodeMessage.kAttributeRenamed:
+            # The plug only has the new name.
+            self._dirty.add( inRecordId )
+            return
+        attr = OpenMaya.MFnAttribute( inPlug.attribute() ).name()
+        if attr in INDEXED_ATTRIBUTES or attr in INDEXED_VALUES:
+            self._dirty.add( inRecordId )
+
+    def _sceneChanged( self, *args ):
+        self.clear()
+
+# The index shared by everything in the process.
+SCENE_INDEX = SceneIndex()
@@ -9,24 +9,52 @@ TODO:
 import math
 import os
 import types
-import xml.etree.ElementTree as ET
 import maya.cmds as cmds
-import maya.mel as mel
 import maya.OpenMaya as OpenMaya
 import marigold.utility.NodeUtility as NodeUtility
 import marigold.utility.TransformUtility as TransformUtility
+import marigold.utility.PresetUtility as PresetUtility
+import marigold.utility.PresetBinary as PresetBinary
+import marigold.utility.BatchUtility as BatchUtility
+from marigold.utility.PresetCache import PRESET_CACHE
+import marigold.utility.PresetCatalog as PresetCatalog
+from marigold.utility.PresetPaths import PRESET_RESOLVER
+from marigold.utility.ConnectionSnapshot import ConnectionSnapshot
 import marigold.components as components
 
 
 CONTROLLER_PRESETS_PATH = 'controllers/presets/'
 FRAME_PRESETS_PATH = 'frames/presets/'
 FRAME_MODULES_PATH = 'frames/modules/'
+PRESET_FORMATS = ( 'xml', 'binary' )
+
+# How far apart float plug values can be and still count as the same when
+# re-applying a preset.
+PLUG_TOLERANCE = 1e-5
 
 def getPresetPath( inPresetPath=CONTROLLER_PRESETS_PATH ):
-    scriptPaths = mel.eval( 'getenv MAYA_SCRIPT_PATH' ).split( ';' )
-    for path in scriptPaths:
-        if path.find( 'marigold' ) is not -1:
-            return path+'/'+inPresetPath
+    '''
+    @param inPresetPath: String. Preset path, for example FRAME_PRESETS_PATH.
+    @return: String. Full path of the preset folder in the highest priority preset root.
+        See PresetPaths for how the roots are set up.
+    '''
+    return PRESET_RESOLVER.getPresetPath( inPresetPath )
+
+# Shared preset catalog. Made the first time it's needed.
+_presetCatalog = None
+
+def getPresetCatalog():
+    '''
+    Gets the catalog of the presets in every preset root. The catalog is made again
+    if the roots change.
+    
+    @return: PresetCatalog.PresetCatalog.
+    '''
+    global _presetCatalog
+    presetRoots = PRESET_RESOLVER.getRoots()
+    if _presetCatalog is None or _presetCatalog.roots != presetRoots:
+        _presetCatalog = PresetCatalog.PresetCatalog( presetRoots )
+    return _presetCatalog
 
 def getObjectShortName( inObjectName ):
     '''
@@ -37,21 +65,30 @@ def getObjectShortName( inObjectName ):
     splitName = inObjectName.split( '|' )
     return splitName[ len( splitName )-1 ]
 
-def writeModuleXML( inRootObjectName, inModuleType, inModuleName ):
+def writeModuleXML( inRootObjectName, inModuleType, inModuleName, inFormat='xml' ):
     '''
     Function for writing module xml.
     
     @param inRootObjectName: String. Name of module root object.
     @param inModuleType: String. Type of module. This determines which sub-folder the XML is saved.
     @param inModuleName: String. Name of the module XML file.
+    @param inFormat: String. 'xml' or 'binary'. Binary presets are saved with the
+        PresetBinary.BINARY_EXTENSION extension next to the XML presets.
     '''
+    if inFormat not in PRESET_FORMATS:
+        raise ValueError( 'Unknown preset format {0}. Use one of {1}.'.format( inFormat, ', '.join( PRESET_FORMATS ) ) )
+    
     # Get list of the module hierarchy. Root is always first
     hierarchyList = NodeUtility.getFrameRootAllChildren( inRootObjectName )
     hierarchyList.insert( 0, inRootObjectName )
     
-    # START: Writing XML
-    xmlLines = []
-    xmlLines.append( '<data>' )
+    # Every connection the export needs, read in one go. Shapes and components
+    # are added as they are found.
+    snapshot = ConnectionSnapshot( hierarchyList, inMessageOnly=False )
+    allComponents = components.getBitComponents( hierarchyList, snapshot )
+    
+    # START: Gathering bits
+    bitList = []
     
     for item in hierarchyList:        
         # BIT INFO
@@ -62,31 +99,34 @@ def writeModuleXML( inRootObjectName, inModuleType, inModuleName ):
         itemRotation = TransformUtility.getMatrixRotation( itemMatrix, 'eulerVector' )
         
         # START: Bit
-        xmlLines.append( '\t<bit name=\"{0}\" parent=\"{1}\">'.format( itemName, itemParent ) )        
-        xmlLines.append( '\t\t<plug name=\"translateX\">{0}</plug>'.format( itemPosition.x ) )
-        xmlLines.append( '\t\t<plug name=\"translateY\">{0}</plug>'.format( itemPosition.y ) )
-        xmlLines.append( '\t\t<plug name=\"translateZ\">{0}</plug>'.format( itemPosition.z ) )    
-        xmlLines.append( '\t\t<plug name=\"rotateX\">{0}</plug>'.format( math.degrees(itemRotation.x) ) )
-        xmlLines.append( '\t\t<plug name=\"rotateY\">{0}</plug>'.format( math.degrees(itemRotation.y) ) )
-        xmlLines.append( '\t\t<plug name=\"rotateZ\">{0}</plug>'.format( math.degrees(itemRotation.z) ) )
+        bitPlugs = []
+        bitPlugs.append( PresetUtility.PlugRecord( 'translateX', None, None, '{0}'.format( itemPosition.x ) ) )
+        bitPlugs.append( PresetUtility.PlugRecord( 'translateY', None, None, '{0}'.format( itemPosition.y ) ) )
+        bitPlugs.append( PresetUtility.PlugRecord( 'translateZ', None, None, '{0}'.format( itemPosition.z ) ) )
+        bitPlugs.append( PresetUtility.PlugRecord( 'rotateX', None, None, '{0}'.format( math.degrees(itemRotation.x) ) ) )
+        bitPlugs.append( PresetUtility.PlugRecord( 'rotateY', None, None, '{0}'.format( math.degrees(itemRotation.y) ) ) )
+        bitPlugs.append( PresetUtility.PlugRecord( 'rotateZ', None, None, '{0}'.format( math.degrees(itemRotation.z) ) ) )
         
         # SHAPE
+        shapeType = None
+        shapePlugs = []
         itemShape = NodeUtility.getDagPath( itemName ).child( 0 )
         depFn = OpenMaya.MFnDependencyNode( itemShape )
-        shapeType = depFn.typeName()
-        if shapeType.find( 'gl' ) != -1:
+        if depFn.typeName().find( 'gl' ) != -1:
+            shapeType = depFn.typeName()
             itemShapeName = cmds.listRelatives( itemName, shapes=True, fullPath=True )[0]
-            # Start shape
-            xmlLines.append( '\t\t<shape name=\"{0}\">'.format( shapeType ) )
             
             # Get the shape's local position and scale.
-            for attr in cmds.listAttr( itemShapeName, channelBox=True ):
+            channelAttrs = cmds.listAttr( itemShapeName, channelBox=True )
+            channelValues = NodeUtility.getPlugValues( itemShapeName, channelAttrs )
+            for attr in channelAttrs:
                 types = NodeUtility.getAttrTypes( itemShapeName, attr )
-                aPlug = NodeUtility.getPlug( itemShapeName, attr )
-                xmlLines.append( '\t\t\t<plug name=\"{0}\" attrType=\"{1}\" attrDataType=\"{2}\">{3}</plug>'.format( attr, types[0], types[1], NodeUtility.getPlugValue(aPlug) ) )
+                shapePlugs.append( PresetUtility.PlugRecord( attr, '{0}'.format( types[0] ), '{0}'.format( types[1] ), '{0}'.format( channelValues[ attr ] ) ) )
             
             # Get the shape's custom attributes.
-            for attr in cmds.listAttr( itemShapeName, multi=True, keyable=True ):
+            keyableAttrs = cmds.listAttr( itemShapeName, multi=True, keyable=True )
+            keyableValues = NodeUtility.getPlugValues( itemShapeName, [ attr for attr in keyableAttrs if attr.find( '[' ) == -1 ] )
+            for attr in keyableAttrs:
                 
                 types = NodeUtility.getAttrTypes( itemShapeName, attr )
                 
@@ -95,7 +135,7 @@ def writeModuleXML( inRootObjectName, inModuleType, inModuleName ):
                     # the base name for the attribute. From there we can then loop through it's children.
                     # First we get the connection since these plugs won't return a value, but rather a
                     # connected node.
-                    connection = NodeUtility.getNodeAttrSource( itemShapeName, attr )
+                    connection = snapshot.getNodeAttrSource( itemShapeName, attr )
                     bitChildren = cmds.listRelatives( itemName, type='transform', children=True, fullPath=True )
                     for child in bitChildren:
                         childSplit = child.split('|')
@@ -106,57 +146,52 @@ def writeModuleXML( inRootObjectName, inModuleType, inModuleName ):
                     attrSplit = attr.split('[')
                     attr = attrSplit[0]
                 else:
-                    aPlug = NodeUtility.getPlug( itemShapeName, attr )
-                    plugValue = NodeUtility.getPlugValue( aPlug )
+                    plugValue = keyableValues[ attr ]
                     
                 
                 if types[0] is not False:
-                    xmlLines.append( '\t\t\t<plug name=\"{0}\" attrType=\"{1}\" attrDataType=\"{2}\">{3}</plug>'.format( attr, types[0], types[1], plugValue ) )
-            # End shape
-            xmlLines.append( '\t\t</shape>' )
+                    shapePlugs.append( PresetUtility.PlugRecord( attr, '{0}'.format( types[0] ), '{0}'.format( types[1] ), '{0}'.format( plugValue ) ) )
             
         # BIT COMPONENTS
         print 'item: {0}'.format( item )
-        bitComponents = components.getComponents( item )
+        componentList = []
+        bitComponents = allComponents[ item ]
         for comp in bitComponents:            
             # Component info
             compName = ''.join(i for i in comp if not i.isdigit())
-
-            # Start component.
-            xmlLines.append( '\t\t<component name=\"{0}\">'.format( compName ) )
             
+            compPlugs = []
             compSettings = NodeUtility.getModuleComponentSettings( comp )
-            for attr in compSettings:
-                types = NodeUtility.getAttrTypes( comp, attr )
-                
+            compTypes = [ NodeUtility.getAttrTypes( comp, attr ) for attr in compSettings ]
+            compValues = NodeUtility.getPlugValues( comp, [ attr for attr, types in zip( compSettings, compTypes ) if types[1] != 'message' ] )
+            for attr, types in zip( compSettings, compTypes ):
                 # Special case message plugs.
                 if types[1] == 'message':
-                    messageValues = NodeUtility.getAttrMessageValue( comp, attr )
+                    messageValues = snapshot.getAttrMessageValue( comp, attr )
                     if isinstance( messageValues, unicode ):
                         plugValue = messageValues
                     elif isinstance( messageValues, list ):
                         plugValue = None
                 else:
-                    aPlug = NodeUtility.getPlug( comp, attr )
-                    plugValue = NodeUtility.getPlugValue( aPlug )
-                xmlLines.append( '\t\t\t<plug name=\"{0}\" attrType=\"{1}\" attrDataType=\"{2}\">{3}</plug>'.format( attr, types[0], types[1], plugValue ) )
-    
-            xmlLines.append( '\t\t</component>' )
+                    plugValue = compValues[ attr ]
+                compPlugs.append( PresetUtility.PlugRecord( attr, '{0}'.format( types[0] ), '{0}'.format( types[1] ), '{0}'.format( plugValue ) ) )
+            
+            componentList.append( PresetUtility.ComponentRecord( compName, tuple( compPlugs ) ) )
         # END: Bit
-        xmlLines.append( '\t</bit>' )
+        bitList.append( PresetUtility.BitRecord( itemName, '{0}'.format( itemParent ), shapeType,
+                                                 tuple( bitPlugs ), tuple( shapePlugs ), tuple( componentList ) ) )
         
-    # END: Writing XML
-    xmlLines.append( '</data>' )
-    
     # Create the file
     startingDirectory = getPresetPath( FRAME_PRESETS_PATH )
     filePath = '{0}{1}'.format( startingDirectory, inModuleType )
-    fileName = '{0}.xml'.format( inModuleName )
-
-    newfile = file( os.path.join( filePath, fileName ), 'w')      
-    for i in xmlLines:
-        newfile.write( i+'\n' )
-    newfile.close()
+    if inFormat == 'binary':
+        fileName = '{0}{1}'.format( inModuleName, PresetBinary.BINARY_EXTENSION )
+        PresetBinary.writeModuleBinary( os.path.join( filePath, fileName ), bitList )
+    else:
+        fileName = '{0}.xml'.format( inModuleName )
+        PresetUtility.writeModuleRecordsXML( os.path.join( filePath, fileName ), bitList )
+    PRESET_RESOLVER.invalidate()
+    getPresetCatalog().updateFile( os.path.join( filePath, fileName ) )
 
 # Function for reading module xml.
 def readModuleXML( inFile ):
@@ -166,147 +201,321 @@ def readModuleXML( inFile ):
     @param inFullPath: Full directory path + filename + extension of the XML file.
     @return: A dictionary.
     '''
-    returnDict = {}
-    xmlDoc = ET.parse( inFile )
-    xmlRoot = xmlDoc.getroot()
-    
     bitList = []# List of each bit.
-    for bit in xmlRoot.findall( 'bit' ):
-        # Get bit shape
-        shape = bit.findall( 'shape' )
-        shapeType = shape[0].get('name')
-        
-        bitDict = { 'name':bit.get('name'), 'parent':bit.get('parent'), 'shapeType':shapeType }
-        
-        # Get all the bit's plugs.
-        plugList = []
-        for plug in bit.findall( 'plug' ):
-            plugList.append( { 'name':plug.get('name'), 'attrType':plug.get('attrType'), 'attrDataType':plug.get('attrDataType'), 'value':plug.text } )
-        bitDict[ 'plugs' ] = plugList
-        
-        # Get all the shape's plugs.
-        shapePlugList = []
-        for plug in shape[0].findall( 'plug' ):
-            shapePlugList.append( { 'name':plug.get('name'), 'attrType':plug.get('attrType'), 'attrDataType':plug.get('attrDataType'), 'value':plug.text } )
-        bitDict[ 'shape' ] = shapePlugList
-        
-        # Get all the components on the bit.
-        components = bit.findall( 'component' )
-        componentList = []
-        for comp in components:
-            comps = { 'name':comp.get('name') }
-            componentPlugList = []
-            for plug in comp.findall( 'plug' ):
-                componentPlugList.append( { 'name':plug.get('name'), 'attrType':plug.get('attrType'), 'attrDataType':plug.get('attrDataType'), 'value':plug.text } )
-            comps['plugs'] = componentPlugList
-            componentList.append( comps )
-        bitDict[ 'components' ] = componentList
-        
-        # Add the bit to the bit list.
-        bitList.append( bitDict )
-        
-    returnDict[ 'bits' ] = bitList
+    for bit in PRESET_CACHE.get( inFile, PresetUtility.readModulePresetText ):
+        bitList.append( PresetUtility.bitRecordToDict( bit ) )
+    return { 'bits':bitList }
+
+def buildBit( inBitRecord, inModuleGroup, inBitConnections, inBatch=None ):
+    '''
+    Creates a single bit from a preset bit record.
     
-    return returnDict
+    @param inBitRecord: PresetUtility.BitRecord. Typed record of the bit.
+    @param inModuleGroup: String. Full name of the group the module is built under.
+    @param inBitConnections: List. Child arrow connections are added to this list. They
+        can only be hooked up once all the bits exist.
+    @param inBatch: BatchUtility.PlugBatch. The bit's plug edits are added to this batch
+        and happen when it's run. When None the bit gets a batch of its own which is
+        run before returning.
+    @return: String. Full name of the new bit.
+    '''
+    if inBatch is None:
+        batch = BatchUtility.PlugBatch()
+    else:
+        batch = inBatch
+    
+    if inBitRecord.parent is None:
+        bitParent = inModuleGroup
+    else:
+        bitParent = inModuleGroup+inBitRecord.parent
+    
+    # Make the bit.
+    newBit = cmds.makeGLBit( name=inBitRecord.name, objecttype=inBitRecord.shapeType )
+    cmds.parent( newBit, bitParent )
+    
+    # From this point we use the long name for the bit. This avoids any
+    # name clashes.
+    fullBitName = '{0}{1}'.format( bitParent, newBit )
+    
+    # Setup plugs for transform and custom attributes.
+    for plug in inBitRecord.plugs:
+        if not batch.attributeCheck( fullBitName, plug.name ):
+            batch.addPlug( fullBitName, plug.name, plug.attrType, plug.attrDataType )
+            if plug.value is not None:
+                batch.setPlug( fullBitName, plug.name, plug.value )
+        elif plug.value is not None:
+            # Setup position and rotation.
+            batch.setPlug( fullBitName, plug.name, plug.value )
+    
+    # Setup plugs for shape attributes.
+    shapeName = cmds.listRelatives( fullBitName, shapes=True )
+    fullShapeName = '{0}|{1}'.format( fullBitName, shapeName[0] )
+    for plug in inBitRecord.shape:
+        if plug.attrDataType == 'TdataCompound' or plug.attrDataType == 'matrix':
+            # We skip compound nodes at this stage. They are for the child arrow drawing and must be
+            # hooked up after all the objects are created.
+            connectionChild = '{0}{1}'.format( inModuleGroup, plug.value )
+            inBitConnections.append( { 'parent':fullBitName, 'child':connectionChild } )
+        elif plug.attrDataType == 'message':
+            print 'MESSAGE'
+        elif plug.value is not None:
+            batch.setPlug( fullShapeName, plug.name, plug.value )
+    
+    # Setup bit components.
+    for comp in inBitRecord.components:
+        buildComponent( comp, fullBitName, batch )
+    
+    if inBatch is None:
+        batch.run()
+    return fullBitName
 
-def loadModule( inFolder, inFileName ):
+def buildComponent( inComponentRecord, inBitName, inBatch ):
+    '''
+    Adds a component from a preset record to a bit.
+    
+    @param inComponentRecord: PresetUtility.ComponentRecord. Typed record of the component.
+    @param inBitName: String. Full name of the bit.
+    @param inBatch: BatchUtility.PlugBatch. The component's plug edits are added to this batch.
+    @return: String. Name of the new component node.
+    '''
+    compType = inComponentRecord.name
+    
+    # We have to special case components that have additional kwargs.
+    if compType == 'CurveControlComponent':
+        # Handle curve control component type.
+        for plug in inComponentRecord.plugs:
+            if plug.name == 'curveType':
+                curveType = plug.value
+        newComp = components.addComponentToObject( compType, inObject=inBitName, curveType=curveType )
+    else:
+        # Handle basic component.
+        newComp = components.addComponentToObject( compType, inObject=inBitName )
+
+    for plug in inComponentRecord.plugs:
+        # Bit of a hack with the parentName attribute. This attr is setup when the component is created.
+        # So there is no need to apply the stored plug value from the XML.
+        if plug.attrDataType == 'message':
+            if plug.name != 'parentName':
+                if plug.value is not None:
+                    sourcePlug = plug.value.split('.')
+                    inBatch.connectNodes( sourcePlug[0], sourcePlug[1], newComp.name(), plug.name )
+        elif plug.value is not None:
+            inBatch.setPlug( newComp.name(), plug.name, plug.value )
+    return newComp.name()
+
+def getModuleBuildPlan( inFolder, inFileName, inFormat='xml' ):
+    '''
+    Reads a module preset and works out the order its bits are built in.
+    
+    @param inFolder: String. Name for the sub-folder the module XML is located.
+    @param inFileName: String. Name of the module XML. 
+    @param inFormat: String. 'xml' or 'binary'. Which preset file to read.
+    @return: PresetUtility.BuildPlan. Raises ValueError if the preset can't be built.
+    '''
+    if inFormat not in PRESET_FORMATS:
+        raise ValueError( 'Unknown preset format {0}. Use one of {1}.'.format( inFormat, ', '.join( PRESET_FORMATS ) ) )
+    
+    fullPath = PRESET_RESOLVER.findPreset( 'frames', inFolder, inFileName, inFormat )
+    if fullPath is None:
+        raise ValueError( 'No {0} preset named {1} in {2}.'.format( inFormat, inFileName, FRAME_PRESETS_PATH+inFolder ) )
+    if inFormat == 'binary':
+        presetParser = PresetBinary.readModuleBinary
+    else:
+        presetParser = PresetUtility.readModulePreset
+    
+    # Work out the build order before anything is made.
+    buildPlan = PresetUtility.planModuleBuild( PRESET_CACHE.get( fullPath, presetParser ) )
+    if buildPlan.orphans:
+        orphanNames = [ '{0} (parent {1})'.format( bit.name, bit.parent ) for bit in buildPlan.orphans ]
+        raise ValueError( '{0} has bits with missing parents: {1}'.format( fullPath, ', '.join( orphanNames ) ) )
+    if buildPlan.duplicates:
+        duplicatePaths = [ PresetUtility.getBitPath( bit ) for bit in buildPlan.duplicates ]
+        raise ValueError( '{0} has bits with the same path as another bit: {1}'.format( fullPath, ', '.join( duplicatePaths ) ) )
+    return buildPlan
+
+def loadModule( inFolder, inFileName, inFormat='xml' ):
     '''
     Loads a module into the scene.
     
     @param inFolder: String. Name for the sub-folder the module XML is located.
     @param inFileName: String. Name of the module XML. 
+    @param inFormat: String. 'xml' or 'binary'. Which preset file to load.
+    @return: Int. Number of plug edits done by the module's plug batch.
     '''
-    dirPath = getPresetPath( FRAME_PRESETS_PATH+inFolder )
-    fullPath = dirPath+'/'+inFileName+'.xml'
-    xmlFile = readModuleXML( fullPath )
+    buildPlan = getModuleBuildPlan( inFolder, inFileName, inFormat )
     
-    # Create a temp group to put the module inside while creating.
-    moduleGroup = '|{0}'.format( cmds.group( em=True, name='TEMP' ) )
+    # Keep the whole load as one undo step.
+    cmds.undoInfo( openChunk=True )
+    try:
+        # Create a temp group to put the module inside while creating.
+        moduleGroup = '|{0}'.format( cmds.group( em=True, name='TEMP' ) )
+        
+        # Make each bit. Their plug edits are gathered up and done together.
+        storeBitConnections = []
+        batch = BatchUtility.PlugBatch()
+        for bit in buildPlan.order:
+            buildBit( bit, moduleGroup, storeBitConnections, inBatch=batch )
+        operationCount = batch.run()
+                
+        # Now do the hook ups for the child arrows.
+        for i in storeBitConnections:
+            NodeUtility.setBitChild( i['parent'], i['child'] )
+    finally:
+        cmds.undoInfo( closeChunk=True )
     
-    # Grab all the bits.
-    bits = xmlFile['bits']
+    return operationCount
+
+def plugValuesMatch( inPresetValue, inLiveValue ):
+    '''
+    Compares a preset plug value with the value of a plug in the scene.
     
-    # Make each bit.
-    tick = 0
-    storeBitConnections = []
+    @param inPresetValue: Typed value from the preset.
+    @param inLiveValue: Value from NodeUtility.getPlugValue.
+    @return: Bool.
+    '''
+    if isinstance( inLiveValue, list ):
+        # Compound plugs are stored as text.
+        return '{0}'.format( inLiveValue ) == inPresetValue
+    if isinstance( inPresetValue, float ) or isinstance( inLiveValue, float ):
+        try:
+            return abs( float( inPresetValue ) - float( inLiveValue ) ) <= PLUG_TOLERANCE
+        except ( TypeError, ValueError ):
+            return False
+    return inPresetValue == inLiveValue
 
-    while tick < len(bits):
-        if bits[0]['parent'] == 'None':
-            bitParent = moduleGroup
-        else:
-            bitParent = moduleGroup+bits[0]['parent']
+def patchPlugs( inNode, inPlugs, inBatch, inAddMissing=False ):
+    '''
+    Adds edits to a batch for the plugs that don't match their preset values.
+    
+    @param inNode: String. Full name of the node.
+    @param inPlugs: Tuple of PresetUtility.PlugRecord.
+    @param inBatch: BatchUtility.PlugBatch.
+    @param inAddMissing: Bool. Add plugs the node doesn't have yet.
+    @return: Int. Number of plugs changed.
+    '''
+    changed = 0
+    for plug in inPlugs:
+        if plug.value is None or plug.name == 'parentName':
+            continue
+        if plug.attrDataType in [ 'TdataCompound', 'matrix' ]:
+            # Child arrows are hooked up separately.
+            continue
         
-        bitName = bits[0]['name']
-        bitPlugs = bits[0]['plugs']
-        shapePlugs = bits[0]['shape']
-        bitComponents = bits[0]['components']
+        if not inBatch.attributeCheck( inNode, plug.name ):
+            if inAddMissing and plug.attrType is not None:
+                inBatch.addPlug( inNode, plug.name, plug.attrType, plug.attrDataType )
+                inBatch.setPlug( inNode, plug.name, plug.value )
+                changed += 1
+            continue
         
-        # Make the bit.
-        if cmds.objExists( bitParent ):
-            newBit = cmds.makeGLBit( name=bitName, objecttype=bits[0]['shapeType'] )            
-            cmds.parent( newBit, bitParent )
+        if plug.attrDataType == 'message':
+            # Only hook up message plugs that aren't connected yet. Existing
+            # connections may point at renamed nodes on purpose.
+            if NodeUtility.getAttrMessageValue( inNode, plug.name ) is None:
+                sourcePlug = plug.value.split( '.' )
+                if cmds.objExists( plug.value ):
+                    inBatch.connectNodes( sourcePlug[0], sourcePlug[1], inNode, plug.name )
+                    changed += 1
+            continue
+        
+        livePlug = inBatch.getPlug( inNode, plug.name )
+        if not plugValuesMatch( plug.value, NodeUtility.getPlugValue( livePlug ) ):
+            if inBatch.setPlug( inNode, plug.name, plug.value ):
+                changed += 1
+    return changed
+
+def reapplyModule( inRootBit, inFolder, inFileName, inFormat='xml' ):
+    '''
+    Updates a module in the scene to match its preset. Bits are matched up by their
+    path below the module root. Only plugs that differ from the preset are changed,
+    missing bits and components are added, and bits that aren't in the preset are
+    left alone.
+    
+    @param inRootBit: String. Name of the module's root bit.
+    @param inFolder: String. Name for the sub-folder the module XML is located.
+    @param inFileName: String. Name of the module XML. 
+    @param inFormat: String. 'xml' or 'binary'. Which preset file to read.
+    @return: Dictionary. matched, created and extra are lists of bit names.
+        shapeMismatch lists bits whose shape type differs from the preset. plugs is
+        the number of plugs changed and operations the number of plug edits done.
+    '''
+    buildPlan = getModuleBuildPlan( inFolder, inFileName, inFormat )
+    rootRecords = [ bit for bit in buildPlan.order if bit.parent is None ]
+    if len( rootRecords ) != 1:
+        raise ValueError( '{0} has {1} root bits. Only single root modules can be re-applied.'.format( inFileName, len( rootRecords ) ) )
+    presetRootPath = PresetUtility.getBitPath( rootRecords[0] )
+    
+    # Live bits keyed by their path below the root. The root itself is ''.
+    rootName = cmds.ls( inRootBit, long=True )[0]
+    liveBits = { '':rootName }
+    for child in NodeUtility.getFrameRootAllChildren( rootName ) or []:
+        liveBits[ child[ len( rootName ): ] ] = child
+    
+    report = { 'matched':[], 'created':[], 'extra':[], 'shapeMismatch':[], 'plugs':0, 'operations':0 }
+    presetPaths = set()
+    newBitPaths = set()
+    
+    cmds.undoInfo( openChunk=True )
+    try:
+        batch = BatchUtility.PlugBatch()
+        for bit in buildPlan.order:
+            bitPath = PresetUtility.getBitPath( bit )[ len( presetRootPath ): ]
+            presetPaths.add( bitPath )
             
-            # From this point we use the long name for the bit. This avoids any
-            # name clashes.
-            fullBitName = '{0}{1}'.format( bitParent, newBit )
+            fullBitName = liveBits.get( bitPath )
+            if fullBitName is None:
+                # New bit. Its parent has been matched or made already.
+                parentPath = bitPath.rsplit( '|', 1 )[0]
+                newBitRecord = bit._replace( parent=liveBits[ parentPath ] )
+                fullBitName = buildBit( newBitRecord, '', [], inBatch=batch )
+                liveBits[ bitPath ] = fullBitName
+                newBitPaths.add( bitPath )
+                report[ 'created' ].append( fullBitName )
+                continue
             
-            # Setup plugs for transform and custom attributes.
-            for plug in bitPlugs:
-                if not NodeUtility.attributeCheck( fullBitName, plug['name'] ):
-                    NodeUtility.addPlug( fullBitName, plug['name'], plug['attrType'], plug['attrDataType'] )
-                    if plug['value'] is not None:
-                        NodeUtility.setPlug( fullBitName, plug['name'], plug['value'], inAttrDataType=plug['attrDataType'] )
-                else:          
-                    # Setup position and rotation.
-                    NodeUtility.setPlug( fullBitName, plug['name'], plug['value'] )
+            report[ 'matched' ].append( fullBitName )
+            report[ 'plugs' ] += patchPlugs( fullBitName, bit.plugs, batch, inAddMissing=True )
             
-            # Setup plugs for shape attributes.
-            shapeName = cmds.listRelatives( fullBitName, shapes=True )
-            fullShapeName = '{0}|{1}'.format( fullBitName, shapeName[0] )
-            for plug in shapePlugs:
-                if plug['attrDataType'] == 'TdataCompound' or plug['attrDataType'] == 'matrix':
-                    # We skip compound nodes at this stage. They are for the child arrow drawing and must be
-                    # hooked up after all the objects are created.
-                    connectionChild = '{0}{1}'.format( moduleGroup, plug['value'] )
-                    storeBitConnections.append( { 'parent':fullBitName, 'child':connectionChild } )
-                elif plug['attrDataType'] == 'message':
-                    print 'MESSAGE'
+            # Shape.
+            if bit.shapeType is not None:
+                fullShapeName = cmds.listRelatives( fullBitName, shapes=True, fullPath=True )[0]
+                if OpenMaya.MFnDependencyNode( batch.getNode( fullShapeName ) ).typeName() != bit.shapeType:
+                    report[ 'shapeMismatch' ].append( fullBitName )
                 else:
-                    NodeUtility.setPlug( fullShapeName, plug['name'], plug['value'], inAttrDataType=plug['attrDataType'] )
+                    report[ 'plugs' ] += patchPlugs( fullShapeName, bit.shape, batch )
             
-            # Setup bit components.
-            for comp in bitComponents:
-                compType = comp['name']
-                
-                # We have to special case components that have additional kwargs.
-                if compType == 'CurveControlComponent':
-                    # Handle curve control component type.
-                    for plug in comp['plugs']:
-                        if plug['name'] == 'curveType':
-                            curveType = plug['value']
-                    newComp = components.addComponentToObject( compType, inObject=fullBitName, curveType=curveType )
+            # Components, matched up by class.
+            liveComponents = {}
+            for compNode, compClass in ( components.getComponents( fullBitName ) or {} ).iteritems():
+                liveComponents.setdefault( compClass, [] ).append( compNode )
+            for compNodes in liveComponents.itervalues():
+                compNodes.sort()
+            for comp in bit.components:
+                compNodes = liveComponents.get( comp.name )
+                if compNodes:
+                    report[ 'plugs' ] += patchPlugs( compNodes.pop( 0 ), comp.plugs, batch )
                 else:
-                    # Handle basic component.
-                    newComp = components.addComponentToObject( compType, inObject=fullBitName )
-
-                for plug in comp['plugs']:
-                    # Bit of a hack with the parentName attribute. This attr is setup when the component is created.
-                    # So there is no need to apply the stored plug value from the XML.
-                    if plug['attrDataType'] == 'message':
-                        if plug['name'] != 'parentName':
-                            if plug['value'] != 'None':
-                                sourcePlug = plug['value'].split('.')
-                                NodeUtility.connectNodes( sourcePlug[0], sourcePlug[1], newComp.name(), plug['name'] )
-                    else:
-                        NodeUtility.setPlug( newComp.name(), plug['name'], plug['value'], inAttrDataType=plug['attrDataType'] )
-                    
-            # Remove the bit from the list
-            bits.remove( bits[0] )
-        #tick = tick+1
-            
-    # Now do the hook ups for the child arrows.
-    for i in storeBitConnections:
-        NodeUtility.setBitChild( i['parent'], i['child'] )
+                    buildComponent( comp, fullBitName, batch )
+                    report[ 'plugs' ] += len( comp.plugs )
+        
+        # Child arrows pointing at new bits.
+        bitConnections = []
+        for bit in buildPlan.order:
+            bitPath = PresetUtility.getBitPath( bit )[ len( presetRootPath ): ]
+            for plug in bit.shape:
+                if plug.attrDataType in [ 'TdataCompound', 'matrix' ] and plug.value is not None:
+                    childPath = plug.value[ len( presetRootPath ): ]
+                    if childPath in newBitPaths:
+                        bitConnections.append( { 'parent':liveBits[ bitPath ], 'child':liveBits[ childPath ] } )
+        
+        report[ 'operations' ] = batch.run()
+        for i in bitConnections:
+            NodeUtility.setBitChild( i['parent'], i['child'] )
+    finally:
+        cmds.undoInfo( closeChunk=True )
+    
+    report[ 'extra' ] = sorted( liveBits[ path ] for path in liveBits if path not in presetPaths )
+    return report
 
 '''
 
@@ -408,20 +617,16 @@ def readControlXML( inFile=None ):
         dialogResults = [ inFile ]
     
     returnDict = {}
-    xmlDoc = ET.parse( dialogResults[0]  )
-    xmlRoot = xmlDoc.getroot()
-    for object in xmlRoot.findall( 'control' ):
+    controlRecord = PRESET_CACHE.get( dialogResults[0], PresetUtility.readControlPreset )
+    if controlRecord is not None:
         # Add the control name to the list.
-        returnDict[ 'controller' ] = { 'name':object.get( 'name' ), 'type':object.get( 'type' ) }
-        for attr in object.findall( 'attr' ):
-            numValues = attr.findall( 'value' )
-            if len( numValues ) > 1:
-                valueList = []
-                for value in numValues:
-                    valueList.append( value.text )
+        returnDict[ 'controller' ] = { 'name':controlRecord.name, 'type':controlRecord.type }
+        for attrName, values in controlRecord.attrs:
+            if len( values ) > 1:
+                valueList = list( values )
             else:
-                valueList = numValues[0].text
-            returnDict[ attr.get( 'name' ) ] = { 'value':valueList }
+                valueList = values[0]
+            returnDict[ attrName ] = { 'value':valueList }
                 
     # return the list.
     return returnDict
@@ -431,8 +636,9 @@ def createControlFromXML( inType=None, inSubType=None, inControlName=None ):
         # Read the XML file.
         attrList = readControlXML()
     else:
-        startingDirectory = getPresetPath( CONTROLLER_PRESETS_PATH )
-        presetPath = startingDirectory+inType+'/'+inSubType+'.xml'
+        presetPath = PRESET_RESOLVER.findPreset( 'controllers', inType, inSubType )
+        if presetPath is None:
+            raise ValueError( 'No controller preset named {0} in {1}.'.format( inSubType, CONTROLLER_PRESETS_PATH+inType ) )
         attrList = readControlXML( presetPath )
         
     # Create the control.
@@ -512,18 +718,5 @@ def getXMLInFolder( inPresetPath ):
     @param inPresetPath: Preset path to search.
     @return: List of module names.
     '''
-    # Search the dir for all files of type XML
-    fileExt = '.xml'
-    fileList = []
-    fullPath = getPresetPath( inPresetPath )
-    for files in os.listdir( fullPath ):
-        if files.endswith( fileExt ): fileList.append( files )
-    
-    # Get rid of the file extension
-    tempList = []
-    for i in fileList:
-        tempName = i.split( '.' )
-        tempList.append( tempName[0] )
-        
-    # Return the list of names
-    return tempList
\ No newline at end of file
+    # The catalog already knows what's in the folder.
+    return [ entry['name'] for entry in getPresetCatalog().listPresets( inFolder=inPresetPath, inFormat='xml' ) ]
\ No newline at end of file